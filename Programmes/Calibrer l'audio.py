@@ -0,0 +1,145 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import sys
+import time
+import queue
+import argparse
+import platform
+import numpy as np
+from pyo import Server, Input, Noise, Fader, NewTable, TableRec
+from instrument import Instrument
+from profil_audio import SurveillanceTampons, enregistrer_profil, chemin_profil
+
+# ===== FONCTIONS =====
+def pilotes_par_defaut():
+    '''
+    Sortie : liste des couples (audio, winhost) à essayer sur ce système, du plus rapide au plus sûr
+    '''
+    if platform.system() == "Windows":
+        return [("portaudio", hote) for hote in ("asio", "wasapi", "directsound", "mme")]
+    return [("portaudio", None), ("jack", None)]
+
+def vider_file():
+    '''
+    Exécute les actions en attente dans la file de contrôle (changements de chanson) sur le thread principal.
+    '''
+    while True:
+        try:
+            action, args = file_controle.get_nowait()
+        except queue.Empty:
+            return
+        action(*args)
+
+def mesurer_latence(serveur, commandes):
+    '''
+    Entrées : serveur (Server) représentant le serveur audio démarré en duplex et commandes (FileCommandes) la file de l'instrument
+    Sortie : latence aller-retour en ms (sortie vers entrée), ou None si le clic n'a pas été entendu
+    Joue un clic et enregistre l'entrée au même tampon : le retard du clic dans l'enregistrement est la latence aller-retour.
+    Nécessite un câble de bouclage (ou un micro près des haut-parleurs).
+    '''
+    enregistrement = NewTable(length=1.0, chnls=1)
+    enregistreur = TableRec(Input(chnl=0), enregistrement).stop()
+    enveloppe = Fader(fadein=0.0005, fadeout=0.002, dur=0.003, mul=0.5)
+    clic = Noise(mul=enveloppe).out()
+
+    def lancer():
+        enregistreur.play()
+        enveloppe.play()
+    commandes.envoyer(lancer) # Départ du clic et de l'enregistrement au début du même tampon
+    time.sleep(1.2)
+
+    signal = np.abs(np.asarray(enregistrement.getTable()))
+    clic.stop()
+    if signal.max() < 0.01:
+        return None
+    premier = int(np.argmax(signal > 0.5 * signal.max()))
+    return premier / serveur.getSamplingRate() * 1000
+
+def tester(audio, winhost, taille_tampon):
+    '''
+    Entrées : audio (str) et winhost (str ou None) représentant le pilote et taille_tampon (int) la taille du tampon en échantillons
+    Sortie : dictionnaire des mesures, ou None si le serveur ne démarre pas avec cette configuration
+    Fait tourner l'instrument complet (lecteur, filtre et les quatre effets actifs) pendant la durée demandée.
+    '''
+    options = {"sr": arguments.sr, "buffersize": taille_tampon, "duplex": 1, "audio": audio}
+    if winhost is not None:
+        options["winhost"] = winhost
+    serveur = Server(**options).boot()
+    if not serveur.getIsBooted():
+        serveur.shutdown()
+        return None
+    serveur.start()
+
+    # Sans analyse des chansons en arrière-plan : elle occuperait tous les cœurs pendant la mesure
+    instrument = Instrument(serveur, arguments.chansons, os.path.join(dossier_programmes, "Correspondances Manette Bluetooth.json"), file_controle,
+                            analyser_chansons=False)
+    latence = mesurer_latence(serveur, instrument.commandes)
+
+    for effet in instrument.effets_actifs:
+        instrument.commandes.envoyer(instrument.rack_effets.regler, effet, True)
+    instrument.commandes.envoyer(setattr, instrument.selecteur_audio, "voice", 1) # Passage par le filtre passe-bande
+    instrument.lecteur.precharger(0).result() # Chanson décodée avant la mesure, pas pendant
+    instrument.jouer_chanson(0)
+    surveillance = SurveillanceTampons(serveur, suivant=instrument.commandes.appliquer)
+
+    time.sleep(1) # Chauffe : décodage de la chanson suivante et montée des effets
+    vider_file()
+    surveillance.reinitialiser()
+    fin = time.perf_counter() + arguments.duree
+    while time.perf_counter() < fin:
+        time.sleep(0.1)
+        vider_file()
+    tampons, pertes, depassements, intervalle_maximal = surveillance.resultats()
+
+    serveur.stop()
+    instrument.fermer() # Aucun thread de décodage ne reste en vie pendant la mesure des configurations suivantes
+    del surveillance, instrument
+    serveur.shutdown()
+    return {"tampons": tampons, "pertes": pertes, "depassements": depassements, "intervalle_maximal": intervalle_maximal, "latence": latence}
+
+# ===== CODE =====
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+parseur = argparse.ArgumentParser(description="Cherche la plus petite taille de tampon stable pour chaque pilote audio et l'enregistre comme profil de la machine.")
+parseur.add_argument("--duree", type=float, default=10, help="secondes de jeu par configuration")
+parseur.add_argument("--tailles", type=int, nargs="+", default=[64, 128, 256, 512, 1024, 2048], help="tailles de tampon à essayer")
+parseur.add_argument("--sr", type=int, default=44100, help="fréquence d'échantillonnage")
+parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+arguments = parseur.parse_args()
+
+file_controle = queue.SimpleQueue()
+retenue = None
+for audio, winhost in pilotes_par_defaut():
+    for taille_tampon in sorted(arguments.tailles):
+        nom = f"{audio} {winhost or ''}".strip()
+        mesures = tester(audio, winhost, taille_tampon)
+        if mesures is None:
+            print(f"{nom:<22} | indisponible")
+            break # Le pilote ne démarre pas, inutile d'essayer les autres tailles
+
+        latence = f"{mesures['latence']:6.1f} ms" if mesures["latence"] is not None else "non mesurée"
+        stable = mesures["pertes"] == 0 and mesures["depassements"] == 0
+        print(f"{nom:<22} | tampon {taille_tampon:>5} | {mesures['tampons']:>6} tampons | pertes {mesures['pertes']:>4} | "
+              f"dépassements {mesures['depassements']:>4} | intervalle max {mesures['intervalle_maximal']:6.1f} ms | "
+              f"aller-retour {latence} | {'stable' if stable else 'instable'}")
+        if not stable:
+            continue
+
+        # Plus petite latence parmi les configurations stables : mesurée si possible, sinon déduite de la taille du tampon.
+        # Les instruments n'utilisent pas l'entrée : le profil les démarre sans duplex, ce qui ne fait qu'alléger la charge mesurée
+        cout = mesures["latence"] if mesures["latence"] is not None else 2 * taille_tampon / arguments.sr * 1000
+        if retenue is None or cout < retenue[0]:
+            retenue = (cout, {"machine": platform.node(), "audio": audio, "winhost": winhost, "sr": arguments.sr,
+                              "buffersize": taille_tampon, "duplex": 0, "latence_aller_retour": mesures["latence"],
+                              "date": time.strftime("%Y-%m-%d %H:%M:%S")})
+        break # Les tampons plus grands seront stables aussi, avec plus de latence
+
+if retenue is None:
+    print("⚠️  Aucune configuration stable : le profil n'a pas été modifié", file=sys.stderr)
+    sys.exit(1)
+enregistrer_profil(dossier_programmes, retenue[1])
+print(f"💾 Profil enregistré dans {chemin_profil(dossier_programmes)} : {retenue[1]['audio']} {retenue[1]['winhost'] or ''} "
+      f"| tampon de {retenue[1]['buffersize']} échantillons")
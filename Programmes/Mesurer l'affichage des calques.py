@@ -0,0 +1,76 @@
+# ===== INSTALLATIONS =====
+# pip install pillow
+
+# ===== IMPORTATIONS =====
+import os
+import time
+import tkinter as tk
+from PIL import Image, ImageTk
+from calques import CalquesManette
+
+# ===== FONCTIONS =====
+def superposer_calques(calque_base, calques):
+    '''
+    Entrées : calque_base (str) représentant le chemin d'accès du calque de base et calques (list[str]) désignant la liste des chemins d'accès des calques
+    Ancienne méthode de l'instrument : relit et recompose tous les calques à chaque appui.
+    '''
+    image_base = Image.open(calque_base).convert("RGBA")
+    for calque in calques:
+        if os.path.exists(calque):
+            image_calque = Image.open(calque).convert("RGBA")
+            image_base.paste(image_calque, (0, 0), image_calque)
+    return image_base
+
+def bascule_composition(calque):
+    '''
+    Entrée : calque (str) représentant le chemin d'accès du calque
+    Bascule un calque avec l'ancienne méthode : composition complète puis nouvelle PhotoImage dans le label.
+    '''
+    if calque in calques_actifs:
+        calques_actifs.remove(calque)
+    else:
+        calques_actifs.add(calque)
+    image_tk = ImageTk.PhotoImage(superposer_calques(fond, [fond] + list(calques_actifs)))
+    label_image.config(image=image_tk)
+    label_image.image = image_tk
+
+def mesurer(basculer):
+    '''
+    Entrée : basculer (fonction) qui affiche ou masque un calque
+    Sortie : tuple (bascules par seconde, durée moyenne d'une bascule en ms)
+    Chaque bascule est suivie du redessin de la fenêtre, comme dans la boucle de Tkinter.
+    '''
+    debut = time.perf_counter()
+    for n in range(NOMBRE_BASCULES):
+        basculer(calques[n % len(calques)])
+        root.update_idletasks()
+    duree = time.perf_counter() - debut
+    return NOMBRE_BASCULES / duree, duree / NOMBRE_BASCULES * 1000
+
+# ===== CODE =====
+NOMBRE_BASCULES = 200
+
+dossier_calques = os.path.join(os.path.dirname(__file__), "..", "Calques Manette Switch Pro")
+fond = os.path.join(dossier_calques, "Manette.png")
+calques = [os.path.join(dossier_calques, f) for f in sorted(os.listdir(dossier_calques)) if f.endswith(".png") and f != "Manette.png"]
+
+root = tk.Tk()
+
+# Avant : un label dont l'image est recomposée à chaque bascule
+label_image = tk.Label(root)
+label_image.pack()
+calques_actifs = set()
+root.update()
+par_seconde, duree = mesurer(bascule_composition)
+print(f"Composition PIL à chaque appui | {par_seconde:9.1f} bascules/s | {duree:8.3f} ms par bascule")
+label_image.destroy()
+
+# Après : calques décodés une seule fois dans un canevas
+canevas = tk.Canvas(root, highlightthickness=0)
+canevas.pack()
+calques_manette = CalquesManette(canevas, dossier_calques)
+root.update()
+par_seconde, duree = mesurer(calques_manette.basculer)
+print(f"Éléments de canevas            | {par_seconde:9.1f} bascules/s | {duree:8.3f} ms par bascule")
+
+root.destroy()
@@ -0,0 +1,95 @@
+# ===== INSTALLATIONS =====
+# pip install pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import argparse
+import numpy as np
+from pyo import Server, SigTo, Mix, NewTable, TableRec
+from batterie import BanqueBatterie, SequenceurBatterie
+from commandes import FileCommandes
+
+# ===== FONCTIONS =====
+def debuts_coups(signal, sr, ecart_minimal):
+    '''
+    Entrées : signal (numpy.ndarray) représentant la sortie enregistrée, sr (int) la fréquence d'échantillonnage
+    et ecart_minimal (float) la durée en secondes en dessous de laquelle deux dépassements du seuil appartiennent au même coup
+    Sortie : dates en secondes du début de chaque coup
+    '''
+    amplitude = np.abs(signal)
+    au_dessus = np.flatnonzero(amplitude > 0.02 * amplitude.max())
+    debuts = []
+    for i in au_dessus:
+        if not debuts or i - debuts[-1] > ecart_minimal * sr:
+            debuts.append(i)
+    return np.array(debuts) / sr
+
+def mesurer(mode, arrivees, son):
+    '''
+    Entrées : mode (str) représentant le mode de batterie ("direct" ou "quantifié"), arrivees (numpy.ndarray) les dates d'arrivée
+    des messages en secondes et son (str) le nom du son joué
+    Sortie : dates en secondes du début de chaque coup dans la sortie calculée
+    Calcule l'audio tampon par tampon ; les messages arrivés pendant un tampon sont transmis à la file de commandes avant le suivant,
+    comme le fait le thread OSC en temps réel.
+    '''
+    enregistrement = NewTable(length=DUREE, chnls=1)
+    enregistreur = TableRec(Mix([banque.sortie, sequenceur.sortie], voices=1), enregistrement).play()
+    if mode == "quantifié":
+        commandes.envoyer(sequenceur.demarrer)
+
+    prochain = 0
+    for n in range(int(DUREE / duree_tampon)):
+        while prochain < len(arrivees) and arrivees[prochain] <= n * duree_tampon:
+            if mode == "direct":
+                commandes.envoyer(banque.jouer, son)
+            else:
+                commandes.envoyer(sequenceur.quantifier, son, False) # Coups ponctuels seulement : la boucle fausserait la mesure
+            prochain += 1
+        serveur.process()
+
+    sequenceur.arreter()
+    enregistreur.stop()
+    for _ in range(int(1 / duree_tampon)): # Fin des derniers sons avant la mesure suivante
+        serveur.process()
+    return debuts_coups(np.asarray(enregistrement.getTable()), serveur.getSamplingRate(), INTERVALLE / 2)
+
+# ===== CODE =====
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+parseur = argparse.ArgumentParser(description="Compare la régularité des coups de batterie joués à l'arrivée des messages et quantifiés sur la grille.")
+parseur.add_argument("--sons-batterie", default=os.path.join(dossier_programmes, "..", "Sons batterie"), help="dossier des sons de batterie")
+parseur.add_argument("--tempo", type=float, default=120, help="tempo en battements par minute")
+parseur.add_argument("--reseau", type=float, default=3, help="écart type en ms du délai réseau")
+parseur.add_argument("--charges", type=float, nargs="+", default=[0, 5, 20], help="retards moyens en ms dus à la charge des threads Python")
+arguments = parseur.parse_args()
+
+DUREE = 30 # Secondes d'audio calculées pour chaque mesure
+PAS_PAR_COUP = 8 # Un coup toutes les deux noires, pour que chaque son se termine avant le suivant
+alea = np.random.default_rng(0)
+
+# Serveur en mode manuel : l'horloge audio est celle du calcul, le temps réel est simulé par les dates d'arrivée
+serveur = Server(audio="manual").boot().start()
+duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+commandes = FileCommandes(serveur)
+vitesse = SigTo(value=1, time=0.1)
+banque = BanqueBatterie(arguments.sons_batterie, vitesse)
+sequenceur = SequenceurBatterie(banque, vitesse, tempo=arguments.tempo)
+son = min(banque.tables, key=lambda nom: banque.tables[nom].getDur()) # Le son le plus court
+INTERVALLE = sequenceur.duree_pas(arguments.tempo) * PAS_PAR_COUP
+
+print(f"Son : {son} | tempo {arguments.tempo:g} | tampon de {serveur.getBufferSize()} échantillons ({duree_tampon * 1000:.1f} ms) | "
+      f"réseau ±{arguments.reseau:g} ms")
+for charge in arguments.charges:
+    # Le joueur appuie au milieu du pas qui précède chaque temps visé ; les messages arrivent en retard d'un délai réseau
+    # et d'un délai de traitement. En mode quantifié, tout retard inférieur à un demi-pas est absorbé par la grille
+    appuis = np.arange(INTERVALLE, DUREE - 1, INTERVALLE) - sequenceur.duree_pas(arguments.tempo) / 2
+    retards = np.abs(alea.normal(0, arguments.reseau, len(appuis))) + alea.exponential(charge, len(appuis))
+    arrivees = appuis + retards / 1000
+
+    for mode in ("direct", "quantifié"):
+        debuts = mesurer(mode, arrivees, son)
+        ecarts = np.diff(debuts) * 1000 - INTERVALLE * 1000 # Écart de chaque intervalle entre coups à l'intervalle voulu
+        print(f"charge {charge:>5g} ms | {mode:<9} | {len(debuts):>3} coups | écart type {np.std(ecarts):6.2f} ms | "
+              f"écart max {np.max(np.abs(ecarts)):6.2f} ms | retard moyen après l'appui {np.mean(debuts[:len(appuis)] - appuis[:len(debuts)]) * 1000:6.1f} ms")
+
+serveur.stop()
@@ -0,0 +1,79 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+import os
+import time
+import itertools
+from collections import deque
+from pyo import Server, SfPlayer, SigTo
+from batterie import BanqueBatterie
+
+# ===== FONCTIONS =====
+def mesurer(declencher, cadence):
+    '''
+    Entrées : declencher (fonction) jouant un coup de batterie et cadence (int) représentant le nombre de coups par seconde
+    Sortie : tuple (latences en ms de chaque coup, charge CPU en % d'un cœur)
+    Calcule l'audio tampon par tampon pendant DUREE secondes en déclenchant les coups à la cadence demandée.
+    La latence d'un coup va de l'appel qui le déclenche jusqu'à la sortie de son premier tampon vers la carte son.
+    '''
+    duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+    nombre_tampons = int(DUREE / duree_tampon)
+    latences = []
+    prochain_coup = 0.0
+
+    cpu_debut = time.process_time()
+    for n in range(nombre_tampons):
+        debuts = []
+        while prochain_coup <= n * duree_tampon:
+            debuts.append(time.perf_counter())
+            declencher()
+            prochain_coup += 1 / cadence
+
+        serveur.process() # Calcul du tampon dans lequel les nouveaux coups commencent
+        fin = time.perf_counter()
+        latences += [(fin - debut + duree_tampon) * 1000 for debut in debuts]
+    cpu = (time.process_time() - cpu_debut) / (nombre_tampons * duree_tampon) * 100
+
+    return latences, cpu
+
+def percentile(valeurs, p):
+    '''
+    Entrées : valeurs (list[float]) et p (float) représentant le centile voulu entre 0 et 100
+    Sortie : valeur du centile p
+    '''
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+# ===== CODE =====
+DUREE = 5 # Secondes d'audio calculées pour chaque mesure
+CADENCES = [10, 50, 200] # Coups par seconde
+
+dossier_sons_batterie = os.path.join(os.path.dirname(__file__), "..", "Sons batterie")
+sons_batterie = sorted(os.path.join(dossier_sons_batterie, f) for f in os.listdir(dossier_sons_batterie) if f.endswith(".mp3"))
+
+# Serveur en mode manuel : chaque appel à process() calcule un tampon, sans carte son
+serveur = Server(audio="manual").boot().start()
+vitesse = SigTo(value=1, time=0.1)
+
+for cadence in CADENCES:
+    # Ancienne méthode : un SfPlayer créé (et le MP3 ouvert) à chaque coup, gardé en vie 0,2 s
+    joueurs = deque(maxlen=max(1, int(0.2 * cadence)))
+    compteur = itertools.count()
+    def coup_sfplayer():
+        joueurs.append(SfPlayer(sons_batterie[next(compteur) % len(sons_batterie)], speed=vitesse, loop=False, mul=0.8).out())
+    latences, cpu = mesurer(coup_sfplayer, cadence)
+    print(f"SfPlayer par coup      | {cadence:>3} coups/s | latence moyenne {sum(latences) / len(latences):6.2f} ms | p99 {percentile(latences, 99):6.2f} ms | CPU {cpu:5.1f} %")
+    joueurs.clear()
+
+    # Nouvelle méthode : banque préchargée et voix préallouées
+    banque_batterie = BanqueBatterie(dossier_sons_batterie, vitesse)
+    noms = banque_batterie.noms()
+    compteur = itertools.count()
+    def coup_banque():
+        banque_batterie.jouer(noms[next(compteur) % len(noms)])
+    latences, cpu = mesurer(coup_banque, cadence)
+    print(f"Banque préchargée      | {cadence:>3} coups/s | latence moyenne {sum(latences) / len(latences):6.2f} ms | p99 {percentile(latences, 99):6.2f} ms | CPU {cpu:5.1f} %")
+    del banque_batterie
+
+serveur.stop()
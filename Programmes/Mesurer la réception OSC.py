@@ -0,0 +1,81 @@
+# ===== INSTALLATIONS =====
+# pip install python-osc
+
+# ===== IMPORTATIONS =====
+import time
+import threading
+from pythonosc import dispatcher, osc_server, udp_client
+from recepteur_osc import RecepteurOSC
+
+# ===== FONCTIONS =====
+def recevoir(address, *args):
+    '''
+    Entrées : address (string) désignant le chemin d'envoi des données OSC et args (float) la date d'envoi du message
+    Enregistre le délai entre l'envoi du message et son arrivée dans le gestionnaire.
+    '''
+    maintenant = time.perf_counter()
+    with verrou:
+        latences.append((maintenant - args[0]) * 1000)
+
+def mesurer(demarrer, arreter, cadence):
+    '''
+    Entrées : demarrer et arreter (fonctions) lançant et arrêtant le serveur testé et cadence (int) le nombre de paquets envoyés par seconde
+    Sortie : tuple (paquets traités par seconde, latences en ms)
+    Envoie des messages de boussole pendant DUREE secondes à la cadence demandée, comme l'application du téléphone.
+    '''
+    latences.clear()
+    demarrer()
+    client = udp_client.SimpleUDPClient("127.0.0.1", PORT)
+
+    debut = time.perf_counter()
+    for n in range(int(DUREE * cadence)):
+        while time.perf_counter() < debut + n / cadence:
+            pass # Attente active : time.sleep est trop imprécis pour les fortes cadences
+        client.send_message("/data/compass/trueNorth", time.perf_counter())
+    time.sleep(0.5) # Laisser le serveur finir les paquets en attente
+    arreter()
+
+    with verrou:
+        return len(latences) / DUREE, list(latences)
+
+def percentile(valeurs, p):
+    '''
+    Entrées : valeurs (list[float]) et p (float) représentant le centile voulu entre 0 et 100
+    Sortie : valeur du centile p
+    '''
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+# ===== CODE =====
+PORT = 9000
+DUREE = 3 # Secondes d'envoi pour chaque mesure
+CADENCES = [100, 1000, 5000, 20000] # Paquets par seconde
+
+verrou = threading.Lock()
+latences = []
+disp = dispatcher.Dispatcher()
+disp.map("/data/compass/trueNorth", recevoir)
+
+for cadence in CADENCES:
+    # Ancien serveur : un thread créé pour chaque paquet
+    serveur = None
+    def demarrer_threading():
+        global serveur
+        serveur = osc_server.ThreadingOSCUDPServer(("127.0.0.1", PORT), disp)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    def arreter_threading():
+        serveur.shutdown()
+        serveur.server_close()
+    debit, mesures = mesurer(demarrer_threading, arreter_threading, cadence)
+    print(f"ThreadingOSCUDPServer | {cadence:>5} paquets/s envoyés | {debit:8.0f} paquets/s traités | p99 {percentile(mesures, 99) if mesures else float('nan'):7.2f} ms")
+
+    # Nouveau récepteur : une boucle asyncio sur un seul thread
+    recepteur = None
+    def demarrer_recepteur():
+        global recepteur
+        recepteur = RecepteurOSC(("127.0.0.1", PORT), disp)
+        recepteur.demarrer()
+    def arreter_recepteur():
+        recepteur.arreter()
+    debit, mesures = mesurer(demarrer_recepteur, arreter_recepteur, cadence)
+    print(f"RecepteurOSC          | {cadence:>5} paquets/s envoyés | {debit:8.0f} paquets/s traités | p99 {percentile(mesures, 99) if mesures else float('nan'):7.2f} ms")
@@ -0,0 +1,42 @@
+# ===== INSTALLATIONS =====
+# pip install pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import time
+import argparse
+from pyo import Server, SndTable
+from cache_pcm import CachePCM, remplir
+
+# ===== FONCTIONS =====
+def chronometrer(fonction, *args):
+    '''
+    Entrées : fonction (fonction) à appeler et args ses arguments
+    Sortie : tuple (résultat, durée en ms, temps CPU du processus en ms)
+    '''
+    debut, cpu_debut = time.perf_counter(), time.process_time()
+    resultat = fonction(*args)
+    return resultat, (time.perf_counter() - debut) * 1000, (time.process_time() - cpu_debut) * 1000
+
+# ===== CODE =====
+if __name__ == "__main__": # Protection nécessaire : remplir lance des processus de travail qui réimportent ce script
+    dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+    parseur = argparse.ArgumentParser(description="Compare le chargement des chansons décodées à chaque lecture et depuis le cache PCM.")
+    parseur.add_argument("cache", help="dossier du cache à remplir (créé s'il n'existe pas)")
+    parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+    parseur.add_argument("--budget", type=int, default=2 * 1024 ** 3, help="place disque maximale du cache en octets")
+    arguments = parseur.parse_args()
+
+    chemins = sorted(os.path.join(arguments.chansons, f) for f in os.listdir(arguments.chansons) if f.endswith(".mp3"))
+    serveur = Server(audio="manual").boot()
+    cache = CachePCM(arguments.cache, arguments.budget)
+
+    decodees, duree, _ = chronometrer(remplir, arguments.cache, arguments.budget, chemins)
+    print(f"💽 Remplissage en parallèle : {decodees} chansons décodées en {duree / 1000:.2f} s\n")
+
+    for chemin in chemins:
+        _, duree_mp3, cpu_mp3 = chronometrer(SndTable, chemin)
+        chargement, duree_cache, cpu_cache = chronometrer(cache.charger, chemin)
+        statut = f"{duree_cache:8.1f} ms (CPU {cpu_cache:7.1f} ms)" if chargement is not None else "  absente du cache (budget atteint)"
+        print(f"{os.path.basename(chemin):<40} | décodage {duree_mp3:8.1f} ms (CPU {cpu_mp3:7.1f} ms) | cache {statut}")
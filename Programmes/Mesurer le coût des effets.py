@@ -0,0 +1,114 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import time
+import queue
+import argparse
+import itertools
+import numpy as np
+from pyo import Server, Noise, Phasor, Pointer, NewTable, ButBP, Selector, Chorus, Disto, Delay, Freeverb
+from instrument import Instrument
+from profil_audio import charger_profil
+
+# ===== FONCTIONS =====
+def calculer(duree):
+    '''
+    Entrée : duree (float) représentant la durée d'audio à calculer en secondes
+    Sortie : temps de calcul en secondes (le meilleur de plusieurs essais, les autres étant ralentis par le reste du système)
+    '''
+    tampons = int(duree / duree_tampon)
+    for _ in range(int(0.2 / duree_tampon)): # Chauffe : fondus d'activation et premières allocations
+        serveur.process()
+    meilleur = float("inf")
+    for _ in range(arguments.essais):
+        debut = time.perf_counter()
+        for _ in range(tampons):
+            serveur.process()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+def cout_objets():
+    '''
+    Sortie : dictionnaire associant à chaque objet du graphe son temps de calcul seul en secondes, pour arguments.duree secondes d'audio
+    Chaque objet est construit avec les réglages de l'instrument sur une source stéréo, puis mesuré seul ;
+    le coût de la source est retiré.
+    '''
+    source = Noise(mul=[0.3, 0.3])
+    reference = calculer(arguments.duree)
+    table = NewTable(length=10, chnls=2)
+    fabriques = {
+        "Pointer (platine)": lambda: Pointer(table, Phasor(freq=table.getRate())),
+        "ButBP (filtre)": lambda: ButBP(source, freq=1000, q=2),
+        "Selector (platines)": lambda: Selector([source, source], voice=0.5),
+        "Chorus": lambda: Chorus(source, depth=0.8, feedback=0.4, bal=0.7),
+        "Disto": lambda: Disto(source, drive=0.8, slope=0.8),
+        "Delay": lambda: Delay(source, delay=0.3, feedback=0.6),
+        "Freeverb": lambda: Freeverb(source, size=0.9, damp=0.3, bal=0.8),
+    }
+    couts = {}
+    for nom, fabrique in fabriques.items():
+        objet = fabrique().out()
+        couts[nom] = max(calculer(arguments.duree) - reference, 0.0)
+        objet.stop()
+        del objet
+    source.stop()
+    return couts
+
+# ===== CODE =====
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+profil = charger_profil(dossier_programmes)
+
+parseur = argparse.ArgumentParser(description="Mesure le coût de calcul de l'instrument pour chaque combinaison d'effets, à plusieurs vitesses, "
+                                               "sans carte son, ainsi que le coût de chaque objet du graphe.")
+parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+parseur.add_argument("--duree", type=float, default=5, help="secondes d'audio calculées par mesure")
+parseur.add_argument("--essais", type=int, default=3, help="nombre d'essais par mesure (le plus rapide est gardé)")
+parseur.add_argument("--vitesses", type=float, nargs="+", default=[0.25, 1, 1.75], help="vitesses de lecture essayées")
+parseur.add_argument("--tampon", type=int, default=profil["buffersize"] if profil is not None else 256,
+                     help="taille du tampon en échantillons (par défaut : celle du profil audio de la machine)")
+parseur.add_argument("--charge-max", type=float, default=50, help="charge en %% d'un cœur au-delà de laquelle une combinaison est jugée risquée")
+arguments = parseur.parse_args()
+
+# Serveur en mode manuel : chaque appel à process() calcule un tampon, aussi vite que le processeur le permet
+serveur = Server(audio="manual", buffersize=arguments.tampon).boot().start()
+duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+
+print(f"Tampon de {serveur.getBufferSize()} échantillons ({duree_tampon * 1000:.1f} ms) | {arguments.duree:g} s d'audio par mesure\n")
+print("Coût de chaque objet seul :")
+for nom, cout in cout_objets().items():
+    print(f"  {nom:<20} {cout / arguments.duree * 100:6.2f} % d'un cœur | {cout / (arguments.duree / duree_tampon) * 1e6:7.1f} µs par tampon")
+
+instrument = Instrument(serveur, arguments.chansons, os.path.join(dossier_programmes, "Correspondances Manette Bluetooth.json"), queue.SimpleQueue())
+instrument.lecteur.precharger(0).result() # Chanson décodée avant de la lancer
+instrument.jouer_chanson(0)
+lecteur = instrument.lecteur
+while lecteur.tables_platines[lecteur.platine_active] is lecteur.silence: # Bascule appliquée par le moteur audio au tampon suivant
+    serveur.process()
+noms = list(instrument.effets_actifs)
+
+print("\nInstrument complet (lecteur, filtre, sélectionneurs et effets actifs) :")
+charges = {}
+for mode, nom_mode in ((0, "vitesse"), (1, "fréquence")):
+    instrument.selecteur_audio.voice = mode
+    for vitesse in arguments.vitesses:
+        instrument.vitesse.value = vitesse
+        for combinaison in itertools.product((False, True), repeat=len(noms)):
+            for nom, actif in zip(noms, combinaison):
+                instrument.rack_effets.regler(nom, actif)
+            instrument.lecteur.aller_a(0) # Même passage de la chanson pour toutes les mesures
+            duree_calcul = calculer(arguments.duree)
+            charge = duree_calcul / arguments.duree * 100
+            charges[(mode, vitesse, combinaison)] = charge
+            effets = ", ".join(nom for nom, actif in zip(noms, combinaison) if actif) or "aucun effet"
+            print(f"  {nom_mode:<9} | vitesse {vitesse:4.2f} | {effets:<40} | {arguments.duree / duree_calcul:7.1f}x le temps réel | "
+                  f"charge {charge:5.1f} % | {'risqué' if charge > arguments.charge_max else 'sûr'}")
+
+# Coût ajouté par chaque effet : moyenne de l'écart entre les combinaisons qui ne diffèrent que par cet effet
+print("\nCoût ajouté par chaque effet dans l'instrument :")
+for i, nom in enumerate(noms):
+    ecarts = [charge - charges[(mode, vitesse, combinaison[:i] + (False,) + combinaison[i + 1:])]
+              for (mode, vitesse, combinaison), charge in charges.items() if combinaison[i]]
+    print(f"  {nom:<14} {np.mean(ecarts):6.2f} % d'un cœur (de {np.min(ecarts):.2f} à {np.max(ecarts):.2f} %)")
+serveur.stop()
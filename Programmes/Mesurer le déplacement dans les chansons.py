@@ -0,0 +1,86 @@
+# ===== INSTALLATIONS =====
+# pip install pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import time
+import queue
+import argparse
+import numpy as np
+from pyo import Server, SndTable, SigTo
+from index_mp3 import indexer_trames, ecrire_extrait
+from lecteur import Lecteur
+
+# ===== FONCTIONS =====
+def chronometrer(fonction, *args):
+    '''
+    Entrées : fonction (fonction) à appeler et args ses arguments
+    Sortie : tuple (résultat, durée en ms)
+    '''
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, (time.perf_counter() - debut) * 1000
+
+def decoder_depuis_le_debut(chemin_acces, position):
+    '''
+    Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson et position (float) la position voulue en secondes
+    Sortie : table de l'extrait
+    Sans index, le décodeur doit parcourir toutes les trames qui précèdent la position voulue.
+    '''
+    return SndTable(chemin_acces, start=position, stop=position + Lecteur.DUREE_FENETRE)
+
+def decoder_avec_index(chemin_acces, index_trames, position):
+    '''
+    Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson, index_trames (tuple) son index de trames
+    et position (float) la position voulue en secondes
+    Sortie : table de l'extrait
+    '''
+    chemin_extrait, saut = ecrire_extrait(chemin_acces, *index_trames, position, Lecteur.DUREE_FENETRE)
+    try:
+        return SndTable(chemin_extrait, start=saut)
+    finally:
+        os.remove(chemin_extrait)
+
+# ===== CODE =====
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+parseur = argparse.ArgumentParser(description="Compare le temps d'un déplacement dans chaque chanson : décodage depuis le début, "
+                                               "décodage à partir de l'index des trames et déplacement dans la chanson en mémoire.")
+parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+parseur.add_argument("--positions", type=float, nargs="+", default=[0.1, 0.5, 0.9], help="positions essayées, en fraction de la durée")
+arguments = parseur.parse_args()
+
+chemins = sorted(os.path.join(arguments.chansons, f) for f in os.listdir(arguments.chansons) if f.endswith(".mp3"))
+serveur = Server(audio="manual").boot().start()
+# Lecteur sans file de commandes : le déplacement est appliqué pendant l'appel, qui mesure donc tout son coût
+lecteur = Lecteur(chemins, SigTo(value=1), SigTo(value=1000), queue.SimpleQueue())
+
+mesures = {"indexation": [], "depuis le début": [], "avec l'index": [], "en mémoire": []}
+for index, chemin in enumerate(chemins):
+    index_trames, duree_index = chronometrer(indexer_trames, chemin)
+    if index_trames[0] == 0:
+        print(f"{os.path.basename(chemin):<40} | aucune trame MP3, ignorée")
+        continue
+    mesures["indexation"].append(duree_index)
+    duree = index_trames[2][-1] / index_trames[0]
+    lecteur.precharger(index).result()
+    lecteur.jouer(index) # Chanson décodée : la bascule a lieu pendant l'appel
+
+    par_methode = {"depuis le début": [], "avec l'index": [], "en mémoire": []}
+    for fraction in arguments.positions:
+        position = fraction * duree
+        par_methode["depuis le début"].append(chronometrer(decoder_depuis_le_debut, chemin, position)[1])
+        par_methode["avec l'index"].append(chronometrer(decoder_avec_index, chemin, index_trames, position)[1])
+        par_methode["en mémoire"].append(chronometrer(lecteur.aller_a, position)[1])
+        serveur.process()
+    for methode, durees in par_methode.items():
+        mesures[methode].extend(durees)
+
+    print(f"{os.path.basename(chemin):<40} | {duree:6.1f} s | index {duree_index:6.1f} ms | "
+          + " | ".join(f"{methode} {np.median(durees):8.2f} ms" for methode, durees in par_methode.items()))
+
+if mesures["indexation"]:
+    print(f"\n{len(mesures['indexation'])} chansons, {len(arguments.positions)} positions chacune (médiane / maximum) :")
+    for methode, durees in mesures.items():
+        print(f"{methode:<16} {np.median(durees):8.2f} ms / {np.max(durees):8.2f} ms")
+serveur.stop()
@@ -0,0 +1,103 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow pyo
+
+# ===== IMPORTATIONS =====
+import io
+import os
+import time
+import queue
+from pyo import Server, SfPlayer, ButBP, Selector, SigTo
+from mutagen import File
+from mutagen.id3 import ID3, APIC
+from PIL import Image
+from lecteur import Lecteur
+
+# ===== FONCTIONS =====
+def lire_pochette(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+    Sortie : pochette redimensionnée (Image) ou None, comme dans les instruments
+    '''
+    fichier = File(chemin_acces)
+    if fichier is not None and isinstance(fichier.tags, ID3):
+        for tag in fichier.tags.values():
+            if isinstance(tag, APIC):
+                return Image.open(io.BytesIO(tag.data)).resize((150, 150), Image.LANCZOS)
+    return None
+
+def transition_avant(index):
+    '''
+    Entrée : index (entier) représentant le numéro de la chanson
+    Reproduit l'ancien jouer_chanson : arrêt de la source puis construction synchrone du graphe et lecture de la pochette.
+    '''
+    global source_avant, filtre_avant, selecteur_avant
+
+    if source_avant is not None:
+        source_avant.stop()
+    source_avant = SfPlayer(musiques[index], speed=vitesse, loop=False, mul=0.8)
+    filtre_avant = ButBP(source_avant, freq=frequence, q=2, mul=1.0)
+    selecteur_avant = Selector([source_avant, filtre_avant], voice=0).out()
+    lire_pochette(musiques[index])
+
+def mesurer(transition, index):
+    '''
+    Entrées : transition (fonction) qui change de chanson et index (entier) le numéro de la chanson suivante
+    Sortie : délai en ms entre la demande de changement et la sortie du premier tampon de la nouvelle chanson
+    '''
+    debut = time.perf_counter()
+    transition(index)
+    serveur.process()
+    return (time.perf_counter() - debut + duree_tampon) * 1000
+
+def vider_file():
+    '''
+    Exécute les actions envoyées par le lecteur, comme le ferait la boucle de l'interface graphique.
+    '''
+    while not file_controle.empty():
+        action, arguments = file_controle.get()
+        action(*arguments)
+
+# ===== CODE =====
+NOMBRE_TRANSITIONS = 5
+PERIODE_SURVEILLANCE = 0.05 # Période de l'ancien thread de surveillance de fin de chanson
+
+dossier_chansons = os.path.join(os.path.dirname(__file__), "..", "Chansons")
+musiques = [os.path.join(dossier_chansons, f) for f in sorted(os.listdir(dossier_chansons)) if f.endswith(".mp3")]
+
+serveur = Server(audio="manual").boot().start()
+duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+vitesse = SigTo(value=1, time=0.1)
+frequence = SigTo(value=1000, time=0.1)
+file_controle = queue.SimpleQueue()
+
+# Avant : tout est reconstruit à chaque changement de chanson
+source_avant = None
+delais_avant = [mesurer(transition_avant, i % len(musiques)) for i in range(NOMBRE_TRANSITIONS)]
+source_avant.stop()
+del source_avant, filtre_avant, selecteur_avant
+moyenne_avant = sum(delais_avant) / len(delais_avant)
+print(f"Avant (bouton \"menu\")          : {moyenne_avant:7.2f} ms en moyenne, {max(delais_avant):7.2f} ms au pire")
+# L'ancien thread ne remarquait la fin qu'au réveil suivant : en moyenne une demi-période plus tard
+print(f"Avant (fin de chanson, estimé) : {moyenne_avant + PERIODE_SURVEILLANCE / 2 * 1000:7.2f} ms en moyenne, {max(delais_avant) + PERIODE_SURVEILLANCE * 1000:7.2f} ms au pire")
+
+# Après : la chanson suivante est décodée pendant la lecture de la précédente
+lecteur = Lecteur(musiques, vitesse, frequence, file_controle, preparer=lire_pochette)
+lecteur.precharger(0).result()
+lecteur.jouer(0) # Chanson décodée : la bascule a lieu pendant l'appel
+delais_apres = []
+for i in range(1, NOMBRE_TRANSITIONS + 1):
+    lecteur.chargements[i % len(musiques)].result() # Attendre la fin du préchargement, comme pendant une vraie lecture
+    delais_apres.append(mesurer(lecteur.jouer, i))
+print(f"Après (bouton \"menu\")          : {sum(delais_apres) / len(delais_apres):7.2f} ms en moyenne, {max(delais_apres):7.2f} ms au pire")
+
+# Fin de chanson : la bascule se fait dans le moteur audio, au tampon qui suit le dernier échantillon
+lecteur.chargements[(lecteur.index + 1) % len(musiques)].result()
+index_depart = lecteur.index
+while lecteur.index == index_depart:
+    debut = time.perf_counter()
+    serveur.process()
+    duree_process = time.perf_counter() - debut
+    vider_file()
+print(f"Après (fin de chanson)         : {(duree_process + duree_tampon) * 1000:7.2f} ms au pire (un tampon)")
+
+serveur.stop()
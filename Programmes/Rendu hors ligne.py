@@ -0,0 +1,107 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow pyo
+
+# ===== IMPORTATIONS =====
+import os
+import sys
+import time
+import queue
+import argparse
+from pyo import Server
+from instrument import Instrument
+
+# ===== FONCTIONS =====
+def convertir_valeur(texte):
+    '''
+    Entrée : texte (str) représentant une valeur du scénario
+    Sortie : valeur convertie en booléen ("true" ou "false"), en nombre ou laissée en texte
+    '''
+    if texte.lower() in ("true", "false"):
+        return texte.lower() == "true"
+    try:
+        return float(texte)
+    except ValueError:
+        return texte
+
+def lire_scenario(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès du scénario
+    Sortie : liste des messages (temps en secondes, adresse, valeurs) triée par temps
+    Chaque ligne du scénario contient le temps, l'adresse OSC puis les valeurs, séparés par des espaces ;
+    les lignes vides et celles qui commencent par # sont ignorées.
+    '''
+    messages = []
+    with open(chemin_acces, encoding="utf-8") as fichier:
+        for ligne in fichier:
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith("#"):
+                continue
+            temps, adresse, *valeurs = ligne.split()
+            messages.append((float(temps), adresse, [convertir_valeur(valeur) for valeur in valeurs]))
+    messages.sort(key=lambda message: message[0]) # Tri stable : l'ordre du fichier est gardé pour un même temps
+    return messages
+
+def vider_file():
+    '''
+    Exécute les actions envoyées par le lecteur et l'instrument, comme le ferait la boucle de l'interface graphique.
+    '''
+    while not file_controle.empty():
+        action, arguments = file_controle.get()
+        action(*arguments)
+
+# ===== CODE =====
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+parseur = argparse.ArgumentParser(description="Joue un scénario de messages OSC dans l'instrument, sans carte son ni interface, et enregistre le résultat en WAV.")
+parseur.add_argument("scenario", help="fichier texte contenant une ligne 'temps adresse valeurs' par message")
+parseur.add_argument("sortie", help="fichier WAV à écrire")
+parseur.add_argument("--instrument", choices=["Manette Bluetooth", "iPhone"], default="Manette Bluetooth", help="correspondances OSC à utiliser")
+parseur.add_argument("--duree", type=float, default=None, help="durée du rendu en secondes (par défaut : une seconde après le dernier message)")
+parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+parseur.add_argument("--sons-batterie", default=os.path.join(dossier_programmes, "..", "Sons batterie"), help="dossier des sons de batterie")
+parseur.add_argument("--cache-pcm", default=None, help="dossier du cache des chansons décodées (par défaut : pas de cache)")
+arguments = parseur.parse_args()
+
+messages = lire_scenario(arguments.scenario)
+duree = arguments.duree if arguments.duree is not None else (messages[-1][0] + 1 if messages else 10)
+
+# Serveur en mode manuel : chaque appel à process() calcule un tampon, aussi vite que le processeur le permet
+serveur = Server(audio="manual").boot().start()
+duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+
+file_controle = queue.SimpleQueue()
+dossier_sons_batterie = arguments.sons_batterie if arguments.instrument == "Manette Bluetooth" else None
+instrument = Instrument(serveur, arguments.chansons, os.path.join(dossier_programmes, f"Correspondances {arguments.instrument}.json"), file_controle,
+                        dossier_sons_batterie=dossier_sons_batterie, dossier_cache_pcm=arguments.cache_pcm)
+instrument.jouer_chanson(0)
+
+serveur.recordOptions(filename=arguments.sortie, fileformat=0, sampletype=1) # WAV 24 bits
+serveur.recstart()
+
+debut = time.perf_counter()
+prochain_message = 0
+prochain_controle = 0.0
+for n in range(int(duree / duree_tampon)):
+    temps = n * duree_tampon
+
+    # Messages dont le temps est atteint, dans l'ordre du scénario, puis commandes continues une fois par période de contrôle
+    while prochain_message < len(messages) and messages[prochain_message][0] <= temps:
+        _, adresse, valeurs = messages[prochain_message]
+        instrument.ajuster_parametres(adresse, *valeurs)
+        prochain_message += 1
+    if temps >= prochain_controle:
+        instrument.correspondances.appliquer_valeurs_continues()
+        prochain_controle += Instrument.PERIODE_CONTROLE / 1000
+
+    vider_file()
+    instrument.lecteur.attendre() # Changements de chanson appliqués au même tampon à chaque rendu
+    serveur.process()
+
+serveur.recstop()
+duree_calcul = time.perf_counter() - debut
+serveur.stop()
+
+print(f"💾 {arguments.sortie} : {duree:.1f} s d'audio calculées en {duree_calcul:.2f} s ({duree / duree_calcul:.1f}x le temps réel)", file=sys.stderr)
+nombre, attente_moyenne, attente_maximale, duree_maximale = instrument.commandes.statistiques()
+print(f"⏱  {nombre} commandes appliquées par le moteur audio : "
+      f"attente moyenne {attente_moyenne:.2f} ms, maximale {attente_maximale:.2f} ms, exécution la plus longue {duree_maximale:.2f} ms", file=sys.stderr)
@@ -1,7 +1,12 @@
 # ===== INSTALLATIONS =====
-# pip install pyo wxpython
+# pip install pyo wxpython numpy python-osc
 
+import time
+import argparse
 from pyo import *
+from pythonosc import dispatcher
+from archive_osc import ArchiveOSC
+from recepteur_osc import RecepteurOSC
 
 def osc_donnees(adresse, *args):
     '''
@@ -10,7 +15,45 @@ def osc_donnees(adresse, *args):
     '''
     print(f"{adresse} : {args[0]}")
 
-# Initialisation du serveur OSC
-serveur = Server().boot().start()
-osc_receiver = OscDataReceive(port=8000, address="*", function=osc_donnees)
-serveur.gui(locals())
\ No newline at end of file
+def capturer(dossier):
+    '''
+    Entrée : dossier (str) représentant le chemin d'accès du dossier de l'archive
+    Enregistre chaque message reçu dans une archive en colonnes et affiche chaque seconde la cadence et la gigue de chaque adresse.
+    La capture s'arrête avec Ctrl+C.
+    '''
+    try:
+        archive = ArchiveOSC(dossier)
+    except FileExistsError as erreur:
+        print(f"⚠️ {erreur}")
+        return
+    disp = dispatcher.Dispatcher()
+    disp.set_default_handler(archive.ajouter)
+    recepteur = RecepteurOSC(("0.0.0.0", 8000), disp, taille_tampon=8 * 1024 * 1024) # Plusieurs téléphones à la fois
+    recepteur.demarrer()
+    print(f"💾 Capture dans {dossier} (Ctrl+C pour arrêter)")
+
+    try:
+        while True:
+            time.sleep(1)
+            archive.vider()
+            for adresse, (nombre, cadence, gigue) in sorted(archive.statistiques().items()):
+                print(f"{adresse:<45} | {nombre:>9} messages | {cadence:8.1f} msg/s | gigue {gigue:6.2f} ms")
+            print()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recepteur.arreter()
+        archive.fermer()
+        print(f"💾 {recepteur.paquets_recus} paquets enregistrés dans {dossier}")
+
+parseur = argparse.ArgumentParser(description="Affiche les messages OSC reçus sur le port 8000, ou les enregistre dans une archive.")
+parseur.add_argument("--archive", default=None, help="dossier de l'archive à écrire (sans cette option, les messages sont seulement affichés)")
+arguments = parseur.parse_args()
+
+if arguments.archive is not None:
+    capturer(arguments.archive)
+else:
+    # Initialisation du serveur OSC
+    serveur = Server().boot().start()
+    osc_receiver = OscDataReceive(port=8000, address="*", function=osc_donnees)
+    serveur.gui(locals())
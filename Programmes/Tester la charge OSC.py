@@ -0,0 +1,229 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen numpy pillow pyo python-osc
+
+# ===== IMPORTATIONS =====
+import os
+import csv
+import time
+import queue
+import random
+import argparse
+import threading
+import numpy as np
+from pyo import Server
+from pythonosc import dispatcher, osc_server, udp_client
+from instrument import Instrument
+from recepteur_osc import RecepteurOSC
+
+# ===== FONCTIONS =====
+def cle(valeur):
+    '''
+    Entrée : valeur (float) envoyée dans un message OSC
+    Sortie : valeur arrondie en float32, telle qu'elle sera reçue, utilisée pour retrouver la date d'envoi du message
+    '''
+    return float(np.float32(valeur))
+
+def envoyer(cadence, duree):
+    '''
+    Entrées : cadence (int) représentant le nombre de messages envoyés par seconde et duree (float) la durée d'envoi en secondes
+    Envoie un trafic mêlant joystick, boussole et boutons, comme le téléphone et la manette, et note la date d'envoi de chaque message.
+    Chaque valeur continue est unique, ce qui permet de retrouver son message à l'arrivée.
+    '''
+    client = udp_client.SimpleUDPClient("127.0.0.1", PORT)
+    generateur = random.Random(0)
+    debut = time.perf_counter()
+
+    for n in range(int(cadence * duree)):
+        while time.perf_counter() < debut + n / cadence:
+            pass # Attente active : time.sleep est trop imprécis pour les fortes cadences
+        tirage = generateur.random()
+        if tirage < arguments.part_boutons:
+            adresse = generateur.choice(BOUTONS)
+            etat = not etats_boutons[adresse] # Alternance appui / relâchement
+            etats_boutons[adresse] = etat
+            if etat:
+                envois[adresse].append(time.perf_counter())
+            client.send_message(adresse, etat)
+        elif tirage < arguments.part_boutons + (1 - arguments.part_boutons) / 2:
+            valeur = cle(-1 + (n % 20000) / 10000) # Joystick entre -1 et 1
+            envois["/data/gameController/stick/left/y"][valeur] = time.perf_counter()
+            client.send_message("/data/gameController/stick/left/y", valeur)
+        else:
+            valeur = cle((n % 36000) / 100) # Boussole entre 0 et 360
+            envois["/data/compass/trueNorth"][valeur] = time.perf_counter()
+            client.send_message("/data/compass/trueNorth", valeur)
+
+def date_envoi(adresse, valeur, rang):
+    '''
+    Entrées : adresse (str) désignant le chemin d'envoi, valeur la valeur reçue et rang (int) le numéro de l'appui pour un bouton
+    Sortie : date d'envoi du message, ou None s'il est introuvable
+    '''
+    if adresse in BOUTONS:
+        return envois[adresse][rang] if rang < len(envois[adresse]) else None
+    return envois[adresse].get(cle(valeur))
+
+def recevoir(address, *args):
+    '''
+    Entrées : address (string) désignant le chemin d'envoi des données OSC et args les valeurs reçues
+    Note le délai de réception de chaque message, puis le transmet à l'instrument comme le ferait le vrai dispatcher.
+    '''
+    maintenant = time.perf_counter()
+    with verrou:
+        recus[address] = recus.get(address, 0) + 1
+        if address in BOUTONS:
+            if args[0] == True:
+                rang = appuis_recus[address]
+                appuis_recus[address] += 1
+                envoi = date_envoi(address, True, rang)
+            else:
+                envoi = None
+        else:
+            envoi = date_envoi(address, args[0], 0)
+        if envoi is not None:
+            latences_reception.append(maintenant - envoi)
+    instrument.ajuster_parametres(address, *args)
+
+def surveiller_action(adresse, action):
+    '''
+    Entrées : adresse (str) désignant le chemin d'envoi et action (fonction) l'action de l'instrument associée
+    Sortie : action enveloppée qui note le délai entre l'envoi du message et la mise à jour de l'état de l'instrument
+    '''
+    compteur = [0]
+    def action_surveillee(valeur, **parametres):
+        action(valeur, **parametres)
+        maintenant = time.perf_counter()
+        with verrou:
+            envoi = date_envoi(adresse, valeur, compteur[0])
+            compteur[0] += 1
+            if envoi is not None:
+                latences_application.append(maintenant - envoi)
+    return action_surveillee
+
+def boucle_audio():
+    '''
+    Calcule l'audio tampon par tampon au rythme du temps réel, pour que le moteur audio occupe le processeur comme en concert.
+    '''
+    duree_tampon = serveur.getBufferSize() / serveur.getSamplingRate()
+    prochain = time.perf_counter()
+    while not arret.is_set():
+        serveur.process()
+        prochain += duree_tampon
+        time.sleep(max(0, prochain - time.perf_counter()))
+
+def boucle_controle():
+    '''
+    Joue le rôle de la boucle de l'interface graphique : vide la file de contrôle et applique les commandes continues.
+    '''
+    prochain_controle = time.perf_counter()
+    while not arret.is_set():
+        while not file_controle.empty():
+            action, arguments_action = file_controle.get()
+            action(*arguments_action)
+        if time.perf_counter() >= prochain_controle:
+            instrument.correspondances.appliquer_valeurs_continues()
+            prochain_controle += Instrument.PERIODE_CONTROLE / 1000
+        time.sleep(0.016)
+
+def percentile(valeurs, p):
+    '''
+    Entrées : valeurs (list[float]) et p (float) représentant le centile voulu entre 0 et 100
+    Sortie : valeur du centile p, ou nan s'il n'y a aucune valeur
+    '''
+    return float(np.percentile(valeurs, p)) if len(valeurs) else float("nan")
+
+def demarrer_serveur_osc(nom, disp):
+    '''
+    Entrées : nom (str) représentant le serveur à tester ("asyncio" ou "threading") et disp (Dispatcher) le dispatcher
+    Sortie : fonction qui arrête le serveur
+    '''
+    if nom == "asyncio":
+        recepteur = RecepteurOSC(("127.0.0.1", PORT), disp)
+        recepteur.demarrer()
+        return recepteur.arreter
+    serveur_osc = osc_server.ThreadingOSCUDPServer(("127.0.0.1", PORT), disp)
+    threading.Thread(target=serveur_osc.serve_forever, daemon=True).start()
+    def arreter():
+        serveur_osc.shutdown()
+        serveur_osc.server_close()
+    return arreter
+
+# ===== CODE =====
+PORT = 8000
+BOUTONS = ["/data/gameController/action/left", "/data/gameController/action/right", "/data/gameController/dpad/left", "/data/gameController/dpad/right"]
+dossier_programmes = os.path.dirname(os.path.abspath(__file__))
+
+parseur = argparse.ArgumentParser(description="Envoie un trafic OSC réaliste à l'instrument et mesure la latence de bout en bout et les pertes.")
+parseur.add_argument("--cadences", type=int, nargs="+", default=[200, 1000, 4000, 16000], help="messages envoyés par seconde")
+parseur.add_argument("--duree", type=float, default=3, help="durée d'envoi en secondes pour chaque cadence")
+parseur.add_argument("--part-boutons", type=float, default=0.05, help="proportion de messages de boutons (le reste est partagé entre joystick et boussole)")
+parseur.add_argument("--serveurs", nargs="+", choices=["asyncio", "threading"], default=["asyncio", "threading"], help="serveurs OSC à comparer")
+parseur.add_argument("--sortie", default=".", help="dossier où écrire les histogrammes et les courbes de débit (CSV)")
+parseur.add_argument("--chansons", default=os.path.join(dossier_programmes, "..", "Chansons"), help="dossier des chansons")
+parseur.add_argument("--sons-batterie", default=os.path.join(dossier_programmes, "..", "Sons batterie"), help="dossier des sons de batterie")
+arguments = parseur.parse_args()
+
+serveur = Server(audio="manual").boot().start()
+file_controle = queue.SimpleQueue()
+instrument = Instrument(serveur, arguments.chansons, os.path.join(dossier_programmes, "Correspondances Manette Bluetooth.json"), file_controle,
+                        dossier_sons_batterie=arguments.sons_batterie)
+instrument.jouer_chanson(0)
+
+# L'action de chaque adresse est enveloppée pour noter la date à laquelle l'état de l'instrument change
+for adresse, (action, front, continu, parametres) in list(instrument.correspondances.adresses.items()):
+    instrument.correspondances.adresses[adresse] = (surveiller_action(adresse, action), front, continu, parametres)
+
+arret = threading.Event()
+threading.Thread(target=boucle_audio, daemon=True).start()
+threading.Thread(target=boucle_controle, daemon=True).start()
+
+verrou = threading.Lock()
+bornes = np.concatenate(([0], np.logspace(-1, 3, 41))) # Classes des histogrammes en ms, de 0,1 ms à 1 s
+lignes_debit = []
+lignes_histogramme = []
+
+for nom_serveur in arguments.serveurs:
+    disp = dispatcher.Dispatcher()
+    disp.set_default_handler(recevoir)
+
+    for cadence in arguments.cadences:
+        envois = {adresse: [] for adresse in BOUTONS}
+        envois["/data/gameController/stick/left/y"] = {}
+        envois["/data/compass/trueNorth"] = {}
+        etats_boutons = {adresse: False for adresse in BOUTONS}
+        appuis_recus = {adresse: 0 for adresse in BOUTONS}
+        recus = {}
+        latences_reception = []
+        latences_application = []
+
+        arreter = demarrer_serveur_osc(nom_serveur, disp)
+        envoyer(cadence, arguments.duree)
+        time.sleep(0.5) # Laisser le serveur et la boucle de contrôle finir les messages en attente
+        arreter()
+
+        envoyes = int(cadence * arguments.duree)
+        total_recus = sum(recus.values())
+        reception_ms = np.array(latences_reception) * 1000
+        application_ms = np.array(latences_application) * 1000
+        lignes_debit.append([nom_serveur, cadence, envoyes, total_recus, total_recus / arguments.duree, 100 * (1 - total_recus / envoyes),
+                             percentile(reception_ms, 50), percentile(reception_ms, 99), percentile(application_ms, 50), percentile(application_ms, 99)])
+        for mesure, valeurs in (("réception", reception_ms), ("application", application_ms)):
+            effectifs, _ = np.histogram(valeurs, bins=bornes)
+            lignes_histogramme += [[nom_serveur, cadence, mesure, bornes[i], bornes[i + 1], effectif] for i, effectif in enumerate(effectifs)]
+
+        print(f"{nom_serveur:>9} | {cadence:>6} msg/s | {total_recus / arguments.duree:8.0f} reçus/s | pertes {lignes_debit[-1][5]:5.1f} % | "
+              f"réception p50 {lignes_debit[-1][6]:7.2f} ms p99 {lignes_debit[-1][7]:7.2f} ms | application p50 {lignes_debit[-1][8]:7.2f} ms p99 {lignes_debit[-1][9]:7.2f} ms")
+
+arret.set()
+
+with open(os.path.join(arguments.sortie, "Charge OSC - débit.csv"), "w", newline="", encoding="utf-8") as fichier:
+    ecriture = csv.writer(fichier)
+    ecriture.writerow(["serveur", "cadence", "envoyés", "reçus", "reçus par seconde", "pertes (%)",
+                       "réception p50 (ms)", "réception p99 (ms)", "application p50 (ms)", "application p99 (ms)"])
+    ecriture.writerows(lignes_debit)
+
+with open(os.path.join(arguments.sortie, "Charge OSC - histogrammes.csv"), "w", newline="", encoding="utf-8") as fichier:
+    ecriture = csv.writer(fichier)
+    ecriture.writerow(["serveur", "cadence", "mesure", "de (ms)", "à (ms)", "messages"])
+    ecriture.writerows(lignes_histogramme)
+
+serveur.stop()
@@ -0,0 +1,239 @@
+# ===== INSTALLATIONS =====
+# pip install pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import sys
+import sqlite3
+import hashlib
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pyo import SndTable
+from cache_pcm import demarrer_serveur_decodage, etat_source
+
+IMAGES_PAR_SECONDE = 100 # Cadence fixe des caractéristiques, quelle que soit la fréquence d'échantillonnage de la chanson
+TAILLE_FENETRE = 2048
+BANDES = [("sub_bass", 20, 60), ("bass", 60, 250), ("low_mid", 250, 500), ("mid", 500, 2000), ("high_mid", 2000, 4000), ("high", 4000, 20000)]
+
+# ===== FONCTIONS =====
+def ouvrir_index(dossier_analyses):
+    '''
+    Entrée : dossier_analyses (str) représentant le chemin d'accès du dossier des analyses
+    Sortie : connexion SQLite à l'index des analyses, dont la table est créée si besoin
+    '''
+    connexion = sqlite3.connect(os.path.join(dossier_analyses, "Analyses.sqlite"), timeout=10)
+    connexion.execute('''CREATE TABLE IF NOT EXISTS analyses (
+        chemin TEXT PRIMARY KEY, fichier TEXT, date_modification REAL, taille INTEGER, images INTEGER, tempo REAL, temps_forts INTEGER)''')
+    return connexion
+
+def chansons_a_analyser(connexion, chemins):
+    '''
+    Entrées : connexion (sqlite3.Connection) représentant l'index des analyses et chemins (list[str]) les chansons
+    Sortie : liste des chansons nouvelles ou modifiées depuis leur dernière analyse
+    '''
+    connues = {chemin: (date, taille) for chemin, date, taille in connexion.execute("SELECT chemin, date_modification, taille FROM analyses")}
+    return [chemin for chemin in chemins if connues.get(chemin) != etat_source(chemin)]
+
+def spectres(signal, sr):
+    '''
+    Entrées : signal (numpy.ndarray) représentant la chanson en mono et sr (int) sa fréquence d'échantillonnage
+    Sortie : générateur de blocs de spectres d'amplitude (une ligne par image), par tranches pour borner la mémoire utilisée
+    '''
+    pas = sr / IMAGES_PAR_SECONDE
+    signal = np.concatenate([np.zeros(TAILLE_FENETRE // 2, dtype=np.float32), signal, np.zeros(TAILLE_FENETRE, dtype=np.float32)])
+    images = max(0, int((len(signal) - TAILLE_FENETRE) / pas)) # Aucune image pour un extrait plus court qu'un pas
+    fenetre = np.hanning(TAILLE_FENETRE).astype(np.float32)
+    debuts = (np.arange(images) * pas).astype(np.int64) # Pas non entier (ex : 441 échantillons) arrondi image par image
+    for i in range(0, images, 2048):
+        indices = debuts[i:i + 2048, None] + np.arange(TAILLE_FENETRE)
+        yield np.abs(np.fft.rfft(signal[indices] * fenetre, axis=1))
+
+def grille_temps_forts(attaques):
+    '''
+    Entrée : attaques (numpy.ndarray) représentant la force d'attaque de chaque image
+    Sortie : tuple (tempo en battements par minute, dates des temps forts en secondes)
+    Le tempo est la période la plus marquée de l'autocorrélation des attaques entre 60 et 180 BPM (avec une préférence autour de 120) ;
+    la grille est ensuite calée sur la phase qui tombe sur le plus d'attaques.
+    '''
+    centre = attaques - attaques.mean()
+    minimum, maximum = int(IMAGES_PAR_SECONDE * 60 / 180), int(IMAGES_PAR_SECONDE * 60 / 60)
+    if len(centre) <= maximum:
+        return 0.0, np.zeros(0)
+    correlation = np.array([np.dot(centre[:-decalage], centre[decalage:]) for decalage in range(minimum, maximum + 1)])
+    decalages = np.arange(minimum, maximum + 1)
+    preference = np.exp(-0.5 * (np.log2(decalages / (IMAGES_PAR_SECONDE * 60 / 120)) / 0.5) ** 2)
+    periode = decalages[np.argmax(correlation * preference)]
+
+    phase = max(range(periode), key=lambda p: attaques[p::periode].sum())
+    return 60 * IMAGES_PAR_SECONDE / periode, np.arange(phase, len(attaques), periode) / IMAGES_PAR_SECONDE
+
+def analyser_chanson(chemin_acces, chemin_base):
+    '''
+    Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson et chemin_base (str) le chemin d'accès des fichiers
+    d'analyse, sans extension
+    Sortie : tuple (nombre d'images, tempo, nombre de temps forts)
+    Décode la chanson et écrit ses caractéristiques (exécutée dans un processus de travail) :
+    énergie de chaque bande et force d'attaque par image (float32, entre 0 et 1) et dates des temps forts (float64).
+    '''
+    table = SndTable(chemin_acces)
+    sr = round(table.getRate() * table.getSize())
+    signal = np.mean([np.asarray(table.getBuffer(canal)) for canal in range(len(table))], axis=0)
+    del table
+
+    frequences = np.fft.rfftfreq(TAILLE_FENETRE, 1 / sr)
+    limites = [(np.searchsorted(frequences, bas), max(np.searchsorted(frequences, haut), np.searchsorted(frequences, bas) + 1))
+               for _, bas, haut in BANDES]
+    bandes, attaques = [], []
+    precedent = None
+    for bloc in spectres(signal, sr):
+        bandes.append(np.stack([bloc[:, debut:fin].sum(axis=1) for debut, fin in limites], axis=1))
+        logarithme = np.log1p(100 * bloc)
+        if precedent is not None:
+            logarithme = np.vstack([precedent, logarithme])
+        flux = np.maximum(np.diff(logarithme, axis=0), 0).sum(axis=1) # Flux spectral : seules les hausses d'énergie comptent
+        attaques.append(flux if precedent is not None else np.concatenate([[0.0], flux]))
+        precedent = logarithme[-1:]
+    if not attaques:
+        return 0, 0.0, 0 # Rien à analyser : seule l'entrée de l'index est gardée, pour ne pas refaire le décodage
+    bandes = np.log1p(np.concatenate(bandes))
+    attaques = np.concatenate(attaques)
+
+    # Normalisation par chanson : 1 correspond au 99e centile, pour que les visualiseurs n'aient pas de gain à régler
+    bandes = np.clip(bandes / np.maximum(np.percentile(bandes, 99, axis=0), 1e-9), 0, 1).astype(np.float32)
+    attaques = np.clip(attaques / max(np.percentile(attaques, 99), 1e-9), 0, 1).astype(np.float32)
+    tempo, temps_forts = grille_temps_forts(attaques)
+
+    bandes.tofile(chemin_base + ".bandes")
+    attaques.tofile(chemin_base + ".attaques")
+    temps_forts.astype(np.float64).tofile(chemin_base + ".temps")
+    return len(attaques), tempo, len(temps_forts)
+
+def analyser_chansons(dossier_analyses, chemins):
+    '''
+    Entrées : dossier_analyses (str) représentant le chemin d'accès du dossier des analyses et chemins (list[str]) les chansons
+    Sortie : nombre de chansons analysées
+    Analyse en parallèle sur tous les cœurs les chansons nouvelles ou modifiées depuis leur dernière analyse.
+    Une chanson qui ne peut pas être décodée est enregistrée sans aucune image, comme une chanson trop courte :
+    elle ne sera analysée à nouveau que si son fichier change.
+    '''
+    connexion = ouvrir_index(dossier_analyses)
+    a_analyser = chansons_a_analyser(connexion, chemins)
+    fichiers = [hashlib.sha1(os.path.abspath(chemin).encode("utf-8")).hexdigest() for chemin in a_analyser]
+
+    analysees = 0
+    with ProcessPoolExecutor(initializer=demarrer_serveur_decodage) as executeur:
+        futurs = [executeur.submit(analyser_chanson, chemin, os.path.join(dossier_analyses, fichier))
+                  for chemin, fichier in zip(a_analyser, fichiers)]
+        for chemin, fichier, futur in zip(a_analyser, fichiers, futurs):
+            try:
+                images, tempo, temps_forts = futur.result()
+                analysees += 1
+            except BrokenProcessPool:
+                print(f"⚠️ {os.path.basename(chemin)} non analysée : processus de travail interrompu")
+                continue # Réessayée au prochain démarrage
+            except Exception as erreur:
+                print(f"⚠️ {os.path.basename(chemin)} non analysée : {erreur!r}")
+                images, tempo, temps_forts = 0, 0.0, 0
+            date_modification, taille = etat_source(chemin)
+            with connexion:
+                connexion.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (chemin, fichier, date_modification, taille, images, tempo, temps_forts))
+
+    connexion.close()
+    return analysees
+
+# ===== CLASSES =====
+class AnalyseChanson:
+    '''
+    Caractéristiques d'une chanson projetées en mémoire depuis les fichiers d'analyse : la recherche à une position de lecture
+    ne coûte qu'un accès par indice (et une recherche dichotomique dans la grille des temps forts).
+    '''
+    def __init__(self, base, images, tempo, temps_forts):
+        '''
+        Entrées : base (str) représentant le chemin d'accès des fichiers d'analyse sans extension, images (int) le nombre d'images,
+        tempo (float) le tempo en battements par minute et temps_forts (int) le nombre de temps forts
+        '''
+        self.tempo = tempo
+        self.bandes = np.memmap(base + ".bandes", dtype=np.float32, mode="r", shape=(images, len(BANDES)))
+        self.attaques = np.memmap(base + ".attaques", dtype=np.float32, mode="r", shape=(images,))
+        self.temps_forts = np.memmap(base + ".temps", dtype=np.float64, mode="r", shape=(temps_forts,)) if temps_forts else np.zeros(0)
+
+    def caracteristiques(self, position):
+        '''
+        Entrée : position (float) représentant la position de lecture en secondes
+        Sortie : dictionnaire des caractéristiques à cette position : "bandes" (nom de bande -> énergie entre 0 et 1),
+        "attaque" (force d'attaque entre 0 et 1), "temps" (numéro du dernier temps fort, -1 avant le premier),
+        "phase" (avancement entre ce temps fort et le suivant, entre 0 et 1) et "tempo"
+        '''
+        image = min(max(int(position * IMAGES_PAR_SECONDE), 0), len(self.attaques) - 1)
+        temps = int(np.searchsorted(self.temps_forts, position, side="right")) - 1
+        phase = 0.0
+        if 0 <= temps < len(self.temps_forts) - 1:
+            phase = (position - self.temps_forts[temps]) / (self.temps_forts[temps + 1] - self.temps_forts[temps])
+        return {"bandes": {nom: float(self.bandes[image, i]) for i, (nom, _, _) in enumerate(BANDES)},
+                "attaque": float(self.attaques[image]), "temps": temps, "phase": phase, "tempo": self.tempo}
+
+class AnalysesChansons:
+    '''
+    Analyses hors ligne des chansons (grille des temps forts, force d'attaque et énergie par bande), calculées une seule fois
+    par chanson et gardées sur le disque à côté de la bibliothèque.
+    '''
+    def __init__(self, dossier_analyses):
+        '''
+        Entrée : dossier_analyses (str) représentant le chemin d'accès du dossier des analyses (créé s'il n'existe pas)
+        '''
+        self.dossier_analyses = dossier_analyses
+        os.makedirs(dossier_analyses, exist_ok=True)
+        ouvrir_index(dossier_analyses).close()
+        self.ouvertes = {} # Chemin de la chanson -> AnalyseChanson
+
+    def mettre_a_jour_en_arriere_plan(self, chemins):
+        '''
+        Entrée : chemins (list[str]) représentant les chansons de la bibliothèque
+        Sortie : processus lancé, ou None si toutes les chansons sont à jour
+        Lance l'analyse des chansons nouvelles ou modifiées dans un processus à part, sans attendre la fin.
+        '''
+        connexion = ouvrir_index(self.dossier_analyses)
+        a_analyser = chansons_a_analyser(connexion, chemins)
+        connexion.close()
+        if not a_analyser:
+            return None
+        print(f"📈 Analyse de {len(a_analyser)} chansons en arrière-plan")
+        processus = subprocess.Popen([sys.executable, __file__, self.dossier_analyses], stdin=subprocess.PIPE, encoding="utf-8")
+        processus.stdin.write("".join(chemin + "\n" for chemin in a_analyser))
+        processus.stdin.close()
+        return processus
+
+    def ouvrir(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : AnalyseChanson, ou None si la chanson n'a pas encore été analysée (ou a été modifiée depuis) ou si elle est
+        trop courte pour avoir une seule image d'analyse
+        '''
+        analyse = self.ouvertes.get(chemin_acces)
+        if analyse is not None:
+            return analyse
+        connexion = ouvrir_index(self.dossier_analyses)
+        ligne = connexion.execute("SELECT fichier, date_modification, taille, images, tempo, temps_forts FROM analyses WHERE chemin = ?",
+                                  (chemin_acces,)).fetchone()
+        connexion.close()
+        if ligne is None or (ligne[1], ligne[2]) != etat_source(chemin_acces) or ligne[3] == 0:
+            return None
+        fichier, _, _, images, tempo, temps_forts = ligne
+        analyse = self.ouvertes[chemin_acces] = AnalyseChanson(os.path.join(self.dossier_analyses, fichier), images, tempo, temps_forts)
+        return analyse
+
+    def caracteristiques(self, chemin_acces, position):
+        '''
+        Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson et position (float) la position de lecture en secondes
+        Sortie : dictionnaire des caractéristiques (voir AnalyseChanson.caracteristiques), ou None si la chanson n'est pas analysée
+        '''
+        analyse = self.ouvrir(chemin_acces)
+        return analyse.caracteristiques(position) if analyse is not None else None
+
+# ===== CODE =====
+if __name__ == "__main__":
+    chemins = [ligne.rstrip("\n") for ligne in sys.stdin if ligne.strip()]
+    print(f"📈 {analyser_chansons(sys.argv[1], chemins)} chansons analysées")
@@ -0,0 +1,186 @@
+# ===== INSTALLATIONS =====
+# pip install numpy
+
+# ===== IMPORTATIONS =====
+import os
+import json
+import time
+import threading
+import numpy as np
+
+# ===== FONCTIONS =====
+def valeur_numerique(valeur):
+    '''
+    Entrée : valeur représentant un argument de message OSC
+    Sortie : valeur convertie en float, ou NaN pour un argument qui n'est pas un nombre (texte, blob...)
+    '''
+    return float(valeur) if isinstance(valeur, (int, float)) else np.nan
+
+def lire_archive(dossier):
+    '''
+    Entrée : dossier (str) représentant le chemin d'accès d'une archive écrite par ArchiveOSC
+    Sortie : dictionnaire adresse -> (dates en nanosecondes (int64), valeurs (float64, une colonne par argument)),
+    projetés en mémoire sans être lus : on peut découper une archive de plusieurs gigaoctets sans la charger
+    '''
+    with open(os.path.join(dossier, "index.json"), encoding="utf-8") as fichier:
+        index = json.load(fichier)
+
+    colonnes = {}
+    for adresse, description in index["adresses"].items():
+        nombre = description["messages"]
+        if nombre == 0:
+            continue
+        temps = np.memmap(os.path.join(dossier, description["fichier"] + ".temps"), dtype=np.int64, mode="r", shape=(nombre,))
+        valeurs = np.memmap(os.path.join(dossier, description["fichier"] + ".valeurs"), dtype=np.float64, mode="r",
+                            shape=(nombre, description["colonnes"]))
+        colonnes[adresse] = (temps, valeurs)
+    return colonnes
+
+# ===== CLASSES =====
+class ColonneOSC:
+    '''
+    Messages d'une adresse OSC : dates et valeurs accumulées dans des tableaux préalloués, puis ajoutées en fin de fichier par blocs.
+    '''
+    def __init__(self, dossier, fichier, colonnes, taille_bloc=4096):
+        '''
+        Entrées : dossier (str) représentant le dossier de l'archive, fichier (str) le nom de base des fichiers de l'adresse,
+        colonnes (int) le nombre de valeurs par message et taille_bloc (int) le nombre de messages gardés en mémoire avant écriture
+        '''
+        self.fichier = fichier
+        self.colonnes = colonnes
+        self.temps = np.empty(taille_bloc, dtype=np.int64)
+        self.valeurs = np.empty((taille_bloc, colonnes), dtype=np.float64)
+        self.en_attente = 0 # Messages du bloc pas encore écrits
+        self.ecrits = 0
+        self.fichier_temps = open(os.path.join(dossier, fichier + ".temps"), "ab")
+        self.fichier_valeurs = open(os.path.join(dossier, fichier + ".valeurs"), "ab")
+
+        # Statistiques de la fenêtre en cours : nombre de messages, somme et somme des carrés des intervalles
+        self.dernier = None
+        self.nombre_fenetre = 0
+        self.intervalles_fenetre = 0
+        self.somme_intervalles = 0.0
+        self.somme_carres = 0.0
+
+    def ajouter(self, date, valeurs):
+        '''
+        Entrées : date (int) en nanosecondes et valeurs (tuple) les arguments du message
+        Les arguments qui ne sont pas des nombres sont archivés comme NaN.
+        '''
+        i = self.en_attente
+        self.temps[i] = date
+        ligne = self.valeurs[i]
+        ligne[:] = np.nan
+        for j, valeur in enumerate(valeurs[:self.colonnes]):
+            ligne[j] = valeur_numerique(valeur)
+        self.en_attente += 1
+
+        if self.dernier is not None:
+            intervalle = (date - self.dernier) / 1e6
+            self.somme_intervalles += intervalle
+            self.somme_carres += intervalle * intervalle
+            self.intervalles_fenetre += 1
+        self.dernier = date
+        self.nombre_fenetre += 1
+
+        if self.en_attente == len(self.temps):
+            self.vider()
+
+    def vider(self):
+        '''
+        Écrit les messages en attente à la fin des fichiers de l'adresse.
+        '''
+        if self.en_attente:
+            self.fichier_temps.write(self.temps[:self.en_attente].tobytes())
+            self.fichier_valeurs.write(self.valeurs[:self.en_attente].tobytes())
+            self.fichier_temps.flush()
+            self.fichier_valeurs.flush()
+            self.ecrits += self.en_attente
+            self.en_attente = 0
+
+    def fermer(self):
+        '''
+        Écrit les derniers messages et ferme les fichiers.
+        '''
+        self.vider()
+        self.fichier_temps.close()
+        self.fichier_valeurs.close()
+
+class ArchiveOSC:
+    '''
+    Archive en colonnes d'une session de capture OSC : pour chaque adresse, un fichier de dates (int64, en nanosecondes d'une horloge
+    monotone) et un fichier de valeurs (float64), auxquels les messages sont seulement ajoutés.
+    Les fichiers peuvent être relus avec lire_archive sous forme de tableaux NumPy projetés en mémoire.
+    '''
+    def __init__(self, dossier):
+        '''
+        Entrée : dossier (str) représentant le chemin d'accès du dossier de l'archive (créé s'il n'existe pas)
+        Un dossier qui n'est pas vide est refusé (FileExistsError) : les messages seraient ajoutés aux fichiers d'une capture
+        précédente, dont l'index ne décrirait plus le contenu.
+        '''
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        if os.listdir(dossier):
+            raise FileExistsError(f"Le dossier {dossier} contient déjà des fichiers : choisir un dossier vide pour chaque capture")
+        self.colonnes = {} # Adresse -> ColonneOSC
+        self.verrou = threading.Lock()
+        self.debut_fenetre = time.perf_counter_ns()
+
+    def ajouter(self, adresse, *valeurs):
+        '''
+        Entrées : adresse (str) désignant le chemin d'envoi des données OSC et valeurs les arguments du message
+        Ajoute un message daté de sa réception ; s'utilise directement comme gestionnaire d'un dispatcher python-osc.
+        '''
+        date = time.perf_counter_ns()
+        with self.verrou:
+            colonne = self.colonnes.get(adresse)
+            if colonne is None:
+                fichier = f"{len(self.colonnes):04d} " + adresse.strip("/").replace("/", " ")
+                colonne = self.colonnes[adresse] = ColonneOSC(self.dossier, fichier, max(1, len(valeurs)))
+            colonne.ajouter(date, valeurs)
+
+    def vider(self):
+        '''
+        Écrit sur le disque les messages en attente et l'index, pour qu'une capture interrompue reste lisible.
+        '''
+        with self.verrou:
+            for colonne in self.colonnes.values():
+                colonne.vider()
+            index = {"adresses": {adresse: {"fichier": colonne.fichier, "colonnes": colonne.colonnes, "messages": colonne.ecrits}
+                                  for adresse, colonne in self.colonnes.items()}}
+        with open(os.path.join(self.dossier, "index.json"), "w", encoding="utf-8") as fichier:
+            json.dump(index, fichier, ensure_ascii=False, indent=4)
+
+    def statistiques(self):
+        '''
+        Sortie : dictionnaire adresse -> (messages reçus depuis le début, messages par seconde, gigue en ms)
+        La cadence et la gigue (écart type des intervalles entre messages) portent sur la période écoulée depuis l'appel précédent.
+        '''
+        with self.verrou:
+            maintenant = time.perf_counter_ns()
+            duree = max(maintenant - self.debut_fenetre, 1) / 1e9
+            self.debut_fenetre = maintenant
+
+            resultats = {}
+            for adresse, colonne in self.colonnes.items():
+                intervalles = colonne.intervalles_fenetre
+                if intervalles > 0:
+                    moyenne = colonne.somme_intervalles / intervalles
+                    gigue = max(colonne.somme_carres / intervalles - moyenne * moyenne, 0.0) ** 0.5
+                else:
+                    gigue = float("nan")
+                resultats[adresse] = (colonne.ecrits + colonne.en_attente, colonne.nombre_fenetre / duree, gigue)
+                colonne.nombre_fenetre = 0
+                colonne.intervalles_fenetre = 0
+                colonne.somme_intervalles = 0.0
+                colonne.somme_carres = 0.0
+            return resultats
+
+    def fermer(self):
+        '''
+        Écrit les derniers messages et l'index, puis ferme les fichiers.
+        '''
+        self.vider()
+        with self.verrou:
+            for colonne in self.colonnes.values():
+                colonne.fermer()
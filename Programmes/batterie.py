@@ -0,0 +1,157 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+import os
+from pyo import SndTable, TableRead, Mix, Metro, Counter, DataTable, TableIndex, Clip, TrigEnv, TrigFunc
+
+# ===== CLASSES =====
+class BanqueBatterie:
+    '''
+    Banque de sons de batterie décodés une seule fois au démarrage et joués par un ensemble fixe de voix préallouées.
+    Un coup ne coûte qu'un changement de table et un redémarrage de lecture : aucun fichier n'est ouvert ni décodé.
+    Les coups doivent être joués sur le thread audio (par la file de commandes de l'instrument).
+    '''
+    def __init__(self, dossier, vitesse, nombre_voix=8, mul=0.8):
+        '''
+        Entrées : dossier (str) représentant le dossier contenant les sons .mp3, vitesse (PyoObject) désignant la vitesse de lecture,
+        nombre_voix (int) représentant le nombre de sons pouvant se superposer et mul (float) le volume de sortie
+        Décode chaque son dans une table en mémoire et prépare les voix de lecture, arrêtées tant qu'aucun coup n'est joué.
+        '''
+        self.tables = {} # Sons décodés, indexés par leur nom en minuscules (ex : "caisse claire")
+        self.frequences = {} # Fréquences de lecture précalculées pour suivre la vitesse de la musique
+
+        for f in sorted(os.listdir(dossier)):
+            if f.endswith(".mp3"):
+                nom = os.path.splitext(f)[0].lower()
+                table = SndTable(os.path.join(dossier, f))
+                self.tables[nom] = table
+                self.frequences[nom] = vitesse * table.getRate()
+
+        if not self.tables:
+            raise ValueError(f"Aucun son de batterie trouvé dans {dossier}")
+
+        # Voix préallouées : elles ne lisent rien tant qu'un coup ne les déclenche pas
+        nom_initial = next(iter(self.tables))
+        self.voix = [TableRead(self.tables[nom_initial], freq=self.frequences[nom_initial], loop=0).stop() for _ in range(nombre_voix)]
+        self.sortie = Mix(self.voix, voices=2, mul=mul).out()
+
+        self.prochaine_voix = 0 # Les voix sont utilisées à tour de rôle : la prochaine est toujours la plus ancienne
+
+    def jouer(self, nom):
+        '''
+        Entrée : nom (str) représentant le nom du son à jouer (nom du fichier sans l'extension, en minuscules)
+        Déclenche le son sur la prochaine voix ; si toutes les voix sont occupées, la plus ancienne est volée.
+        '''
+        voix = self.voix[self.prochaine_voix]
+        self.prochaine_voix = (self.prochaine_voix + 1) % len(self.voix)
+        voix.setTable(self.tables[nom])
+        voix.setFreq(self.frequences[nom])
+        voix.play() # Repart du début de la table
+
+    def noms(self):
+        '''
+        Sortie : liste des noms des sons disponibles
+        '''
+        return list(self.tables)
+
+class SequenceurBatterie:
+    '''
+    Séquenceur de batterie cadencé par l'horloge du moteur audio : les coups sont calés sur une grille de pas au tempo voulu.
+    Chaque son a une boucle de pas (motif rejoué à chaque tour) et des coups ponctuels (joués une seule fois) ;
+    un métronome pyo déclenche les sons à l'échantillon près, sans dépendre de l'heure d'arrivée des messages OSC
+    ni de la charge des threads Python.
+    Les méthodes qui modifient les pas doivent être appelées sur le thread audio (par la file de commandes de l'instrument).
+    '''
+    def __init__(self, banque, vitesse, tempo=120, pas_par_temps=4, nombre_pas=16, mul=0.8):
+        '''
+        Entrées : banque (BanqueBatterie) représentant la banque dont les sons décodés sont réutilisés, vitesse (PyoObject) la vitesse
+        de lecture, tempo (float) le tempo en battements par minute, pas_par_temps (int) la finesse de la grille (4 : doubles croches),
+        nombre_pas (int) la longueur de la boucle et mul (float) le volume de sortie
+        Le séquenceur est créé arrêté.
+        '''
+        self.pas_par_temps = pas_par_temps
+        self.nombre_pas = nombre_pas
+        self.metronome = Metro(time=self.duree_pas(tempo)).stop()
+        self.compteur = Counter(self.metronome, min=0, max=nombre_pas) # Numéro du pas, mis à jour sur l'échantillon du déclenchement
+        self.pas_joue = nombre_pas - 1 # Dernier pas joué : le prochain est le premier de la boucle
+
+        self.motifs = {} # Nom du son -> DataTable des pas de la boucle (1 : coup)
+        self.ponctuels = {} # Nom du son -> DataTable des coups à jouer une seule fois
+        self.lecteurs = []
+        for nom, table in banque.tables.items():
+            self.motifs[nom] = DataTable(nombre_pas)
+            self.ponctuels[nom] = DataTable(nombre_pas)
+            actif = Clip(TableIndex(self.motifs[nom], self.compteur) + TableIndex(self.ponctuels[nom], self.compteur), 0, 1)
+            declencheur = self.metronome * actif # Vaut 1 seulement sur l'échantillon d'un pas où le son est joué
+            self.lecteurs.append(TrigEnv(declencheur, table, dur=table.getDur() / vitesse))
+        self.sortie = Mix(self.lecteurs, voices=2, mul=mul).out()
+
+        # Créé après les lecteurs : appelé une fois le pas joué, dans le même tampon
+        self.fin_pas = TrigFunc(self.metronome, self._pas_joue)
+
+    def duree_pas(self, tempo):
+        '''
+        Entrée : tempo (float) en battements par minute
+        Sortie : durée d'un pas en secondes
+        '''
+        return 60 / tempo / self.pas_par_temps
+
+    def regler_tempo(self, tempo):
+        '''
+        Entrée : tempo (float) en battements par minute
+        '''
+        self.metronome.time = self.duree_pas(tempo)
+
+    def demarrer(self):
+        '''
+        Lance la boucle : le premier pas est joué au tampon suivant.
+        '''
+        self.metronome.play()
+
+    def arreter(self):
+        '''
+        Arrête la boucle et la remet au premier pas ; les coups ponctuels en attente sont abandonnés.
+        '''
+        self.metronome.stop()
+        self.compteur.reset()
+        self.pas_joue = self.nombre_pas - 1
+        for table in self.ponctuels.values():
+            table.reset()
+
+    def prochain_pas(self):
+        '''
+        Sortie : numéro du prochain pas de la grille
+        '''
+        return (self.pas_joue + 1) % self.nombre_pas
+
+    def quantifier(self, nom, enregistrer=True):
+        '''
+        Entrées : nom (str) représentant le son à jouer et enregistrer (bool) indiquant s'il faut aussi l'ajouter à la boucle
+        Joue le son sur le prochain pas de la grille.
+        '''
+        pas = self.prochain_pas()
+        self.ponctuels[nom].put(1, pas)
+        if enregistrer:
+            self.motifs[nom].put(1, pas)
+
+    def regler_pas(self, nom, pas, actif):
+        '''
+        Entrées : nom (str) représentant le son, pas (int) le numéro du pas dans la boucle et actif (bool) indiquant si le son y est joué
+        '''
+        self.motifs[nom].put(1 if actif else 0, pas % self.nombre_pas)
+
+    def effacer(self):
+        '''
+        Vide la boucle de tous les sons.
+        '''
+        for table in self.motifs.values():
+            table.reset()
+
+    def _pas_joue(self):
+        '''
+        Appelée par le moteur audio après chaque pas : retire les coups ponctuels qui viennent d'être joués.
+        '''
+        self.pas_joue = int(self.compteur.get())
+        for table in self.ponctuels.values():
+            table.put(0, self.pas_joue)
@@ -0,0 +1,183 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow numpy
+
+# ===== IMPORTATIONS =====
+import io
+import os
+import sys
+import sqlite3
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from mutagen import File, MutagenError
+from mutagen.id3 import ID3, APIC
+from PIL import Image
+from index_mp3 import indexer_trames
+
+# ===== FONCTIONS =====
+def analyser_chanson(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+    Sortie : tuple (durée en secondes, titre, miniature 150×150 au format PNG ou None, index des trames MP3)
+    Lit les informations d'une chanson (exécutée dans un processus de travail).
+    Un fichier illisible ou corrompu est indexé sans durée ni pochette, pour ne pas bloquer l'indexation des autres chansons.
+    '''
+    try:
+        fichier = File(chemin_acces)
+    except (MutagenError, OSError) as erreur:
+        print(f"⚠️ {os.path.basename(chemin_acces)} illisible, indexée sans durée ni pochette : {erreur!r}")
+        fichier = None
+    duree = fichier.info.length if fichier is not None else 0.0
+    titre = os.path.splitext(os.path.basename(chemin_acces))[0] # Les fichiers sont nommés "Artiste - Titre"
+    miniature = None
+
+    if fichier is not None and isinstance(fichier.tags, ID3):
+        for tag in fichier.tags.values():
+            if isinstance(tag, APIC):
+                try:
+                    image = Image.open(io.BytesIO(tag.data)).convert("RGB").resize((150, 150), Image.LANCZOS)
+                except OSError:
+                    continue # Pochette corrompue ou dans un format inconnu
+                tampon = io.BytesIO()
+                image.save(tampon, format="PNG")
+                miniature = tampon.getvalue()
+                break
+
+    try:
+        trames = indexer_trames(chemin_acces)
+    except OSError:
+        trames = 0, np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64) # Fréquence nulle : pas de départ en cours de route
+    return duree, titre, miniature, trames
+
+def ouvrir_index(chemin_index):
+    '''
+    Entrée : chemin_index (str) représentant le chemin d'accès du fichier d'index
+    Sortie : connexion SQLite à l'index, dont les tables sont créées si besoin
+    '''
+    connexion = sqlite3.connect(chemin_index)
+    connexion.execute('''CREATE TABLE IF NOT EXISTS chansons (
+        nom TEXT PRIMARY KEY, date_modification REAL, taille INTEGER, duree REAL, titre TEXT, miniature BLOB)''')
+    # Index des trames MP3 : position en octets et premier échantillon de chaque trame, en tableaux int64 bruts
+    connexion.execute('''CREATE TABLE IF NOT EXISTS trames (nom TEXT PRIMARY KEY, sr INTEGER, octets BLOB, echantillons BLOB)''')
+    return connexion
+
+def fichiers_modifies(dossier, connexion):
+    '''
+    Entrées : dossier (str) représentant le chemin d'accès du dossier des chansons et connexion (sqlite3.Connection) l'index
+    Sortie : tuple (noms des chansons nouvelles ou modifiées avec leur date et leur taille, noms des chansons supprimées)
+    Les chansons indexées avant l'ajout de l'index des trames comptent comme modifiées.
+    '''
+    connues = {nom: (date, taille) for nom, date, taille in connexion.execute(
+        "SELECT chansons.nom, date_modification, taille FROM chansons JOIN trames ON trames.nom = chansons.nom")}
+    indexees = [nom for nom, in connexion.execute("SELECT nom FROM chansons")]
+    presentes = {}
+    with os.scandir(dossier) as entrees:
+        for entree in entrees:
+            if entree.name.endswith(".mp3"):
+                etat = entree.stat()
+                presentes[entree.name] = (etat.st_mtime, etat.st_size)
+
+    modifiees = {nom: etat for nom, etat in presentes.items() if connues.get(nom) != etat}
+    supprimees = [nom for nom in indexees if nom not in presentes]
+    return modifiees, supprimees
+
+def indexer(dossier, chemin_index):
+    '''
+    Entrées : dossier (str) représentant le chemin d'accès du dossier des chansons et chemin_index (str) celui du fichier d'index
+    Sortie : nombre de chansons analysées
+    Met à jour l'index : seules les chansons nouvelles ou modifiées depuis la dernière fois sont analysées, en parallèle sur tous les cœurs.
+    '''
+    connexion = ouvrir_index(chemin_index)
+    modifiees, supprimees = fichiers_modifies(dossier, connexion)
+
+    with ProcessPoolExecutor() as executeur:
+        noms = list(modifiees)
+        resultats = executeur.map(analyser_chanson, [os.path.join(dossier, nom) for nom in noms], chunksize=8)
+        with connexion:
+            for nom, (duree, titre, miniature, (sr, octets, echantillons)) in zip(noms, resultats):
+                date_modification, taille = modifiees[nom]
+                connexion.execute("INSERT OR REPLACE INTO chansons VALUES (?, ?, ?, ?, ?, ?)",
+                                  (nom, date_modification, taille, duree, titre, miniature))
+                connexion.execute("INSERT OR REPLACE INTO trames VALUES (?, ?, ?, ?)", (nom, sr, octets.tobytes(), echantillons.tobytes()))
+            connexion.executemany("DELETE FROM chansons WHERE nom = ?", [(nom,) for nom in supprimees])
+            connexion.executemany("DELETE FROM trames WHERE nom = ?", [(nom,) for nom in supprimees])
+
+    connexion.close()
+    return len(modifiees)
+
+# ===== CLASSES =====
+class Bibliotheque:
+    '''
+    Index des chansons gardé sur le disque (durée, titre et miniature de la pochette), chargé en mémoire au démarrage.
+    Un changement de chanson ne fait plus qu'une recherche dans l'index, sans relire le fichier MP3 ni redimensionner sa pochette.
+    L'index des trames de chaque chanson, plus volumineux, n'est lu qu'à la demande.
+    '''
+    def __init__(self, dossier, chemin_index):
+        '''
+        Entrées : dossier (str) représentant le chemin d'accès du dossier des chansons et chemin_index (str) celui du fichier d'index
+        '''
+        self.dossier = dossier
+        self.chemin_index = chemin_index
+
+        connexion = ouvrir_index(chemin_index)
+        modifiees, supprimees = fichiers_modifies(dossier, connexion)
+        if modifiees or supprimees:
+            # L'analyse est faite par ce module lancé dans un processus à part : les processus de travail ne réexécutent
+            # ainsi pas le script de l'instrument, qui n'est pas protégé par if __name__ == "__main__"
+            connexion.close()
+            print(f"📚 Mise à jour de la bibliothèque : {len(modifiees)} chansons à analyser")
+            subprocess.run([sys.executable, __file__, dossier, chemin_index], check=True)
+            connexion = ouvrir_index(chemin_index)
+
+        self.chansons = {os.path.join(dossier, nom): (duree, titre, miniature)
+                         for nom, duree, titre, miniature in connexion.execute("SELECT nom, duree, titre, miniature FROM chansons ORDER BY nom")}
+        connexion.close()
+
+    def chemins(self):
+        '''
+        Sortie : liste des chemins d'accès des chansons, par ordre alphabétique
+        '''
+        return list(self.chansons)
+
+    def duree(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : durée de la chanson en secondes
+        '''
+        return self.chansons[chemin_acces][0]
+
+    def titre(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : titre de la chanson
+        '''
+        return self.chansons[chemin_acces][1]
+
+    def miniature(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : pochette de la chanson en 150×150 (Image), ou None si le fichier n'en contient pas
+        '''
+        miniature = self.chansons[chemin_acces][2]
+        if miniature is None:
+            return None
+        image = Image.open(io.BytesIO(miniature))
+        image.load() # Décodage sur le thread appelant (thread de travail du lecteur) plutôt qu'au premier affichage
+        return image
+
+    def index_trames(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : tuple (fréquence d'échantillonnage, position en octets de chaque trame, premier échantillon de chaque trame)
+        (voir index_mp3.indexer_trames), ou None si le fichier ne contient pas de trames MP3
+        '''
+        connexion = ouvrir_index(self.chemin_index) # Connexion propre à l'appel : la méthode est appelée par plusieurs threads
+        ligne = connexion.execute("SELECT sr, octets, echantillons FROM trames WHERE nom = ?", (os.path.relpath(chemin_acces, self.dossier),)).fetchone()
+        connexion.close()
+        if ligne is None or ligne[0] == 0:
+            return None
+        return ligne[0], np.frombuffer(ligne[1], dtype=np.int64), np.frombuffer(ligne[2], dtype=np.int64)
+
+# ===== CODE =====
+if __name__ == "__main__":
+    print(f"📚 {indexer(sys.argv[1], sys.argv[2])} chansons analysées")
@@ -0,0 +1,225 @@
+# ===== INSTALLATIONS =====
+# pip install pyo numpy
+
+# ===== IMPORTATIONS =====
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import sqlite3
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pyo import Server, SndTable, DataTable
+
+# ===== FONCTIONS =====
+def ouvrir_index(dossier_cache):
+    '''
+    Entrée : dossier_cache (str) représentant le chemin d'accès du dossier du cache
+    Sortie : connexion SQLite à l'index du cache, dont la table est créée si besoin
+    '''
+    connexion = sqlite3.connect(os.path.join(dossier_cache, "Cache PCM.sqlite"), timeout=10) # Partagé avec le processus de remplissage
+    connexion.execute('''CREATE TABLE IF NOT EXISTS pcm (
+        chemin TEXT PRIMARY KEY, fichier TEXT, date_modification REAL, taille INTEGER,
+        sr INTEGER, canaux INTEGER, images INTEGER, octets INTEGER, dernier_acces REAL)''')
+    return connexion
+
+def nom_fichier(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+    Sortie : nom du fichier PCM de la chanson dans le cache
+    '''
+    return hashlib.sha1(os.path.abspath(chemin_acces).encode("utf-8")).hexdigest() + ".pcm"
+
+def ecrire_pcm(table, chemin_pcm):
+    '''
+    Entrées : table (PyoTableObject) représentant la chanson décodée et chemin_pcm (str) le chemin d'accès du fichier à écrire
+    Sortie : tuple (fréquence d'échantillonnage, canaux, images)
+    Écrit les échantillons en float32, un canal après l'autre, pour que chaque canal puisse être projeté d'un seul bloc.
+    Le remplissage en arrière-plan et le lecteur peuvent écrire la même chanson en même temps : chacun écrit dans son propre
+    fichier temporaire, et le fichier final, identique pour les deux, est celui du dernier arrivé.
+    '''
+    canaux = len(table)
+    images = table.getSize()
+    sr = round(table.getRate() * images) # getRate donne la fréquence de lecture de la table entière à vitesse normale
+    descripteur, chemin_temporaire = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(chemin_pcm))
+    try:
+        with os.fdopen(descripteur, "wb") as fichier:
+            for canal in range(canaux):
+                np.asarray(table.getBuffer(canal)).tofile(fichier)
+        os.replace(chemin_temporaire, chemin_pcm) # Le fichier n'apparaît qu'une fois complet
+    except PermissionError:
+        # Sous Windows, un fichier projeté en mémoire ne peut pas être remplacé : on garde celui déjà écrit par l'autre processus
+        if not os.path.exists(chemin_pcm):
+            raise
+    finally:
+        if os.path.exists(chemin_temporaire):
+            os.remove(chemin_temporaire)
+    return sr, canaux, images
+
+def demarrer_serveur_decodage():
+    '''
+    Démarre dans chaque processus de travail un serveur sans carte son, nécessaire à la création des tables pyo.
+    '''
+    global serveur_decodage
+    serveur_decodage = Server(audio="manual").boot()
+
+def decoder_chanson(chemin_acces, chemin_pcm):
+    '''
+    Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson et chemin_pcm (str) celui du fichier PCM à écrire
+    Sortie : tuple (fréquence d'échantillonnage, canaux, images)
+    Décode une chanson dans le cache (exécutée dans un processus de travail).
+    '''
+    return ecrire_pcm(SndTable(chemin_acces), chemin_pcm)
+
+def etat_source(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+    Sortie : tuple (date de modification, taille) qui invalide l'entrée du cache quand le fichier change
+    '''
+    etat = os.stat(chemin_acces)
+    return etat.st_mtime, etat.st_size
+
+def remplir(dossier_cache, budget, chemins):
+    '''
+    Entrées : dossier_cache (str) représentant le chemin d'accès du dossier du cache, budget (int) la place disque maximale en octets
+    et chemins (list[str]) les chansons à décoder, par ordre de priorité
+    Sortie : nombre de chansons décodées
+    Décode en parallèle sur tous les cœurs les chansons absentes du cache ou modifiées, jusqu'à remplir le budget.
+    Les chansons déjà en cache ne sont pas évincées par ce remplissage ; celles qui ne peuvent pas être décodées sont ignorées.
+    '''
+    connexion = ouvrir_index(dossier_cache)
+    connues = {chemin: (date, taille) for chemin, date, taille in connexion.execute("SELECT chemin, date_modification, taille FROM pcm")}
+    a_decoder = [chemin for chemin in chemins if connues.get(chemin) != etat_source(chemin)]
+    occupe = connexion.execute("SELECT COALESCE(SUM(octets), 0) FROM pcm").fetchone()[0]
+
+    decodees = set()
+    fichiers = [os.path.join(dossier_cache, nom_fichier(chemin)) for chemin in a_decoder]
+    with ProcessPoolExecutor(initializer=demarrer_serveur_decodage) as executeur:
+        futurs = [executeur.submit(decoder_chanson, chemin, fichier) for chemin, fichier in zip(a_decoder, fichiers)]
+        for chemin, fichier, futur in zip(a_decoder, fichiers, futurs):
+            try:
+                sr, canaux, images = futur.result()
+            except Exception as erreur:
+                print(f"⚠️ {os.path.basename(chemin)} non mise en cache : {erreur!r}")
+                continue
+            octets = canaux * images * 4
+            if occupe + octets > budget:
+                executeur.shutdown(cancel_futures=True) # Budget atteint : les chansons restantes seront décodées à la lecture
+                break
+            occupe += octets
+            date_modification, taille = etat_source(chemin)
+            with connexion:
+                connexion.execute("INSERT OR REPLACE INTO pcm VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (chemin, os.path.basename(fichier), date_modification, taille, sr, canaux, images, octets, time.time()))
+            decodees.add(chemin)
+
+    # Fichiers décodés au-delà du budget par les processus qui n'ont pas été annulés à temps, sauf ceux enregistrés entre-temps par le lecteur
+    for chemin, fichier in zip(a_decoder, fichiers):
+        if chemin in decodees:
+            continue
+        enregistre = connexion.execute("SELECT 1 FROM pcm WHERE chemin = ?", (chemin,)).fetchone() is not None
+        if not enregistre and os.path.exists(fichier):
+            os.remove(fichier)
+    connexion.close()
+    return len(decodees)
+
+# ===== CLASSES =====
+class CachePCM:
+    '''
+    Cache sur le disque des chansons décodées, en float32 brut : une chanson en cache est chargée par projection en mémoire
+    du fichier et copie dans une table pyo, sans décodage MP3.
+    Une entrée est invalidée quand la date de modification ou la taille du fichier source change.
+    La place occupée est limitée par un budget : au-delà, les chansons jouées le moins récemment sont retirées.
+    '''
+    def __init__(self, dossier_cache, budget=2 * 1024 ** 3):
+        '''
+        Entrées : dossier_cache (str) représentant le chemin d'accès du dossier du cache (créé s'il n'existe pas)
+        et budget (int) la place disque maximale en octets
+        '''
+        self.dossier_cache = dossier_cache
+        self.budget = budget
+        os.makedirs(dossier_cache, exist_ok=True)
+        ouvrir_index(dossier_cache).close()
+
+    def remplir_en_arriere_plan(self, chemins):
+        '''
+        Entrée : chemins (list[str]) représentant les chansons à décoder, par ordre de priorité
+        Lance le décodage des chansons manquantes dans un processus à part, sans attendre la fin : les processus de travail
+        ne réexécutent ainsi pas le script de l'instrument, qui n'est pas protégé par if __name__ == "__main__".
+        '''
+        processus = subprocess.Popen([sys.executable, __file__, self.dossier_cache, str(self.budget)], stdin=subprocess.PIPE,
+                                     encoding="utf-8")
+        processus.stdin.write("".join(chemin + "\n" for chemin in chemins)) # Par l'entrée standard : la liste peut être longue
+        processus.stdin.close()
+        return processus
+
+    def charger(self, chemin_acces):
+        '''
+        Entrée : chemin_acces (str) représentant le chemin d'accès de la chanson
+        Sortie : tuple (table pyo, fréquence de lecture de la table à vitesse normale), ou None si la chanson n'est pas en cache
+        '''
+        connexion = ouvrir_index(self.dossier_cache)
+        try:
+            ligne = connexion.execute("SELECT fichier, date_modification, taille, sr, canaux, images FROM pcm WHERE chemin = ?",
+                                      (chemin_acces,)).fetchone()
+            if ligne is None or (ligne[1], ligne[2]) != etat_source(chemin_acces):
+                return None
+            fichier, _, _, sr, canaux, images = ligne
+            try:
+                pcm = np.memmap(os.path.join(self.dossier_cache, fichier), dtype=np.float32, mode="r", shape=(canaux, images))
+            except (OSError, ValueError):
+                return None # Fichier supprimé ou tronqué à la main : la chanson sera décodée à nouveau
+
+            table = DataTable(images, chnls=canaux)
+            for canal in range(canaux):
+                np.asarray(table.getBuffer(canal))[:] = pcm[canal]
+            with connexion:
+                connexion.execute("UPDATE pcm SET dernier_acces = ? WHERE chemin = ?", (time.time(), chemin_acces))
+            return table, sr / images
+        finally:
+            connexion.close()
+
+    def enregistrer(self, chemin_acces, table):
+        '''
+        Entrées : chemin_acces (str) représentant le chemin d'accès de la chanson et table (SndTable) la chanson décodée à la lecture
+        Ajoute au cache une chanson qui vient d'être décodée, en retirant si besoin les chansons jouées le moins récemment.
+        Sans effet si le remplissage en arrière-plan l'a mise en cache pendant le décodage.
+        '''
+        fichier = nom_fichier(chemin_acces)
+        date_modification, taille = etat_source(chemin_acces)
+        connexion = ouvrir_index(self.dossier_cache)
+        try:
+            ligne = connexion.execute("SELECT date_modification, taille FROM pcm WHERE chemin = ?", (chemin_acces,)).fetchone()
+            if ligne == (date_modification, taille) and os.path.exists(os.path.join(self.dossier_cache, fichier)):
+                return
+            sr, canaux, images = ecrire_pcm(table, os.path.join(self.dossier_cache, fichier))
+            with connexion:
+                connexion.execute("INSERT OR REPLACE INTO pcm VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (chemin_acces, fichier, date_modification, taille, sr, canaux, images, canaux * images * 4, time.time()))
+            self._evincer(connexion)
+        finally:
+            connexion.close()
+
+    def _evincer(self, connexion):
+        '''
+        Entrée : connexion (sqlite3.Connection) représentant l'index du cache
+        Retire les chansons jouées le moins récemment jusqu'à repasser sous le budget.
+        '''
+        occupe = connexion.execute("SELECT COALESCE(SUM(octets), 0) FROM pcm").fetchone()[0]
+        for chemin, fichier, octets in connexion.execute("SELECT chemin, fichier, octets FROM pcm ORDER BY dernier_acces").fetchall():
+            if occupe <= self.budget:
+                break
+            with connexion:
+                connexion.execute("DELETE FROM pcm WHERE chemin = ?", (chemin,))
+            try:
+                os.remove(os.path.join(self.dossier_cache, fichier))
+            except OSError:
+                pass # Déjà supprimé
+            occupe -= octets
+
+# ===== CODE =====
+if __name__ == "__main__":
+    chemins = [ligne.rstrip("\n") for ligne in sys.stdin if ligne.strip()]
+    print(f"💽 {remplir(sys.argv[1], int(sys.argv[2]), chemins)} chansons décodées dans le cache PCM")
@@ -0,0 +1,58 @@
+# ===== INSTALLATIONS =====
+# pip install pillow
+
+# ===== IMPORTATIONS =====
+import os
+from PIL import Image, ImageTk
+
+# ===== CLASSES =====
+class CalquesManette:
+    '''
+    Image de la manette et calques des boutons affichés dans un canevas Tkinter.
+    Chaque calque est décodé une seule fois au démarrage, recadré sur sa partie visible et placé dans le canevas comme un élément caché :
+    afficher ou masquer un bouton ne change que la visibilité de l'élément, sans recomposer ni recréer d'image.
+    '''
+    def __init__(self, canevas, dossier, fond="Manette.png"):
+        '''
+        Entrées : canevas (tk.Canvas) dans lequel dessiner, dossier (str) représentant le chemin d'accès du dossier des calques
+        et fond (str) le nom du fichier de l'image de base
+        '''
+        self.canevas = canevas
+        self.images = [] # Références des PhotoImage, sans lesquelles Tkinter les efface
+        self.elements = {} # Chemin d'accès du calque -> identifiant de l'élément du canevas
+        self.actifs = set()
+
+        image_fond = Image.open(os.path.join(dossier, fond)).convert("RGBA")
+        canevas.config(width=image_fond.width, height=image_fond.height)
+        self._ajouter_element(image_fond, 0, 0, "normal")
+
+        for nom in sorted(os.listdir(dossier)):
+            if nom.endswith(".png") and nom != fond:
+                image = Image.open(os.path.join(dossier, nom)).convert("RGBA")
+                zone = image.getchannel("A").getbbox() # Partie non transparente du calque
+                if zone is not None:
+                    self.elements[os.path.join(dossier, nom)] = self._ajouter_element(image.crop(zone), zone[0], zone[1], "hidden")
+
+    def _ajouter_element(self, image, x, y, etat):
+        '''
+        Entrées : image (Image) à afficher, x et y (int) la position de son coin supérieur gauche et etat (str) "normal" ou "hidden"
+        Sortie : identifiant de l'élément créé dans le canevas
+        '''
+        image_tk = ImageTk.PhotoImage(image)
+        self.images.append(image_tk)
+        return self.canevas.create_image(x, y, image=image_tk, anchor="nw", state=etat)
+
+    def basculer(self, calque):
+        '''
+        Entrée : calque (str) représentant le chemin d'accès du calque
+        Affiche le calque s'il est caché et inversement ; les calques inconnus sont ignorés.
+        '''
+        element = self.elements.get(calque)
+        if element is None:
+            return
+        if calque in self.actifs:
+            self.actifs.remove(calque)
+            self.canevas.itemconfigure(element, state="hidden")
+        else:
+            self.actifs.add(calque)
+            self.canevas.itemconfigure(element, state="normal")
@@ -0,0 +1,71 @@
+# ===== IMPORTATIONS =====
+import sys
+import threading
+import traceback
+
+# ===== CLASSES =====
+class CanalInterface:
+    '''
+    Canal entre les threads de l'instrument (réception OSC, moteur audio, lecteur) et l'interface graphique Tkinter.
+    Les widgets ne sont modifiés que par la boucle principale de Tkinter, qui vide le canal une fois par image.
+    Les threads qui envoient ne sont jamais bloqués par l'interface : ils ne font que déposer une demande.
+    Une action qui échoue est signalée puis ignorée, sans interrompre le canal.
+    '''
+    def __init__(self, root, file_controle, periode=16):
+        '''
+        Entrées : root (tk.Tk) représentant la fenêtre principale, file_controle (queue.SimpleQueue) la file des actions
+        (fonction, arguments) à exécuter dans l'ordre et periode (int) l'intervalle en ms entre deux images
+        '''
+        self.root = root
+        self.file_controle = file_controle
+        self.periode = periode
+        self.mises_a_jour = {} # Fonction d'affichage -> arguments de la dernière demande
+        self.verrou = threading.Lock()
+
+    def envoyer(self, action, *arguments):
+        '''
+        Entrées : action (fonction) et arguments à lui passer
+        Demande l'exécution de l'action sur le thread de l'interface ; les actions sont exécutées une fois chacune, dans l'ordre.
+        '''
+        self.file_controle.put((action, arguments))
+
+    def demander(self, affichage, *arguments):
+        '''
+        Entrées : affichage (fonction) qui redessine une partie de l'interface et arguments à lui passer
+        Demande un rafraîchissement : plusieurs demandes pour le même affichage pendant une image n'en font qu'une, avec les derniers arguments.
+        '''
+        with self.verrou:
+            self.mises_a_jour[affichage] = arguments
+
+    def planifier(self, delai, action, *arguments):
+        '''
+        Entrées : delai (int) en ms, action (fonction) et arguments à lui passer
+        Exécute l'action sur le thread de l'interface après le délai, sans attendre (ex : éteindre un calque après un clignotement).
+        '''
+        self.file_controle.put((self.root.after, (delai, action) + arguments))
+
+    def _executer(self, action, arguments):
+        '''
+        Entrées : action (fonction) et arguments à lui passer
+        Exécute l'action ; une exception est affichée avec sa trace au lieu d'arrêter le traitement du canal.
+        '''
+        try:
+            action(*arguments)
+        except Exception:
+            print(f"⚠️ Action {getattr(action, '__qualname__', action)} de l'interface ignorée :", file=sys.stderr)
+            traceback.print_exc()
+
+    def traiter(self):
+        '''
+        Exécute les actions en attente, puis chaque rafraîchissement demandé une seule fois, et se reprogramme pour l'image suivante.
+        Doit être appelée une première fois depuis le thread de Tkinter.
+        '''
+        while not self.file_controle.empty():
+            self._executer(*self.file_controle.get())
+
+        with self.verrou:
+            mises_a_jour, self.mises_a_jour = self.mises_a_jour, {}
+        for affichage, arguments in mises_a_jour.items():
+            self._executer(affichage, arguments)
+
+        self.root.after(self.periode, self.traiter)
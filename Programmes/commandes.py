@@ -0,0 +1,62 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+import sys
+import time
+import traceback
+from collections import deque
+
+# ===== CLASSES =====
+class FileCommandes:
+    '''
+    File des commandes de contrôle (changement de paramètre, d'effet, de chanson...) exécutées par le moteur audio
+    au début de chaque tampon, juste avant le calcul du graphe.
+    Toutes les modifications du graphe ont ainsi lieu sur un seul thread, à la limite d'un tampon, sans concurrence avec le calcul du son.
+    Les threads qui envoient n'attendent jamais : un ajout dans une deque ne prend pas de verrou.
+    Une commande qui échoue est signalée puis ignorée, sans interrompre le moteur audio ni les commandes suivantes.
+    '''
+    def __init__(self, serveur):
+        '''
+        Entrée : serveur (Server) représentant le serveur audio démarré, dont la fonction de rappel par tampon est réservée à la file
+        '''
+        self.commandes = deque()
+        self.nombre = 0 # Commandes exécutées depuis le début
+        self.attente_totale = 0.0 # Somme des délais entre l'envoi et l'exécution, en secondes
+        self.attente_maximale = 0.0
+        self.duree_maximale = 0.0 # Plus longue durée d'exécution des commandes d'un tampon, en secondes
+        serveur.setCallback(self.appliquer)
+
+    def envoyer(self, action, *arguments):
+        '''
+        Entrées : action (fonction) et arguments à lui passer
+        Demande l'exécution de l'action par le moteur audio au début du prochain tampon.
+        '''
+        self.commandes.append((action, arguments, time.perf_counter()))
+
+    def appliquer(self):
+        '''
+        Appelée par le moteur audio avant chaque tampon : exécute dans l'ordre les commandes arrivées depuis le tampon précédent.
+        '''
+        if not self.commandes:
+            return
+        debut = time.perf_counter()
+        while self.commandes:
+            action, arguments, date = self.commandes.popleft()
+            try:
+                action(*arguments)
+            except Exception:
+                print(f"⚠️ Commande {getattr(action, '__qualname__', action)} ignorée :", file=sys.stderr)
+                traceback.print_exc()
+            attente = debut - date
+            self.nombre += 1
+            self.attente_totale += attente
+            self.attente_maximale = max(self.attente_maximale, attente)
+        self.duree_maximale = max(self.duree_maximale, time.perf_counter() - debut)
+
+    def statistiques(self):
+        '''
+        Sortie : tuple (commandes exécutées, attente moyenne en ms, attente maximale en ms, plus longue durée d'exécution d'un tampon en ms)
+        '''
+        moyenne = self.attente_totale / self.nombre if self.nombre else 0.0
+        return self.nombre, moyenne * 1000, self.attente_maximale * 1000, self.duree_maximale * 1000
@@ -0,0 +1,132 @@
+# ===== IMPORTATIONS =====
+import os
+import json
+import bisect
+import threading
+
+# ===== CLASSES =====
+class Courbe:
+    '''
+    Courbe de conversion linéaire par morceaux, précalculée dans une table pour qu'une conversion ne coûte qu'un accès par indice.
+    '''
+    def __init__(self, entree, sortie, taille=4096):
+        '''
+        Entrées : entree (list[float]) représentant les abscisses croissantes des points de la courbe,
+        sortie (list[float]) les valeurs correspondantes et taille (int) le nombre de cases de la table
+        '''
+        if len(entree) != len(sortie) or len(entree) < 2:
+            raise ValueError("Une courbe doit avoir au moins deux points, avec autant d'entrées que de sorties")
+
+        self.minimum = entree[0]
+        self.echelle = (taille - 1) / (entree[-1] - entree[0])
+        self.table = []
+        for i in range(taille):
+            x = self.minimum + i / self.echelle
+            j = min(max(bisect.bisect_right(entree, x) - 1, 0), len(entree) - 2) # Segment contenant x
+            t = (x - entree[j]) / (entree[j + 1] - entree[j])
+            self.table.append(sortie[j] + t * (sortie[j + 1] - sortie[j]))
+
+    def __call__(self, valeur):
+        '''
+        Entrée : valeur (float) à convertir
+        Sortie : valeur convertie (les valeurs hors de la courbe sont ramenées à ses extrémités)
+        '''
+        i = int((valeur - self.minimum) * self.echelle + 0.5)
+        return self.table[min(max(i, 0), len(self.table) - 1)]
+
+class TableCorrespondances:
+    '''
+    Correspondances entre les adresses OSC et les actions de l'instrument, décrites dans un fichier JSON.
+    Chaque message est traité par une seule recherche dans un dictionnaire, quel que soit le nombre d'adresses.
+    Le fichier peut être modifié pendant que l'instrument tourne : il est relu sans redémarrer le serveur audio.
+    Les adresses continues (boussole, joystick) ne sont pas traitées à chaque message : seule leur dernière valeur est gardée,
+    puis appliquée une fois par période de contrôle par appliquer_valeurs_continues.
+    '''
+    def __init__(self, chemin, actions):
+        '''
+        Entrées : chemin (str) représentant le chemin d'accès du fichier JSON et actions (dict) associant à chaque nom d'action
+        la fonction de l'instrument appelée avec la valeur reçue puis les paramètres de l'adresse
+        '''
+        self.chemin = chemin
+        self.actions = actions
+        self.date_modification = None
+        self.adresses = {}
+        self.valeurs_continues = {} # Dernière valeur reçue de chaque adresse continue, en attente d'application
+        self.verrou = threading.Lock()
+        self.recharger()
+
+    def recharger(self):
+        '''
+        Relit le fichier et remplace la table d'un seul coup : les messages en cours de traitement utilisent l'ancienne ou la nouvelle table.
+        En cas d'erreur dans le fichier, l'ancienne table est conservée.
+        '''
+        date_modification = os.path.getmtime(self.chemin)
+        try:
+            with open(self.chemin, encoding="utf-8") as fichier:
+                description = json.load(fichier)
+            courbes = {nom: Courbe(points["entree"], points["sortie"]) for nom, points in description.get("courbes", {}).items()}
+
+            adresses = {}
+            for adresse, entree in description["adresses"].items():
+                parametres = dict(entree)
+                action = self.actions[parametres.pop("action")]
+                front = parametres.pop("front", False) # Bouton : l'action n'a lieu qu'à l'appui
+                continu = parametres.pop("continu", False) # Capteur ou joystick : seule la dernière valeur compte
+                for nom, valeur in parametres.items():
+                    if isinstance(valeur, str) and valeur in courbes:
+                        parametres[nom] = courbes[valeur] # Les noms de courbes sont remplacés par les tables précalculées
+                adresses[adresse] = (action, front, continu, parametres)
+        except (OSError, ValueError, KeyError) as erreur:
+            print(f"⚠️ Correspondances non rechargées ({os.path.basename(self.chemin)}) : {erreur!r}")
+            self.date_modification = date_modification
+            return
+
+        self.adresses = adresses
+        self.date_modification = date_modification
+        print(f"🗺️ Correspondances chargées : {len(adresses)} adresses")
+
+    def recharger_si_modifie(self):
+        '''
+        Recharge le fichier s'il a été modifié depuis la dernière lecture.
+        '''
+        try:
+            if os.path.getmtime(self.chemin) != self.date_modification:
+                self.recharger()
+        except OSError:
+            pass # Fichier en cours d'écriture ou renommé : on réessaiera plus tard
+
+    def adresses_connues(self):
+        '''
+        Sortie : liste des adresses OSC associées à une action
+        '''
+        return list(self.adresses)
+
+    def traiter(self, adresse, *args):
+        '''
+        Entrées : adresse (str) désignant le chemin d'envoi des données OSC et args les valeurs reçues
+        Appelle l'action associée à l'adresse ; les adresses inconnues et les relâchements de boutons sont ignorés.
+        Pour une adresse continue, la valeur est seulement mémorisée.
+        '''
+        entree = self.adresses.get(adresse)
+        if entree is None or not args:
+            return
+        action, front, continu, parametres = entree
+        if continu:
+            with self.verrou:
+                self.valeurs_continues[adresse] = args[0]
+            return
+        if front and args[0] != True:
+            return
+        action(args[0], **parametres)
+
+    def appliquer_valeurs_continues(self):
+        '''
+        Appelle une fois l'action de chaque adresse continue qui a reçu une valeur depuis le dernier appel, avec la plus récente.
+        '''
+        with self.verrou:
+            valeurs, self.valeurs_continues = self.valeurs_continues, {}
+        for adresse, valeur in valeurs.items():
+            entree = self.adresses.get(adresse)
+            if entree is not None: # L'adresse a pu disparaître lors d'un rechargement
+                action, _, _, parametres = entree
+                action(valeur, **parametres)
@@ -0,0 +1,81 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+from pyo import SigTo, Chorus, Disto, Delay, Freeverb, Trig, SDelay, TrigFunc
+
+# ===== CLASSES =====
+class RackEffets:
+    '''
+    Bus d'effets construit une seule fois par session sur la sortie du lecteur (son accéléré ou filtré).
+    Chaque effet est un départ parallèle dont le niveau monte ou descend en douceur quand on l'active ou le désactive ;
+    un effet désactivé est mis en pause une fois son niveau à zéro et ne consomme plus de calcul.
+    Les effets sont réglés par la file de commandes et mis en pause par le moteur audio : tout a lieu sur son thread, sans verrou.
+    '''
+    def __init__(self, source, duree_fondu=0.05):
+        '''
+        Entrées : source (PyoObject) représentant le son à traiter et duree_fondu (float) la durée en secondes des fondus d'activation
+        '''
+        self.duree_fondu = duree_fondu
+        self.volumes = {"chorus": 0.5, "distorsion": 0.5, "echo": 0.3, "reverberation": 0.6} # Niveau de chaque effet une fois activé
+        self.actifs = {nom: False for nom in self.volumes}
+        self.niveaux = {nom: SigTo(value=0, time=duree_fondu) for nom in self.volumes}
+
+        self.effets = {
+            "chorus": Chorus(source, depth=0.8, feedback=0.4, bal=0.7, mul=self.niveaux["chorus"]),
+            "distorsion": Disto(source, drive=0.8, slope=0.8, mul=self.niveaux["distorsion"]),
+            "echo": Delay(source, delay=0.3, feedback=0.6, mul=self.niveaux["echo"]),
+            "reverberation": Freeverb(source, size=0.9, damp=0.3, bal=0.8, mul=self.niveaux["reverberation"]),
+        }
+        for effet in self.effets.values():
+            effet.stop()
+
+        # Mise en pause différée : un déclencheur retardé de la durée du fondu, préparé d'avance pour ne rien créer au moment de l'appui
+        self.declencheurs = {nom: Trig().stop() for nom in self.volumes}
+        self.retards = {nom: SDelay(self.declencheurs[nom], delay=duree_fondu, maxdelay=max(1, duree_fondu)) for nom in self.volumes}
+        self.mises_en_pause = [TrigFunc(self.retards[nom], self._mettre_en_pause, arg=nom) for nom in self.volumes]
+
+    def basculer(self, nom):
+        '''
+        Entrée : nom (str) représentant l'effet ("chorus", "distorsion", "echo" ou "reverberation")
+        Sortie : nouvel état de l'effet (booléen)
+        Active l'effet s'il est désactivé et inversement.
+        '''
+        actif = not self.actifs[nom]
+        self.regler(nom, actif)
+        return actif
+
+    def regler(self, nom, actif):
+        '''
+        Entrées : nom (str) représentant l'effet et actif (bool) l'état voulu
+        Active ou désactive l'effet ; sans effet s'il est déjà dans l'état voulu.
+        '''
+        if actif == self.actifs[nom]:
+            return
+        self.actifs[nom] = actif
+
+        if actif:
+            self.effets[nom].out() # Reprise du calcul, le niveau part de zéro
+            self.niveaux[nom].value = self.volumes[nom]
+        else:
+            self.niveaux[nom].value = 0
+            self.declencheurs[nom].play() # La pause aura lieu à la fin du fondu
+
+    def _mettre_en_pause(self, nom):
+        '''
+        Entrée : nom (str) représentant l'effet
+        Appelée par le moteur audio à la fin du fondu de sortie : arrête le calcul de l'effet s'il n'a pas été réactivé entre-temps.
+        Les mémoires internes (ligne à retard, queue de réverbération) sont vidées, sinon l'effet rejouerait leur contenu à sa réactivation.
+        '''
+        if not self.actifs[nom]:
+            effet = self.effets[nom]
+            effet.stop()
+            if hasattr(effet, "reset"): # Disto n'a pas de mémoire
+                effet.reset()
+
+    def est_actif(self, nom):
+        '''
+        Entrée : nom (str) représentant l'effet
+        Sortie : True si l'effet est activé
+        '''
+        return self.actifs[nom]
@@ -0,0 +1,112 @@
+# ===== INSTALLATIONS =====
+# pip install numpy
+
+# ===== IMPORTATIONS =====
+import os
+import tempfile
+import numpy as np
+
+# Débits en kbit/s de la couche III selon l'indice de l'en-tête : MPEG-1, puis MPEG-2 et 2.5
+DEBITS_MPEG1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+DEBITS_MPEG2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+FREQUENCES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]} # Version de l'en-tête -> fréquences
+MARGE_TRAMES = 2 # Trames décodées avant la position voulue : le réservoir de bits d'une trame peut être dans les précédentes
+
+# ===== FONCTIONS =====
+def taille_id3(donnees):
+    '''
+    Entrée : donnees (bytes) représentant le début du fichier
+    Sortie : taille en octets de l'étiquette ID3v2 en tête du fichier (0 s'il n'y en a pas)
+    '''
+    if donnees[:3] != b"ID3" or len(donnees) < 10:
+        return 0
+    taille = (donnees[6] << 21) | (donnees[7] << 14) | (donnees[8] << 7) | donnees[9] # Entier « synchsafe » sur 4 × 7 bits
+    return 10 + taille + (10 if donnees[5] & 0x10 else 0)
+
+def lire_entete(entete):
+    '''
+    Entrée : entete (int) représentant les 4 octets d'un en-tête de trame
+    Sortie : tuple (taille de la trame en octets, échantillons par canal, fréquence d'échantillonnage), ou None si l'en-tête
+    n'est pas celui d'une trame MPEG couche III valide
+    '''
+    if (entete >> 21) & 0x7FF != 0x7FF:
+        return None
+    version, couche = (entete >> 19) & 3, (entete >> 17) & 3
+    indice_debit, indice_frequence, remplissage = (entete >> 12) & 0xF, (entete >> 10) & 3, (entete >> 9) & 1
+    if version == 1 or couche != 1 or indice_debit in (0, 15) or indice_frequence == 3:
+        return None
+    frequence = FREQUENCES[version][indice_frequence]
+    if version == 3:
+        return 144000 * DEBITS_MPEG1[indice_debit] // frequence + remplissage, 1152, frequence
+    return 72000 * DEBITS_MPEG2[indice_debit] // frequence + remplissage, 576, frequence
+
+def trame_valide(donnees, position, frequence=None):
+    '''
+    Entrées : donnees (bytes) représentant le contenu du fichier, position (int) la position d'un en-tête possible
+    et frequence (int ou None) la fréquence d'échantillonnage attendue
+    Sortie : tuple (taille, échantillons par canal, fréquence) de la trame, ou None si ce n'est pas un début de trame
+    Un en-tête n'est accepté que s'il est suivi d'un autre en-tête (ou de la fin du fichier) : les octets 0xFFF
+    qui apparaissent par hasard dans les données audio ne sont pas pris pour des trames.
+    '''
+    trame = lire_entete(int.from_bytes(donnees[position:position + 4], "big"))
+    if trame is None or (frequence is not None and trame[2] != frequence):
+        return None
+    suivante = position + trame[0]
+    if suivante + 4 <= len(donnees) and lire_entete(int.from_bytes(donnees[suivante:suivante + 4], "big")) is None:
+        return None
+    return trame
+
+def indexer_trames(chemin_acces):
+    '''
+    Entrée : chemin_acces (str) représentant le chemin d'accès du fichier MP3
+    Sortie : tuple (fréquence d'échantillonnage, position en octets de chaque trame (int64), premier échantillon de chaque trame (int64)),
+    avec une case de plus pour la fin de la dernière trame ; la fréquence vaut 0 si le fichier ne contient aucune trame MP3
+    Parcourt les en-têtes de trames sans rien décoder. La trame d'information Xing/Info des encodeurs, qui ne contient pas de son,
+    est ignorée ; en cas de données corrompues, le parcours se resynchronise sur l'en-tête suivant.
+    '''
+    with open(chemin_acces, "rb") as fichier:
+        donnees = fichier.read()
+
+    octets, echantillons = [], []
+    position = taille_id3(donnees)
+    echantillon = 0
+    frequence = None
+    while position + 4 <= len(donnees):
+        trame = trame_valide(donnees, position, frequence)
+        if trame is None:
+            position = donnees.find(b"\xff", position + 1) # Resynchronisation sur le prochain octet de synchronisation
+            if position < 0:
+                position = len(donnees)
+            continue
+        taille, par_trame, frequence = trame
+        if not octets and (b"Xing" in donnees[position + 4:position + 40] or b"Info" in donnees[position + 4:position + 40]):
+            position += taille
+            continue
+        octets.append(position)
+        echantillons.append(echantillon)
+        echantillon += par_trame
+        position += taille
+
+    octets.append(min(position, len(donnees))) # Fin de la dernière trame, pour connaître la longueur de chaque extrait
+    echantillons.append(echantillon)
+    return frequence or 0, np.array(octets, dtype=np.int64), np.array(echantillons, dtype=np.int64)
+
+def ecrire_extrait(chemin_acces, frequence, octets, echantillons, debut, duree):
+    '''
+    Entrées : chemin_acces (str) représentant le chemin d'accès du fichier MP3, frequence, octets et echantillons son index
+    de trames (voir indexer_trames), debut (float) la position voulue en secondes et duree (float) la durée de l'extrait en secondes
+    Sortie : tuple (chemin d'accès d'un fichier MP3 temporaire contenant les trames de l'extrait, secondes à sauter au début
+    de ce fichier pour arriver à la position voulue)
+    Seules les trames de l'extrait sont copiées : leur décodage ne dépend que de la durée de l'extrait, pas de sa position
+    dans la chanson. Le fichier temporaire doit être supprimé par l'appelant.
+    '''
+    premiere = max(int(np.searchsorted(echantillons, debut * frequence, side="right")) - 1 - MARGE_TRAMES, 0)
+    derniere = min(int(np.searchsorted(echantillons, (debut + duree) * frequence, side="right")), len(octets) - 1)
+    with open(chemin_acces, "rb") as fichier:
+        fichier.seek(octets[premiere])
+        donnees = fichier.read(octets[derniere] - octets[premiere])
+
+    descripteur, chemin_extrait = tempfile.mkstemp(suffix=".mp3")
+    with os.fdopen(descripteur, "wb") as extrait:
+        extrait.write(donnees)
+    return chemin_extrait, max(debut - echantillons[premiere] / frequence, 0.0) # Les trames de marge sont sautées au chargement
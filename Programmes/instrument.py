@@ -0,0 +1,306 @@
+# ===== INSTALLATIONS =====
+# pip install mutagen pillow pyo
+
+# ===== IMPORTATIONS =====
+import os
+from pyo import SigTo
+from batterie import BanqueBatterie, SequenceurBatterie
+from lecteur import Lecteur
+from commandes import FileCommandes
+from bibliotheque import Bibliotheque
+from cache_pcm import CachePCM
+from analyse_chansons import AnalysesChansons
+from effets import RackEffets
+from correspondances import TableCorrespondances
+
+# ===== CLASSES =====
+class Instrument:
+    '''
+    Partie sonore du méta-instrument, commune aux deux interfaces (manette et iPhone) et au rendu hors ligne :
+    graphe audio (lecteur, effets, batterie) et actions déclenchées par les messages OSC d'après le fichier de correspondances.
+    L'affichage est confié à un objet interface facultatif : sans interface, l'instrument tourne sans fenêtre ni API Windows.
+    Les modifications du graphe audio passent par une file de commandes exécutée par le moteur audio au début de chaque tampon ;
+    l'état affiché (mode, effets, vitesse, fréquence) est tenu à jour côté Python, sans relire les objets pyo.
+    '''
+    PERIODE_CONTROLE = 100 # Période d'application des commandes continues en ms, égale à la durée des rampes de vitesse et de fréquence
+
+    def __init__(self, serveur, dossier_chansons, chemin_correspondances, file_controle, interface=None, dossier_sons_batterie=None, duree_fondu=0,
+                 tempo_batterie=120, dossier_cache_pcm=None, budget_cache_pcm=2 * 1024 ** 3, analyser_chansons=True):
+        '''
+        Entrées : serveur (Server) représentant le serveur audio, dossier_chansons (str) le chemin d'accès du dossier des chansons,
+        chemin_correspondances (str) celui du fichier de correspondances OSC, file_controle (queue.SimpleQueue) la file des actions
+        exécutées par le thread de contrôle, interface (objet ou None) l'interface graphique, dossier_sons_batterie (str ou None)
+        le dossier des sons de batterie, duree_fondu (float) la durée en secondes du fondu enchaîné entre deux chansons
+        (0 pour enchaîner sans blanc), tempo_batterie (float) le tempo en battements par minute de la grille du mode de batterie
+        quantifié, dossier_cache_pcm (str ou None) le dossier du cache des chansons décodées (None pour décoder chaque chanson
+        à chaque lecture), budget_cache_pcm (int) la place disque maximale de ce cache en octets et analyser_chansons (bool)
+        indiquant si les chansons pas encore analysées doivent l'être en arrière-plan (False pour ne pas charger la machine pendant une mesure)
+        Le serveur audio doit être démarré avant la création de l'instrument.
+        '''
+        self.file_controle = file_controle
+        self.interface = interface
+        self.commandes = FileCommandes(serveur) # Commandes appliquées par le moteur audio à la limite d'un tampon
+
+        self.bibliotheque = Bibliotheque(dossier_chansons, os.path.join(dossier_chansons, "Bibliothèque.sqlite")) # Index des chansons, mis à jour si des fichiers ont changé
+        self.musiques = self.bibliotheque.chemins()
+        self.analyses = AnalysesChansons(os.path.join(dossier_chansons, "Analyses")) # Temps forts, attaques et bandes de chaque chanson
+        if analyser_chansons:
+            self.analyses.mettre_a_jour_en_arriere_plan(self.musiques)
+        self.cache_pcm = None
+        if dossier_cache_pcm is not None:
+            self.cache_pcm = CachePCM(dossier_cache_pcm, budget_cache_pcm)
+            self.cache_pcm.remplir_en_arriere_plan(self.musiques) # Décodage des chansons manquantes sur tous les cœurs
+
+        self.vitesse = SigTo(value=1, time=self.PERIODE_CONTROLE / 1000) # Variable pour ajuster la vitesse de la musique
+        self.vitesse_actuelle = 1 # Dernière vitesse demandée
+        self.vitesse_fixe = 1 # Définition d'une vitesse figée pour le verrouillage
+        self.frequence = SigTo(value=1000, time=self.PERIODE_CONTROLE / 1000) # Variable pour ajuster le filtre passe-bande
+        self.frequence_actuelle = 1000 # Dernière fréquence demandée
+        self.frequence_fixe = 300 # Définition d'une fréquence figée pour le verrouillage
+        self.verrouillage_vitesse = False # Si verrouillage_vitesse vaut False, on peut modifier la vitesse ; sinon, on la fige
+        self.verrouillage_frequence = False # Si verrouillage_frequence vaut False, on peut modifier la fréquence ; sinon, on la fige
+
+        self.lecteur = Lecteur(self.musiques, self.vitesse, self.frequence, file_controle, au_changement=self._chanson_changee,
+                               preparer=self.bibliotheque.miniature, fondu=duree_fondu,
+                               commandes=self.commandes, cache=self.cache_pcm,
+                               index_trames=self.bibliotheque.index_trames) # Graphe audio persistant et préchargement de la chanson suivante
+        self.selecteur_audio = self.lecteur.selecteur # Sélectionneur pour basculer entre changement de vitesse et son filtré
+        self.mode = 0 # 0 : mode vitesse, 1 : mode fréquence (voix du sélectionneur)
+        self.rack_effets = RackEffets(self.selecteur_audio) # Effets construits une seule fois, activés et désactivés par fondu
+        self.effets_actifs = {nom: False for nom in self.rack_effets.volumes} # État demandé de chaque effet
+        self.banque_batterie = BanqueBatterie(dossier_sons_batterie, self.vitesse) if dossier_sons_batterie is not None else None
+        self.sequenceur_batterie = SequenceurBatterie(self.banque_batterie, self.vitesse, tempo=tempo_batterie) if self.banque_batterie is not None else None
+        self.batterie_quantifiee = False # Si batterie_quantifiee vaut True, les coups sont calés sur la grille et ajoutés à la boucle
+
+        self.correspondances = TableCorrespondances(chemin_correspondances, {
+            "regler_vitesse_frequence": self.regler_vitesse_frequence,
+            "verrouiller_vitesse": self.verrouiller_vitesse,
+            "verrouiller_frequence": self.verrouiller_frequence,
+            "basculer_effet": self.basculer_effet,
+            "jouer_batterie": self.jouer_batterie,
+            "changer_mode_batterie": self.changer_mode_batterie,
+            "changer_mode": self.changer_mode,
+            "chanson_suivante": self.chanson_suivante,
+            "deplacer_dans_chanson": self.deplacer_dans_chanson,
+            "poser_repere": self.poser_repere,
+            "aller_au_repere": self.aller_au_repere,
+            "changer_fenetre": self.changer_fenetre,
+        })
+
+    def jouer_chanson(self, index):
+        '''
+        Entrée : index (entier) représentant le numéro de la chanson dans la file de lecture
+        Demande au lecteur de passer à la chanson voulue ; si elle a déjà été préchargée, le changement est immédiat.
+        L'enchaînement automatique en fin de chanson est géré par le lecteur lui-même.
+        '''
+        self.lecteur.jouer(index)
+
+    def caracteristiques_actuelles(self):
+        '''
+        Sortie : dictionnaire des caractéristiques de la chanson en cours à la position de lecture actuelle
+        (voir AnalyseChanson.caracteristiques), ou None si la chanson n'a pas encore été analysée
+        Ne fait aucun calcul de spectre : les valeurs sont lues dans l'analyse faite à l'avance.
+        '''
+        index, position = self.lecteur.position()
+        return self.analyses.caracteristiques(self.musiques[index], position)
+
+    def fermer(self):
+        '''
+        Arrête les threads de décodage du lecteur, pour qu'un instrument remplacé par un autre ne laisse rien tourner.
+        '''
+        self.lecteur.fermer()
+
+    def _chanson_changee(self, index, pochette):
+        '''
+        Entrées : index (entier) représentant le numéro de la nouvelle chanson et pochette (Image ou None) sa miniature tirée de la bibliothèque
+        Appelée sur le thread de contrôle à chaque changement de chanson.
+        '''
+        chemin_fichier = self.musiques[index]
+        print(f"🎵 Lecture de : {self.bibliotheque.titre(chemin_fichier)}")
+        if self.interface is not None:
+            self.interface.chanson_changee(chemin_fichier, pochette)
+
+    def _rafraichir(self):
+        '''
+        Demande à l'interface d'afficher les nouveaux paramètres.
+        '''
+        if self.interface is not None:
+            self.interface.rafraichir()
+
+    def _basculer_calque(self, calque):
+        '''
+        Entrée : calque (str ou None) représentant le nom du calque du bouton
+        Demande à l'interface d'afficher ou de masquer le calque du bouton.
+        '''
+        if self.interface is not None and calque is not None:
+            self.interface.basculer_calque(calque)
+
+    def ajuster_parametres(self, address, *args):
+        '''
+        Entrées : address (string) désignant le chemin d'envoi des données OSC et args (float) représentant la valeur de l'adresse
+        Gère les ajustements des paramètres de la chanson en fonction des données OSC reçues.
+        L'action à effectuer pour chaque adresse est décrite dans le fichier de correspondances.
+        '''
+        self.correspondances.traiter(address, *args)
+
+    def regler_vitesse_frequence(self, valeur, courbe_vitesse, courbe_frequence):
+        '''
+        Entrées : valeur (float) représentant la position du joystick ou de la boussole et courbe_vitesse et courbe_frequence (Courbe)
+        les conversions vers chaque échelle
+        Modifie la vitesse ou la fréquence selon le mode actuel, sauf si elle est verrouillée.
+        '''
+        if self.mode == 0: # Modification de la vitesse
+            nouvelle_vitesse = courbe_vitesse(valeur) # Conversion en échelle [0.25, 1.75]
+
+            if not self.verrouillage_vitesse: # Mise à jour de la vitesse seulement si verrouillage = False
+                print(f"🔓 Vitesse de la musique : {nouvelle_vitesse:.2f}x")
+                self.vitesse_actuelle = nouvelle_vitesse
+                self.commandes.envoyer(setattr, self.vitesse, "value", nouvelle_vitesse)
+            else:
+                print(f"🔒 Vitesse verrouillée à {self.vitesse_fixe:.2f}x")
+            self._rafraichir()
+
+        elif self.mode == 1: # Modification de la fréquence
+            nouvelle_frequence = courbe_frequence(valeur) # Conversion en échelle [300, 5000]
+
+            if not self.verrouillage_frequence: # Mise à jour de la fréquence seulement si verrouillage_frequence = False
+                print(f"🔓 Valeur de la fréquence : {nouvelle_frequence:.2f} Hz")
+                self.frequence_actuelle = nouvelle_frequence
+                self.commandes.envoyer(setattr, self.frequence, "value", nouvelle_frequence)
+            else:
+                print(f"🔒 Fréquence verrouillée à {self.frequence_fixe:.2f} Hz")
+            self._rafraichir()
+
+    def verrouiller_vitesse(self, valeur, calque=None):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton et calque (str) le nom du calque du bouton
+        Interrupteur : chaque appui inverse l'état du verrouillage de la vitesse.
+        '''
+        self.verrouillage_vitesse = not self.verrouillage_vitesse
+
+        if self.verrouillage_vitesse:
+            self.vitesse_fixe = self.vitesse_actuelle  # On stocke la vitesse actuelle
+            print(f"🔒 Vitesse verrouillée à {self.vitesse_fixe:.2f}x")
+        else:
+            print("🔓 Vitesse déverrouillée")
+        self._rafraichir()
+        self._basculer_calque(calque)
+
+    def verrouiller_frequence(self, valeur, calque=None):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton et calque (str) le nom du calque du bouton
+        Interrupteur : chaque appui inverse l'état du verrouillage de la fréquence.
+        '''
+        self.verrouillage_frequence = not self.verrouillage_frequence
+
+        if self.verrouillage_frequence:
+            self.frequence_fixe = self.frequence_actuelle  # On stocke la fréquence actuelle
+            print(f"🔒 Fréquence verrouillée à {self.frequence_fixe:.2f} Hz")
+        else:
+            print("🔓 Fréquence déverrouillée")
+        self._rafraichir()
+        self._basculer_calque(calque)
+
+    def basculer_effet(self, valeur, effet, activation, desactivation, calque=None):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton, effet (str) le nom de l'effet dans le rack,
+        activation et desactivation (str) les messages à afficher et calque (str) le nom du calque du bouton
+        Active ou désactive un effet.
+        '''
+        actif = not self.effets_actifs[effet]
+        self.effets_actifs[effet] = actif
+        self.commandes.envoyer(self.rack_effets.regler, effet, actif)
+        if actif:
+            print(activation)
+        else:
+            print(desactivation)
+        self._rafraichir()
+        self._basculer_calque(calque)
+
+    def jouer_batterie(self, valeur, son, message, calque=None):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton, son (str) le nom du son de batterie,
+        message (str) le message à afficher et calque (str) le nom du calque du bouton
+        Joue un son de batterie, tout de suite ou sur le prochain pas de la grille selon le mode, et fait clignoter le calque du bouton.
+        '''
+        if self.batterie_quantifiee:
+            self.commandes.envoyer(self.sequenceur_batterie.quantifier, son)
+        else:
+            self.commandes.envoyer(self.banque_batterie.jouer, son)
+        print(message)
+        if self.interface is not None and calque is not None:
+            self.interface.clignoter_calque(calque)
+
+    def changer_mode_batterie(self, valeur):
+        '''
+        Entrée : valeur (bool) représentant l'état du bouton
+        Bascule entre la batterie jouée à l'arrivée des messages et la batterie quantifiée, qui boucle les coups joués.
+        La boucle est effacée en revenant au mode direct.
+        '''
+        self.batterie_quantifiee = not self.batterie_quantifiee
+        if self.batterie_quantifiee:
+            self.commandes.envoyer(self.sequenceur_batterie.demarrer)
+            print("🥁 Batterie quantifiée : les coups sont calés sur la grille et bouclés")
+        else:
+            self.commandes.envoyer(self.sequenceur_batterie.arreter)
+            self.commandes.envoyer(self.sequenceur_batterie.effacer)
+            print("🥁 Batterie directe")
+        self._rafraichir()
+
+    def changer_mode(self, valeur):
+        '''
+        Entrée : valeur (bool) représentant l'état du bouton
+        Bascule entre le mode vitesse et le mode fréquence.
+        '''
+        self.mode = 1 - self.mode
+        self.commandes.envoyer(setattr, self.selecteur_audio, "voice", self.mode)
+        if self.mode == 0:
+            print("⏭  Mode actuel : Vitesse")
+        elif self.mode == 1:
+            print("⏭  Mode actuel : Fréquence")
+        self._rafraichir()
+
+    def chanson_suivante(self, valeur):
+        '''
+        Entrée : valeur (bool) représentant l'état du bouton
+        Passe à la chanson suivante.
+        '''
+        print("⏭  Changement de chanson")
+        self.file_controle.put((self.lecteur.jouer_suivante, ())) # Le décodage éventuel ne bloque pas la réception OSC
+
+    def deplacer_dans_chanson(self, valeur, courbe):
+        '''
+        Entrées : valeur (float) représentant la position du joystick et courbe (Courbe) la conversion en secondes de déplacement
+        par période de contrôle
+        Avance ou recule dans la chanson en cours tant que le joystick est poussé.
+        '''
+        ecart = courbe(valeur)
+        if ecart != 0: # Joystick au repos (zone morte de la courbe)
+            self.lecteur.deplacer(ecart)
+
+    def poser_repere(self, valeur, numero=0):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton et numero (entier) le numéro du repère
+        Mémorise la chanson en cours et la position de lecture actuelle comme repère.
+        '''
+        self.lecteur.poser_repere(numero)
+        _, position = self.lecteur.position()
+        print(f"📍 Repère {numero} posé à {int(position) // 60}:{int(position) % 60:02d}")
+
+    def aller_au_repere(self, valeur, numero=0):
+        '''
+        Entrées : valeur (bool) représentant l'état du bouton et numero (entier) le numéro du repère
+        Reprend la lecture au repère, s'il a été posé, en revenant si besoin à la chanson dans laquelle il a été posé.
+        '''
+        if self.lecteur.aller_au_repere(numero):
+            print(f"📍 Retour au repère {numero}")
+        else:
+            print(f"📍 Aucun repère {numero}")
+
+    def changer_fenetre(self, valeur):
+        '''
+        Entrée : valeur (bool) représentant l'état du bouton
+        Fait passer au premier plan la fenêtre "Visualiseur" ou la fenêtre "Hackaphone" (sans effet sans interface).
+        '''
+        if self.interface is not None:
+            self.interface.changer_fenetre()
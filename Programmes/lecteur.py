@@ -0,0 +1,356 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pyo import NewTable, SndTable, Pointer, Phasor, Thresh, SigTo, Selector, ButBP, TrigFunc, CallAfter
+from index_mp3 import ecrire_extrait
+
+# ===== CLASSES =====
+class Lecteur:
+    '''
+    Lecteur de la file de chansons avec un graphe audio persistant (deux platines, filtre passe-bande et sélectionneur).
+    La chanson suivante est décodée en mémoire sur un thread de travail pendant que la chanson en cours est jouée,
+    ce qui permet de passer de l'une à l'autre sans blanc, ou avec un fondu enchaîné à puissance constante.
+    Chaque platine lit sa table à la position donnée par un Phasor : un déplacement dans la chanson en mémoire ne fait que
+    relancer la platine libre à la position voulue, en un temps constant quelle que soit la position.
+    '''
+    DUREE_FENETRE = 30 # Secondes décodées pour démarrer une chanson en cours de route pendant le décodage complet
+
+    def __init__(self, musiques, vitesse, frequence, file_controle, au_changement=None, preparer=None, fondu=0.0, mul=0.8, commandes=None, cache=None,
+                 index_trames=None):
+        '''
+        Entrées : musiques (list[str]) représentant les chemins d'accès des chansons, vitesse et frequence (PyoObject) les paramètres
+        de lecture et du filtre, file_controle (queue.SimpleQueue) la file des actions exécutées par le thread de l'interface graphique,
+        au_changement (fonction) appelée sur ce thread avec (index, infos) à chaque changement de chanson, preparer (fonction)
+        appelée sur le thread de travail avec le chemin de la chanson pour préparer des informations (ex : pochette),
+        fondu (float) la durée en secondes du fondu enchaîné (0 pour un enchaînement direct), mul (float) le volume,
+        commandes (FileCommandes ou None) la file par laquelle les changements de chanson demandés sont confiés au moteur audio
+        cache (CachePCM ou None) le cache des chansons décodées et index_trames (fonction) appelée avec le chemin de la chanson
+        pour obtenir son index de trames MP3 (voir index_mp3.indexer_trames), ou None s'il n'est pas disponible
+        '''
+        self.musiques = musiques
+        self.vitesse = vitesse
+        self.file_controle = file_controle
+        self.au_changement = au_changement
+        self.preparer = preparer
+        self.fondu = fondu
+        self.commandes = commandes
+        self.cache = cache
+        self.index_trames = index_trames
+
+        self.index = 0 # Indice de la chanson en cours
+        self.index_demande = 0 # Indice de la dernière chanson demandée, qui peut attendre son tour dans la file de commandes
+        self.index_termine = None # Indice de la dernière chanson dont la fin a été signalée
+        self.platine_active = 0 # Platine qui joue la chanson en cours (0 ou 1)
+        self.chargements = {} # Chansons décodées ou en cours de décodage : index -> Future
+        self.reperes = {} # Repères posés : numéro -> (index de la chanson, position en secondes)
+        self.fenetre = False # Si fenetre vaut True, la platine active ne lit qu'un extrait de la chanson en cours
+        self.fin_fenetre = None # Position de la fin de l'extrait, s'il a été joué jusqu'au bout avant la fin du décodage
+        self.demandes = 0 # Nombre de changements de chanson demandés : seule la dernière demande est servie
+        self.demande_servie = 0 # Dernière demande dont la chanson a été lancée
+        self.executeur = ThreadPoolExecutor(max_workers=1) # Thread de décodage des chansons suivantes
+        self.executeur_extraits = ThreadPoolExecutor(max_workers=1) # Thread de décodage des extraits, qui n'attend pas les chansons entières
+        self.executeur_cache = ThreadPoolExecutor(max_workers=1) # Thread d'écriture du cache PCM, pour ne pas retarder le lancement
+
+        # Graphe persistant : deux platines mélangées par un sélectionneur (interpolation à puissance constante par défaut)
+        self.silence = NewTable(length=0.1, chnls=2) # Table vide gardée en mémoire, lue par les platines avant la première chanson
+        self.phases = [Phasor(freq=self.silence.getRate()).stop() for _ in range(2)] # Position de lecture de chaque platine (de 0 à 1)
+        self.platines = [Pointer(self.silence, phase).stop() for phase in self.phases]
+        self.tables_platines = [self.silence, self.silence] # Table lue par chaque platine
+        self.debuts_tables = [0.0, 0.0] # Position dans la chanson du début de la table de chaque platine, en secondes
+        self.durees_tables = [0.0, 0.0] # Durée de la table de chaque platine à vitesse normale, en secondes
+        self.choix_platine = SigTo(value=0, time=fondu)
+        self.source = Selector(self.platines, voice=self.choix_platine, mul=mul)
+        self.filtre = ButBP(self.source, freq=frequence, q=2, mul=1.0)
+        self.selecteur = Selector([self.source, self.filtre], voice=0).out() # Bascule entre changement de vitesse et son filtré
+
+        # Fin de table : la phase de la platine repasse de 1 à 0, quelle que soit la vitesse
+        self.fins = [Thresh(phase, threshold=0.5, dir=1) for phase in self.phases]
+        self.detection_fin = [TrigFunc(fin, self._fin_platine, arg=numero) for numero, fin in enumerate(self.fins)]
+        self.arret_differe = None
+
+    def _charger(self, index):
+        '''
+        Entrée : index (entier) représentant le numéro de la chanson
+        Sortie : tuple (table décodée, fréquence de lecture de la table à vitesse normale, informations préparées)
+        Décode la chanson en mémoire, ou la recopie depuis le cache PCM (exécutée sur le thread de travail).
+        '''
+        chemin = self.musiques[index]
+        chargement = self.cache.charger(chemin) if self.cache is not None else None
+        if chargement is not None:
+            table, frequence_table = chargement
+        else:
+            table = SndTable(chemin)
+            frequence_table = table.getRate()
+            if self.cache is not None:
+                self.executeur_cache.submit(self._mettre_en_cache, chemin, table) # La prochaine lecture n'aura pas à décoder le MP3
+        infos = self.preparer(chemin) if self.preparer is not None else None
+        return table, frequence_table, infos
+
+    def _mettre_en_cache(self, chemin, table):
+        '''
+        Entrées : chemin (str) représentant le chemin d'accès de la chanson et table (SndTable) la chanson décodée
+        Écrit la chanson dans le cache PCM (exécutée sur le thread du cache, pendant que la chanson est déjà jouée).
+        '''
+        try:
+            self.cache.enregistrer(chemin, table)
+        except (OSError, sqlite3.Error) as erreur:
+            print(f"⚠️ {os.path.basename(chemin)} non mise en cache : {erreur!r}")
+
+    def _charger_fenetre(self, index, debut):
+        '''
+        Entrées : index (entier) représentant le numéro de la chanson et debut (float) la position voulue en secondes
+        Sortie : tuple (table de l'extrait, fréquence de lecture de la table à vitesse normale, informations préparées),
+        ou None si la chanson n'a pas d'index de trames
+        Décode seulement les DUREE_FENETRE secondes qui suivent la position voulue, grâce à l'index des trames du fichier
+        (exécutée sur le thread des extraits).
+        '''
+        chemin = self.musiques[index]
+        index_trames = self.index_trames(chemin) if self.index_trames is not None else None
+        if index_trames is None:
+            return None
+        chemin_extrait, saut = ecrire_extrait(chemin, *index_trames, debut, self.DUREE_FENETRE)
+        try:
+            table = SndTable(chemin_extrait, start=saut)
+        finally:
+            os.remove(chemin_extrait)
+        infos = self.preparer(chemin) if self.preparer is not None else None
+        return table, table.getRate(), infos
+
+    def precharger(self, index):
+        '''
+        Entrée : index (entier) représentant le numéro de la chanson dans la file de lecture
+        Sortie : Future du décodage de la chanson
+        Lance le décodage de la chanson en arrière-plan si elle n'est pas déjà chargée.
+        '''
+        index %= len(self.musiques)
+        # Dictionnaire partagé avec le moteur audio, qui retire les chansons passées : on ne le relit pas après l'ajout
+        futur = self.chargements.get(index)
+        if futur is None:
+            futur = self.chargements.setdefault(index, self.executeur.submit(self._charger, index))
+        return futur
+
+    def _envoyer(self, fonction, *args):
+        '''
+        Entrées : fonction (fonction) représentant la modification du graphe audio et args ses arguments
+        Confie la modification au moteur audio, qui l'applique au début du prochain tampon (tout de suite sans file de commandes).
+        Toutes les modifications ont ainsi lieu sur le thread du moteur audio, sans verrou ; sans file de commandes,
+        le lecteur doit être piloté depuis le thread qui calcule le son.
+        '''
+        if self.commandes is not None:
+            self.commandes.envoyer(fonction, *args)
+        else:
+            fonction(*args)
+
+    def jouer(self, index, debut=0.0):
+        '''
+        Entrées : index (entier) représentant le numéro de la chanson dans la file de lecture et debut (float) la position
+        de départ en secondes
+        Passe à la chanson voulue sans attendre. Si elle est déjà préchargée, le changement est immédiat ; sinon il a lieu à la fin
+        de son décodage, sauf pour un départ en cours de route : un extrait est alors décodé en parallèle à partir de la position
+        voulue grâce à l'index des trames, et la chanson entière le remplace dès qu'elle est prête.
+        La demande est abandonnée si une autre chanson est demandée avant la fin du décodage.
+        '''
+        index %= len(self.musiques)
+        futur = self.precharger(index)
+        self.index_demande = index
+        self.demandes += 1
+        demande = self.demandes
+        if debut > 0 and not futur.done() and self.index_trames is not None:
+            extrait = self.executeur_extraits.submit(self._charger_fenetre, index, debut)
+            extrait.add_done_callback(lambda extrait: self._envoyer(self._servir, demande, index, extrait.result(), debut, debut))
+        # Exécuté tout de suite si la chanson est déjà décodée, sinon par le thread de travail à la fin du décodage
+        futur.add_done_callback(lambda futur: self._envoyer(self._servir, demande, index, futur.result(), debut))
+
+    def jouer_suivante(self):
+        '''
+        Passe à la chanson qui suit la dernière chanson demandée.
+        '''
+        self.jouer(self.index_demande + 1)
+
+    def attendre(self):
+        '''
+        Bloque jusqu'à la fin des décodages en cours et des rappels qui confient les changements de chanson au moteur audio.
+        Pour les rendus hors ligne, dont le résultat ne doit pas dépendre de la vitesse des décodages.
+        '''
+        for executeur in (self.executeur_extraits, self.executeur):
+            executeur.submit(int).result() # Un seul thread par exécuteur : cette tâche vide passe après les décodages et leurs rappels
+
+    def _servir(self, demande, index, chargement, debut, debut_table=0.0):
+        '''
+        Entrées : demande (entier) représentant le numéro de la demande faite par jouer, index (entier) le numéro de la chanson,
+        chargement (tuple) le résultat de _charger ou de _charger_fenetre (None pour une chanson sans index de trames), debut (float)
+        la position de départ en secondes et debut_table (float) la position dans la chanson du début de la table (non nulle pour un extrait)
+        Appelée par le moteur audio à la fin d'un décodage demandé par jouer. Lance la chanson, ou remplace l'extrait en cours
+        par la chanson entière à la position atteinte ; sans effet si une autre chanson a été demandée entre-temps.
+        '''
+        if demande != self.demandes or chargement is None:
+            return
+        if demande != self.demande_servie:
+            self.demande_servie = demande # Premier des deux décodages terminé (extrait ou chanson entière)
+            self._basculer(index, chargement, debut, True, debut_table)
+        elif debut_table == 0 and self.fenetre and index == self.index:
+            debut = self.fin_fenetre if self.fin_fenetre is not None else self.position()[1]
+            self._basculer(index, chargement, debut, False)
+
+    def _basculer(self, index, chargement, debut=0.0, annoncer=True, debut_table=0.0):
+        '''
+        Entrées : index (entier) représentant le numéro de la chanson, chargement (tuple) le résultat de _charger, debut (float)
+        la position de départ en secondes dans la chanson, annoncer (bool) indiquant si le changement de chanson doit être signalé
+        et debut_table (float) la position dans la chanson du début de la table (non nulle pour un extrait)
+        Lance la chanson sur la platine libre à la position voulue, bascule le sélectionneur vers elle et arrête l'autre platine.
+        '''
+        table, frequence_table, infos = chargement
+
+        ancienne_platine = self.platine_active
+        self.platine_active = 1 - self.platine_active
+        platine, phase = self.platines[self.platine_active], self.phases[self.platine_active]
+        # L'ancienne table doit rester en vie pendant setTable : pyo plante si elle est libérée avant le remplacement
+        # (c'est le cas des tables DataTable et NewTable venues du cache PCM)
+        ancienne_table = self.tables_platines[self.platine_active]
+        platine.setTable(table)
+        self.tables_platines[self.platine_active] = table
+        del ancienne_table
+        self.debuts_tables[self.platine_active] = debut_table
+        self.durees_tables[self.platine_active] = 1 / frequence_table
+        phase.freq = self.vitesse * frequence_table
+        phase.phase = min(max((debut - debut_table) * frequence_table, 0.0), 0.999)
+        phase.reset()
+        phase.play()
+        platine.play()
+        self.choix_platine.value = self.platine_active
+        self.fenetre = debut_table > 0 # Seuls les extraits ne commencent pas au début de la chanson
+        self.fin_fenetre = None
+
+        if self.fondu > 0:
+            self.arret_differe = CallAfter(self._arreter_platine, time=self.fondu, arg=ancienne_platine)
+        else:
+            self._arreter_platine(ancienne_platine)
+
+        self.index_termine = None
+        if annoncer or index != self.index: # Sinon, déplacement dans la chanson en cours : la suivante est déjà en cours de décodage
+            self.index = index
+            self.index_demande = index
+
+            # On ne garde en mémoire que la chanson en cours et la suivante, que l'on commence à décoder
+            suivante = (index + 1) % len(self.musiques)
+            for i in list(self.chargements):
+                if i not in (index, suivante):
+                    self.chargements.pop(i, None)
+            self.precharger(suivante)
+
+        if annoncer and self.au_changement is not None:
+            self.file_controle.put((self.au_changement, (index, infos)))
+
+    def position(self):
+        '''
+        Sortie : tuple (indice de la chanson en cours, position de lecture en secondes dans la chanson, à vitesse normale)
+        La position est lue à la fin du dernier tampon calculé.
+        '''
+        numero = self.platine_active
+        return self.index, self.debuts_tables[numero] + self.phases[numero].get() * self.durees_tables[numero]
+
+    def aller_a(self, secondes):
+        '''
+        Entrée : secondes (float) représentant la position voulue dans la chanson en cours
+        Relance la chanson en cours à la position voulue sur la platine libre, avec le même fondu qu'un changement de chanson.
+        La chanson étant déjà en mémoire, le déplacement ne décode rien et prend le même temps quelle que soit la position.
+        '''
+        self._envoyer(self._deplacer_vers, secondes)
+
+    def deplacer(self, ecart):
+        '''
+        Entrée : ecart (float) représentant le déplacement en secondes (négatif pour revenir en arrière)
+        Déplace la lecture de la chanson en cours par rapport à la position atteinte au moment où le moteur audio applique le déplacement.
+        '''
+        self._envoyer(lambda: self._deplacer_vers(self.position()[1] + ecart))
+
+    def _deplacer_vers(self, secondes):
+        '''
+        Entrée : secondes (float) représentant la position voulue dans la chanson en cours
+        Appelée par le moteur audio. Pendant la lecture d'un extrait, seules les positions qu'il contient sont accessibles.
+        '''
+        numero = self.platine_active
+        table = self.tables_platines[numero]
+        if table is self.silence:
+            return # Aucune chanson lancée
+        debut_table, duree_table = self.debuts_tables[numero], self.durees_tables[numero]
+        secondes = min(max(secondes, debut_table), debut_table + duree_table * 0.999) # Sans atteindre la fin de la table
+        self._basculer(self.index, (table, 1 / duree_table, None), secondes, False, debut_table)
+
+    def poser_repere(self, numero):
+        '''
+        Entrée : numero (entier) représentant le numéro du repère
+        Mémorise la chanson en cours et la position de lecture actuelle.
+        '''
+        self.reperes[numero] = self.position()
+
+    def aller_au_repere(self, numero):
+        '''
+        Entrée : numero (entier) représentant le numéro du repère
+        Sortie : True si le repère a été posé, False sinon
+        Reprend la lecture au repère. S'il a été posé dans une autre chanson, celle-ci est relancée à la position du repère :
+        elle n'est en général plus en mémoire, et démarre alors sur un extrait décodé grâce à l'index des trames.
+        '''
+        repere = self.reperes.get(numero)
+        if repere is None:
+            return False
+        index, position = repere
+        if index == self.index == self.index_demande:
+            self.aller_a(position)
+        else:
+            self.jouer(index, position)
+        return True
+
+    def _arreter_platine(self, numero):
+        '''
+        Entrée : numero (entier) représentant la platine à arrêter
+        Arrête la platine si elle n'est pas redevenue active entre-temps (changements de chanson rapprochés pendant un fondu).
+        '''
+        if numero != self.platine_active:
+            self.platines[numero].stop()
+            self.phases[numero].stop()
+
+    def _fin_platine(self, numero):
+        '''
+        Entrée : numero (entier) représentant la platine qui a atteint la fin de sa table
+        Appelée par le moteur audio. Si la chanson suivante est prête, elle démarre dès le tampon suivant ;
+        sinon l'enchaînement est confié au thread de contrôle, qui attendra la fin du décodage.
+        '''
+        if numero != self.platine_active or self.index_termine == self.index:
+            return # Fin d'une platine en cours de fondu ou arrêtée, ou fin déjà signalée
+        if self.phases[numero].get() * self.durees_tables[numero] > 1:
+            return # Platine relancée plus loin dans sa table pendant un fondu : ce n'est pas une fin
+        # La phase reboucle sur le début de la table : la platine est arrêtée tout de suite
+        self.platines[numero].stop()
+        self.phases[numero].stop()
+        if self.fenetre:
+            # Extrait terminé avant la fin du décodage : la chanson entière reprendra à cette position dès qu'elle sera prête
+            self.fin_fenetre = self.debuts_tables[numero] + self.durees_tables[numero]
+            return
+        self.index_termine = self.index
+        suivante = (self.index + 1) % len(self.musiques)
+        chargement = self.chargements.get(suivante)
+
+        if chargement is not None and chargement.done():
+            self._basculer(suivante, chargement.result())
+        else:
+            self.file_controle.put((self._enchainer, (self.index,)))
+
+    def fermer(self):
+        '''
+        Arrête les threads de décodage et d'écriture du cache, après la fin des tâches en cours ; les décodages en attente sont annulés.
+        '''
+        for executeur in (self.executeur, self.executeur_extraits, self.executeur_cache):
+            executeur.shutdown(cancel_futures=True)
+
+    def _enchainer(self, index_termine):
+        '''
+        Entrée : index_termine (entier) représentant le numéro de la chanson qui vient de se terminer
+        Passe à la chanson suivante, sauf si une autre chanson a déjà été lancée ou demandée entre-temps (bouton pressé au même moment).
+        '''
+        if index_termine == self.index == self.index_demande:
+            self.jouer(index_termine + 1)
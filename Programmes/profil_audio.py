@@ -0,0 +1,117 @@
+# ===== INSTALLATIONS =====
+# pip install pyo
+
+# ===== IMPORTATIONS =====
+import os
+import json
+import time
+import platform
+from pyo import Server
+
+# ===== FONCTIONS =====
+def chemin_profil(dossier):
+    '''
+    Entrée : dossier (str) représentant le dossier des programmes
+    Sortie : chemin d'accès du profil audio de cette machine (un fichier par nom de machine)
+    '''
+    return os.path.join(dossier, f"Profil audio {platform.node()}.json")
+
+def charger_profil(dossier):
+    '''
+    Entrée : dossier (str) représentant le dossier des programmes
+    Sortie : dictionnaire du profil audio de cette machine, ou None si la calibration n'a pas encore été faite
+    '''
+    try:
+        with open(chemin_profil(dossier), encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except FileNotFoundError:
+        return None
+
+def enregistrer_profil(dossier, profil):
+    '''
+    Entrées : dossier (str) représentant le dossier des programmes et profil (dict) la configuration retenue par la calibration
+    '''
+    with open(chemin_profil(dossier), "w", encoding="utf-8") as fichier:
+        json.dump(profil, fichier, ensure_ascii=False, indent=4)
+
+def options_serveur(profil):
+    '''
+    Entrée : profil (dict) représentant un profil audio
+    Sortie : dictionnaire des arguments à passer à Server
+    '''
+    options = {"sr": profil["sr"], "buffersize": profil["buffersize"], "duplex": profil["duplex"], "audio": profil["audio"]}
+    if profil.get("winhost") is not None:
+        options["winhost"] = profil["winhost"]
+    return options
+
+def creer_serveur(dossier):
+    '''
+    Entrée : dossier (str) représentant le dossier des programmes
+    Sortie : serveur audio démarré avec le profil de cette machine, ou avec les réglages par défaut de pyo s'il n'y a pas de profil
+    (ou si la configuration du profil ne démarre plus, par exemple après un changement de carte son)
+    '''
+    profil = charger_profil(dossier)
+    if profil is not None:
+        serveur = Server(**options_serveur(profil)).boot()
+        if serveur.getIsBooted():
+            print(f"🎚  Profil audio : {profil['audio']} {profil.get('winhost') or ''} | tampon de {profil['buffersize']} échantillons à {profil['sr']} Hz")
+            return serveur.start()
+        print("⚠️  Le profil audio de cette machine ne démarre pas, réglages par défaut utilisés (relancer la calibration)")
+        serveur.shutdown()
+    return Server().boot().start()
+
+# ===== CLASSES =====
+class SurveillanceTampons:
+    '''
+    Surveillance du moteur audio en temps réel, à partir de la fonction de rappel appelée avant chaque tampon.
+    Les pertes de tampon (xruns) sont estimées par le déficit entre le nombre de tampons calculés et la durée écoulée :
+    chaque tampon manquant a été remplacé par du silence par la carte son.
+    Les dépassements sont les rappels arrivés plus de deux périodes après le précédent : le calcul a pris du retard,
+    même si la mémoire tampon du pilote a pu l'absorber.
+    '''
+    def __init__(self, serveur, suivant=None):
+        '''
+        Entrées : serveur (Server) représentant le serveur audio démarré et suivant (fonction ou None) la fonction de rappel
+        déjà utilisée (ex : FileCommandes.appliquer), appelée à chaque tampon après la mesure
+        '''
+        self.periode = serveur.getBufferSize() / serveur.getSamplingRate()
+        self.suivant = suivant
+        self.reinitialiser()
+        serveur.setCallback(self._rappel)
+
+    def reinitialiser(self):
+        '''
+        Recommence les mesures (par exemple après la période de chauffe du graphe).
+        '''
+        self.debut = None
+        self.dernier = None
+        self.tampons = 0
+        self.depassements = 0
+        self.intervalle_maximal = 0.0
+
+    def _rappel(self):
+        '''
+        Appelée par le moteur audio avant chaque tampon.
+        '''
+        maintenant = time.perf_counter()
+        if self.debut is None:
+            self.debut = maintenant
+        else:
+            intervalle = maintenant - self.dernier
+            self.tampons += 1
+            self.intervalle_maximal = max(self.intervalle_maximal, intervalle)
+            if intervalle > 2 * self.periode:
+                self.depassements += 1
+        self.dernier = maintenant
+        if self.suivant is not None:
+            self.suivant()
+
+    def resultats(self):
+        '''
+        Sortie : tuple (tampons calculés, pertes de tampon estimées, dépassements, plus long intervalle entre deux tampons en ms)
+        '''
+        if self.debut is None:
+            return 0, 0, 0, 0.0
+        attendus = (time.perf_counter() - self.debut) / self.periode
+        pertes = max(0, round(attendus - self.tampons) - 1) # Un tampon de marge pour le tampon en cours au moment de la lecture
+        return self.tampons, pertes, self.depassements, self.intervalle_maximal * 1000
@@ -0,0 +1,76 @@
+# ===== INSTALLATIONS =====
+# pip install python-osc
+
+# ===== IMPORTATIONS =====
+import socket
+import asyncio
+import threading
+
+# ===== CLASSES =====
+class RecepteurOSC:
+    '''
+    Récepteur OSC sur UDP piloté par une boucle asyncio, sur un seul thread.
+    Contrairement à osc_server.ThreadingOSCUDPServer, qui crée un thread par paquet, les paquets en attente sont lus par lots
+    et transmis au dispatcher un par un, dans leur ordre d'arrivée.
+    '''
+    def __init__(self, adresse, dispatcher, taille_lot=64, taille_tampon=None):
+        '''
+        Entrées : adresse (tuple) représentant l'IP et le port d'écoute, dispatcher (Dispatcher) celui de python-osc,
+        taille_lot (int) le nombre maximal de paquets lus d'affilée avant de rendre la main à la boucle
+        et taille_tampon (int ou None) la taille en octets du tampon de réception du système (None pour garder celle par défaut)
+        '''
+        self.dispatcher = dispatcher
+        self.taille_lot = taille_lot
+        self.paquets_recus = 0
+
+        # Le port est ouvert tout de suite pour qu'une erreur (port déjà utilisé) apparaisse au démarrage de l'instrument
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if taille_tampon is not None:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, taille_tampon) # Absorbe les rafales sans perte
+        self.socket.bind(adresse)
+        self.socket.setblocking(False)
+
+        # Boucle à sélecteur sur toutes les plateformes : celle créée par défaut sous Windows (Proactor) ne gère pas add_reader
+        self.boucle = asyncio.SelectorEventLoop()
+        self.thread = threading.Thread(target=self._executer, daemon=True)
+
+    def demarrer(self):
+        '''
+        Lance la boucle de réception sur son thread.
+        '''
+        self.thread.start()
+
+    def arreter(self):
+        '''
+        Arrête la boucle de réception et ferme le port.
+        '''
+        self.boucle.call_soon_threadsafe(self.boucle.stop)
+        self.thread.join()
+        self.socket.close()
+
+    def _executer(self):
+        '''
+        Corps du thread de réception : la boucle est réveillée dès que des paquets sont disponibles sur le port.
+        '''
+        asyncio.set_event_loop(self.boucle)
+        self.boucle.add_reader(self.socket.fileno(), self._vider_socket)
+        try:
+            self.boucle.run_forever()
+        finally:
+            self.boucle.remove_reader(self.socket.fileno())
+            self.boucle.close()
+
+    def _vider_socket(self):
+        '''
+        Lit jusqu'à taille_lot paquets en attente et les transmet au dispatcher dans l'ordre.
+        Les paquets restants seront lus au tour de boucle suivant.
+        '''
+        for _ in range(self.taille_lot):
+            try:
+                donnees, expediteur = self.socket.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                continue # Sous Windows, un paquet envoyé vers un port fermé fait échouer la lecture suivante
+            self.paquets_recus += 1
+            self.dispatcher.call_handlers_for_packet(donnees, expediteur)
@@ -2,35 +2,25 @@
 # pip install numpy pyaudio pygame
 
 import numpy as np
-import pyaudio
 import pygame
 import pygame.gfxdraw
 import colorsys
 import sys
 import math
-from collections import deque
+from analysis_service import AnalysisReader, HOP
+from smoothing import FrameSmoother, ramp_weights
 
 class WaveformVisualizer:
     def __init__(self):
         # Audio parameters
-        self.CHUNK = 1024  # Number of audio samples per frame
-        self.FORMAT = pyaudio.paInt16
-        self.CHANNELS = 1
-        self.RATE = 44100  # Audio sampling rate
+        self.CHUNK = HOP  # Number of audio samples per frame (one hop of the analysis service)
         self.BUFFER_SIZE = 10  # Number of chunks to keep in the buffer
         
         # Sensitivity settings
         self.AMPLIFICATION = 55.0  # Significantly increased from 3.5
         
-        # Initialize PyAudio
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=self.FORMAT,
-            channels=self.CHANNELS,
-            rate=self.RATE,
-            input=True,
-            frames_per_buffer=self.CHUNK
-        )
+        # Connect to the analysis service (started if no other visualizer is running)
+        self.analysis = AnalysisReader()
         
         # Visualization parameters
         self.WIDTH = 1200
@@ -39,10 +29,8 @@ class WaveformVisualizer:
         self.LINE_WIDTH = 2
         self.SMOOTHING = 0.2  # Smoothing factor for waveform
         
-        # Buffer for audio data
-        self.buffer = deque(maxlen=self.BUFFER_SIZE)
-        for _ in range(self.BUFFER_SIZE):
-            self.buffer.append(np.zeros(self.CHUNK))
+        # Weighted smoothing of the last chunks
+        self.smoother = FrameSmoother(self.CHUNK, weights=ramp_weights(self.BUFFER_SIZE))
             
         # Color parameters
         self.hue_offset = 0
@@ -64,22 +52,18 @@ class WaveformVisualizer:
         return colors
         
     def process_audio(self):
-        """Read audio data from microphone and process it"""
+        """Read the new hops of the analysis service and process them"""
         try:
-            data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-            audio_data = np.frombuffer(data, dtype=np.int16)
-            self.buffer.append(audio_data)
+            frames = self.analysis.read_new()
+            if not frames:
+                return self.smoother.output  # No new hop since the last frame
+            for frame in frames:
+                self.smoother.push(frame['waveform'][-self.CHUNK:])  # Already normalized to -1.0 to 1.0
             
-            # Normalize and apply smoothing with previous frames
-            processed_data = np.zeros(self.CHUNK)
-            for i, frame in enumerate(self.buffer):
-                weight = (i + 1) / self.BUFFER_SIZE
-                processed_data += frame * weight
-            
-            processed_data = processed_data / len(self.buffer)
-            return processed_data / 32768.0  # Normalize to -1.0 to 1.0
+            # Apply smoothing with previous frames
+            return self.smoother.value()
         except Exception as e:
-            print(f"Error capturing audio: {e}")
+            print(f"Error reading audio analysis: {e}")
             return np.zeros(self.CHUNK)
     
     def draw_waveform(self, audio_data):
@@ -189,11 +173,11 @@ class WaveformVisualizer:
     
     def cleanup(self):
         """Clean up resources"""
-        if hasattr(self, 'stream') and self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if hasattr(self, 'p') and self.p:
-            self.p.terminate()
+        if hasattr(self, 'analysis'):
+            overflows, dropped, missed = self.analysis.counters()
+            if overflows or dropped or missed:
+                print(f"Audio lost: {overflows} overflowed buffers, {dropped} dropped hops, {missed} missed frames")
+            self.analysis.close()
         pygame.quit()
 
 if __name__ == "__main__":
@@ -1,24 +1,22 @@
 # ===== INSTALLATIONS =====
-# pip install numpy pyaudio pygame scipy
+# pip install numpy pyaudio pygame
 
 import pygame
 import pygame.gfxdraw
 import numpy as np
-import pyaudio
 import colorsys
 import math
 import random
-from scipy.fft import fft
 import sys
-from collections import deque
+from analysis_service import AnalysisReader, HOP, WINDOW
+from smoothing import FrameSmoother, ramp_weights
+from particles import ParticleSystem
 
 class PsychedelicVisualizer:
     def __init__(self):
         # Audio parameters
-        self.CHUNK = 1024  # Number of audio samples per frame
-        self.FORMAT = pyaudio.paInt16
-        self.CHANNELS = 1
-        self.RATE = 44100  # Audio sampling rate
+        self.CHUNK = HOP  # Number of audio samples per frame (one hop of the analysis service)
+        self.FFT_BINS = 512  # Spectrum bins drawn (the amplifications were tuned for a 1024-sample FFT)
         self.BUFFER_SIZE = 4  # REDUCED buffer size for faster response
         
         # Amplification factors - DRAMATICALLY INCREASED
@@ -26,15 +24,8 @@ class PsychedelicVisualizer:
         self.BASS_AMPLIFICATION = 10.0   # Bass specific amplification
         self.HIGH_AMPLIFICATION = 8.0    # High frequency amplification
         
-        # Initialize PyAudio
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=self.FORMAT,
-            channels=self.CHANNELS,
-            rate=self.RATE,
-            input=True,
-            frames_per_buffer=self.CHUNK
-        )
+        # Connect to the analysis service (started if no other visualizer is running)
+        self.analysis = AnalysisReader()
         
         # Visualization parameters
         pygame.init()
@@ -50,13 +41,15 @@ class PsychedelicVisualizer:
         self.audio_hue_influence = 0.02  # NEW: audio directly affects color
         
         # Audio processing
-        self.buffer = deque(maxlen=self.BUFFER_SIZE)
-        for _ in range(self.BUFFER_SIZE):
-            self.buffer.append(np.zeros(self.CHUNK))
+        # Stronger weighting for recent frames
+        self.smoother = FrameSmoother(self.CHUNK, weights=ramp_weights(self.BUFFER_SIZE))
+        self.audio_data = np.zeros(self.CHUNK)  # float64: pygame does not take numpy float32 coordinates
+        self.fft_data = np.zeros(self.FFT_BINS)
             
         # Visualization elements - increased max counts
-        self.particles = []
-        self.max_particles = 1000  # Doubled from 500
+        self.max_particles = 20000  # Raised from 1000 (preallocated arrays)
+        self.particles = ParticleSystem(self.max_particles)
+        self.spawn_attempts = 1  # Particle creation attempts per frame (PAGE UP / PAGE DOWN for denser bursts)
         self.circles = []
         self.max_circles = 16  # Doubled from 8
         self.center_x = self.WIDTH // 2
@@ -83,41 +76,28 @@ class PsychedelicVisualizer:
         self.persistent_surface = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
         
     def process_audio(self):
-        """Read audio data from microphone and process it with higher sensitivity"""
+        """Read the new frames of the analysis service and process them with higher sensitivity"""
         try:
-            data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-            audio_data = np.frombuffer(data, dtype=np.int16)
-            self.buffer.append(audio_data)
+            frames = self.analysis.read_new()
+            if not frames:
+                return self.audio_data, self.fft_data  # No new hop since the last frame
+            for frame in frames:
+                self.smoother.push(frame['waveform'][-self.CHUNK:])
             
-            # Average with previous frames - LESS smoothing for faster response
-            processed_data = np.zeros(self.CHUNK)
-            for i, frame in enumerate(self.buffer):
-                # Stronger weighting for recent frames
-                weight = (i + 1) / self.BUFFER_SIZE
-                processed_data += frame * weight
+            # Average with previous frames - LESS smoothing for faster response - then AMPLIFY
+            np.multiply(self.smoother.value(), self.AUDIO_AMPLIFICATION, out=self.audio_data)
             
-            processed_data = processed_data / len(self.buffer)
-            # AMPLIFIED normalization
-            normalized_data = (processed_data / 32768.0) * self.AUDIO_AMPLIFICATION
-            
-            # Calculate frequency spectrum
-            fft_data = fft(normalized_data)
-            fft_data = np.abs(fft_data[:self.CHUNK//2])  # Only first half is useful
+            # Frequency spectrum computed by the service, at a finer resolution: keep the louder bin of each group,
+            # scaled from the Hann-windowed WINDOW-sample FFT to a plain 1024-sample one
+            group = WINDOW // 2 // self.FFT_BINS
+            spectrum = frames[-1]['spectrum'][:self.FFT_BINS * group].reshape(self.FFT_BINS, group).max(axis=1)
+            spectrum *= 4 * self.FFT_BINS / WINDOW
             # AMPLIFY the fft data for more responsive visuals
-            fft_data = fft_data * 3.0
+            fft_data = spectrum * self.AUDIO_AMPLIFICATION * 3.0
             
-            # Calculate energy in each frequency band - LESS smoothing
-            freq_resolution = self.RATE / self.CHUNK
-            for band, (low_freq, high_freq) in self.bands.items():
-                low_bin = int(low_freq / freq_resolution)
-                high_bin = int(high_freq / freq_resolution)
-                # Ensure bins are within range
-                low_bin = max(0, min(low_bin, len(fft_data)-1))
-                high_bin = max(low_bin+1, min(high_bin, len(fft_data)))
-                
-                # Calculate energy in this band
-                energy = np.sum(fft_data[low_bin:high_bin])
-                
+            # Energy in each frequency band, summed by the service over more bins than a 1024-sample FFT - LESS smoothing
+            band_energies = frames[-1]['bands'] * self.AUDIO_AMPLIFICATION * 3.0 * (2 * self.FFT_BINS / WINDOW)
+            for band, energy in zip(self.bands, band_energies):
                 # Apply specific amplification based on frequency band
                 if band in ['bass', 'sub_bass']:
                     energy *= self.BASS_AMPLIFICATION
@@ -127,10 +107,11 @@ class PsychedelicVisualizer:
                 # MUCH less smoothing for faster response (0.5 old + 0.5 new)
                 self.band_energy[band] = 0.5 * self.band_energy[band] + 0.5 * energy
             
-            return normalized_data, fft_data
+            self.fft_data = fft_data
+            return self.audio_data, fft_data
         except Exception as e:
-            print(f"Error capturing audio: {e}")
-            return np.zeros(self.CHUNK), np.zeros(self.CHUNK//2)
+            print(f"Error reading audio analysis: {e}")
+            return np.zeros(self.CHUNK), np.zeros(self.FFT_BINS)
     
     def get_color(self, hue_offset=0, s=0.9, v=0.9, alpha=255):
         """Generate a color with the given offset from the current hue"""
@@ -148,41 +129,16 @@ class PsychedelicVisualizer:
         return colors
     
     def create_particle(self, audio_intensity):
-        """Create a new particle based on audio intensity"""
-        if len(self.particles) < self.max_particles:
-            # MUCH more particles when louder - 3x more likely
-            if random.random() < audio_intensity * 2.0:  # Increased from 0.7
-                angle = random.uniform(0, math.pi * 2)
-                # Much higher speed range based on audio
-                speed = random.uniform(2, 6 + audio_intensity * 25)  # Increased from 3+audio*10
-                # Much larger size range based on audio
-                size = random.uniform(3, 10 + audio_intensity * 30)  # Increased from 5+audio*15
-                lifespan = random.randint(15, 60)  # Shorter lifespan for faster turnover
-                hue_offset = random.uniform(0, 1)
-                
-                self.particles.append({
-                    'x': self.center_x,
-                    'y': self.center_y,
-                    'vx': math.cos(angle) * speed,
-                    'vy': math.sin(angle) * speed,
-                    'size': size,
-                    'lifespan': lifespan,
-                    'age': 0,
-                    'hue_offset': hue_offset
-                })
+        """Create new particles based on audio intensity"""
+        # MUCH more particles when louder - each attempt succeeds with a probability of twice the intensity
+        count = np.count_nonzero(self.particles.rng.random(self.spawn_attempts) < audio_intensity * 2.0)
+        # Much higher speed and size ranges based on audio
+        self.particles.spawn(count, self.center_x, self.center_y,
+                             max_speed=6 + audio_intensity * 25, max_size=10 + audio_intensity * 30)
     
     def update_particles(self):
-        """Update all particles"""
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['age'] += 1
-            
-            # Remove particles that are too old or out of bounds
-            if (particle['age'] >= particle['lifespan'] or
-                particle['x'] < 0 or particle['x'] > self.WIDTH or
-                particle['y'] < 0 or particle['y'] > self.HEIGHT):
-                self.particles.remove(particle)
+        """Update all particles, removing those that are too old or out of bounds"""
+        self.particles.update(self.WIDTH, self.HEIGHT)
     
     def create_circle(self, audio_intensity):
         """Create a new expanding circle based on audio intensity"""
@@ -288,24 +244,8 @@ class PsychedelicVisualizer:
             )
     
     def draw_particles(self):
-        """Draw all particles"""
-        for particle in self.particles:
-            # Calculate alpha based on particle age
-            alpha = 255 * (1 - particle['age'] / particle['lifespan'])
-            color = self.get_color(hue_offset=particle['hue_offset'], alpha=int(alpha))
-            
-            # Draw particle with glow effect - STRONGER glow
-            size = int(particle['size'])
-            for r in range(size, 0, -1):  # More detailed gradients
-                glow_alpha = int(alpha * (r / size) * 0.9)  # Increased from 0.8
-                glow_color = color[:3] + (glow_alpha,)
-                pygame.gfxdraw.filled_circle(
-                    self.screen, 
-                    int(particle['x']), 
-                    int(particle['y']), 
-                    r, 
-                    glow_color
-                )
+        """Draw all particles with a glow fading with their age"""
+        self.particles.draw(self.screen, self.hue_offset)
     
     def draw_circles(self):
         """Draw all expanding circles"""
@@ -425,6 +365,12 @@ class PsychedelicVisualizer:
                         elif event.key == pygame.K_DOWN:
                             self.AUDIO_AMPLIFICATION /= 1.5
                             print(f"Audio amplification: {self.AUDIO_AMPLIFICATION:.1f}")
+                        elif event.key == pygame.K_PAGEUP:
+                            self.spawn_attempts *= 2
+                            print(f"Particle creation attempts per frame: {self.spawn_attempts}")
+                        elif event.key == pygame.K_PAGEDOWN:
+                            self.spawn_attempts = max(1, self.spawn_attempts // 2)
+                            print(f"Particle creation attempts per frame: {self.spawn_attempts}")
                 
                 # Get and process audio data
                 audio_data, fft_data = self.process_audio()
@@ -443,11 +389,11 @@ class PsychedelicVisualizer:
     
     def cleanup(self):
         """Clean up resources"""
-        if hasattr(self, 'stream') and self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if hasattr(self, 'p') and self.p:
-            self.p.terminate()
+        if hasattr(self, 'analysis'):
+            overflows, dropped, missed = self.analysis.counters()
+            if overflows or dropped or missed:
+                print(f"Audio lost: {overflows} overflowed buffers, {dropped} dropped hops, {missed} missed frames")
+            self.analysis.close()
         pygame.quit()
 
 if __name__ == "__main__":
@@ -1,33 +1,24 @@
 # ===== INSTALLATIONS =====
-# pip install numpy pyaudio pygame scipy
+# pip install numpy pyaudio pygame
 
 import numpy as np
-import pyaudio
 import pygame
 import colorsys
-from scipy.fft import fft
 import pygame.gfxdraw
 import sys
 import time
 from collections import deque
+from analysis_service import AnalysisReader, RATE, WINDOW
+from stft import band_filterbank
 
 class FrequencyBandsVisualizer:
     def __init__(self):
-        # Audio parameters
-        self.CHUNK = 2048  # Larger chunk for better frequency resolution
-        self.FORMAT = pyaudio.paInt16
-        self.CHANNELS = 1
-        self.RATE = 44100
+        # Audio parameters (the analysis service uses a 4096-sample window, for a good frequency resolution)
+        self.CHUNK = WINDOW
+        self.RATE = RATE
         
-        # Initialize PyAudio
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=self.FORMAT,
-            channels=self.CHANNELS,
-            rate=self.RATE,
-            input=True,
-            frames_per_buffer=self.CHUNK
-        )
+        # Connect to the analysis service (started if no other visualizer is running)
+        self.analysis = AnalysisReader()
         
         # Visualization parameters
         self.WIDTH = 1280
@@ -44,6 +35,8 @@ class FrequencyBandsVisualizer:
             (3000, 6000),  # High frequencies (indigo)
             (6000, 20000)  # Very high frequencies (violet)
         ]
+        # Filterbank averaging the spectrum bins of each band, computed once
+        self.filterbank = band_filterbank(self.bands, self.RATE, self.CHUNK, mean=True, inclusive=True)[:self.CHUNK//2]
         
         # Base colors for each band (pastel versions)
         self.base_colors = [
@@ -79,22 +72,14 @@ class FrequencyBandsVisualizer:
         self.clock = pygame.time.Clock()
     
     def get_frequency_data(self):
-        """Capture audio and perform FFT to get frequency data"""
+        """Get the frequency data of the newest frame of the analysis service (None if there is no new frame)"""
         try:
-            # Read audio data
-            data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-            audio_data = np.frombuffer(data, dtype=np.int16)
+            frame = self.analysis.latest()
+            if frame is None:
+                return None, self.RATE / self.CHUNK
             
-            # Apply window function to reduce spectral leakage
-            window = np.hanning(len(audio_data))
-            audio_data = audio_data * window
-            
-            # Perform FFT
-            fft_data = fft(audio_data)
-            fft_data = np.abs(fft_data[:self.CHUNK//2])  # Only take the first half (real part)
-            
-            # Normalize
-            fft_data = fft_data / (128 * self.CHUNK)
+            # Spectrum of the Hann-windowed frame, normalized as a 16-bit capture divided by (128 * CHUNK)
+            fft_data = frame['spectrum'][:self.CHUNK//2] * 32768 / (128 * self.CHUNK)
             
             # Calculate frequency resolution
             freq_resolution = self.RATE / self.CHUNK
@@ -102,31 +87,22 @@ class FrequencyBandsVisualizer:
             return fft_data, freq_resolution
             
         except Exception as e:
-            print(f"Error capturing audio: {e}")
+            print(f"Error reading audio analysis: {e}")
             return np.zeros(self.CHUNK//2), self.RATE / self.CHUNK
     
     def analyze_bands(self, fft_data, freq_resolution):
         """Extract energy from each frequency band"""
-        band_energies = []
+        # Mean of every band in a single matrix product
+        energies = fft_data @ self.filterbank * 10  # Amplify
         
-        for band_idx, (low_freq, high_freq) in enumerate(self.bands):
-            # Convert frequencies to FFT indices
-            low_idx = int(low_freq / freq_resolution)
-            high_idx = min(int(high_freq / freq_resolution), len(fft_data)-1)
-            
-            # Get band energy
-            band_data = fft_data[low_idx:high_idx+1]
-            energy = np.mean(band_data) * 10  # Amplify
-            
+        for band_idx, energy in enumerate(energies):
             # Apply smoothing with previous value
             self.current_energies[band_idx] = self.current_energies[band_idx] * (1 - self.smoothing_factor) + energy * self.smoothing_factor
             
             # Store in history
             self.band_energy_history[band_idx].append(self.current_energies[band_idx])
-            
-            band_energies.append(self.current_energies[band_idx])
         
-        return band_energies
+        return list(self.current_energies)
     
     def draw_gradient_waves(self, band_energies):
         """Draw flowing gradient waves for each band"""
@@ -260,8 +236,11 @@ class FrequencyBandsVisualizer:
                 # Get frequency data
                 fft_data, freq_resolution = self.get_frequency_data()
                 
-                # Analyze frequency bands
-                band_energies = self.analyze_bands(fft_data, freq_resolution)
+                # Analyze frequency bands (keep the previous energies until the service publishes a new frame)
+                if fft_data is not None:
+                    band_energies = self.analyze_bands(fft_data, freq_resolution)
+                else:
+                    band_energies = list(self.current_energies)
                 
                 # Draw visualization
                 self.draw_gradient_waves(band_energies)
@@ -277,11 +256,11 @@ class FrequencyBandsVisualizer:
     
     def cleanup(self):
         """Clean up resources"""
-        if hasattr(self, 'stream') and self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if hasattr(self, 'p') and self.p:
-            self.p.terminate()
+        if hasattr(self, 'analysis'):
+            overflows, dropped, missed = self.analysis.counters()
+            if overflows or dropped or missed:
+                print(f"Audio lost: {overflows} overflowed buffers, {dropped} dropped hops, {missed} missed frames")
+            self.analysis.close()
         pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+import numpy as np
+import pyaudio
+from multiprocessing import shared_memory, resource_tracker
+from stft import STFTAnalyzer, band_filterbank
+
+RING_NAME = "hackaphone_analyse"  # Name of the shared-memory block
+
+RATE = 44100
+HOP = RATE // 60  # New samples per analysis frame: one frame per image at 60 FPS (17 ms)
+WINDOW = 4096  # Samples analysed per frame (the newest HOP samples and the previous ones), for a 10.8 Hz resolution
+SLOTS = 64  # Frames kept in the ring (about 1 s)
+CAPTURE_SIZE = 16 * HOP  # Samples kept by the capture callback until they are analysed (about 0.4 s)
+BANDS = [
+    ('sub_bass', 20, 60),
+    ('bass', 60, 250),
+    ('low_mid', 250, 500),
+    ('mid', 500, 2000),
+    ('high_mid', 2000, 4000),
+    ('high', 4000, 20000)
+]
+STALE_AFTER = 1.0  # Seconds without a new frame after which the service is considered gone
+
+HEADER_DTYPE = np.dtype([
+    ('seq', np.int64),
+    ('rate', np.int64),
+    ('hop', np.int64),
+    ('window', np.int64),
+    ('overflows', np.int64),  # Capture buffers the sound card reported as overflowed (samples lost before the callback)
+    ('dropped', np.int64)  # Hops overwritten in the capture buffer before the analysis could take them
+], align=True)
+FRAME_DTYPE = np.dtype([
+    ('seq', np.int64),  # Frame number, -1 while the slot is being written
+    ('time', np.float64),  # time.time() when the newest sample was captured
+    ('waveform', np.float32, WINDOW),  # Samples in [-1, 1], oldest first
+    ('spectrum', np.float32, WINDOW // 2 + 1),  # Magnitude of the real FFT of the Hann-windowed waveform
+    ('bands', np.float32, len(BANDS))  # Sum of the spectrum magnitudes in each band
+], align=True)
+RING_SIZE = HEADER_DTYPE.itemsize + SLOTS * FRAME_DTYPE.itemsize
+
+
+def attach(name):
+    """Attach to an existing shared-memory block without taking ownership of it"""
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        # Before Python 3.13 the resource tracker would unlink the block when this process exits
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def map_ring(block, writable=False):
+    """Return (header, frames) numpy views over a ring block"""
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=block.buf)
+    frames = np.ndarray((SLOTS,), dtype=FRAME_DTYPE, buffer=block.buf, offset=HEADER_DTYPE.itemsize)
+    if not writable:
+        header.setflags(write=False)
+        frames.setflags(write=False)
+    return header, frames
+
+
+class AnalysisService:
+    """Captures the microphone once and publishes waveform, spectrum, and band energies for every hop"""
+
+    def __init__(self):
+        self.block = self.open_ring()
+        self.header, self.frames = map_ring(self.block, writable=True)
+        self.header['rate'], self.header['hop'], self.header['window'] = RATE, HOP, WINDOW
+
+        self.analyzer = STFTAnalyzer(RATE, WINDOW, band_filterbank([(low, high) for _, low, high in BANDS], RATE, WINDOW))
+
+        # Capture ring filled by the PyAudio callback, in samples since the start. The analysis only reads whole hops,
+        # which never wrap around since CAPTURE_SIZE is a multiple of HOP
+        self.captured = np.zeros(CAPTURE_SIZE, dtype=np.float32)
+        self.written = 0
+        self.analysed = 0
+        self.overflows = 0
+        self.dropped = 0
+        self.available = threading.Event()
+
+        self.p = pyaudio.PyAudio()
+        self.stream = self.p.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, frames_per_buffer=HOP,
+                                  stream_callback=self.capture, start=False)
+
+    def open_ring(self):
+        """Create the ring, or take over the block left by a service that stopped (it outlives it while visualizers map it)"""
+        try:
+            return shared_memory.SharedMemory(name=RING_NAME, create=True, size=RING_SIZE)
+        except FileExistsError:
+            block = attach(RING_NAME)
+            header, _ = map_ring(block)
+            seq = int(header['seq'])
+            time.sleep(2 * STALE_AFTER)
+            if int(header['seq']) != seq:
+                block.close()
+                raise RuntimeError("Another analysis service is already running")
+            return block
+
+    def capture(self, in_data, frame_count, time_info, status):
+        """PyAudio callback: convert the new samples into the capture ring without blocking or allocating"""
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        start = self.written % CAPTURE_SIZE
+        split = min(len(samples), CAPTURE_SIZE - start)
+        np.multiply(samples[:split], 1 / 32768.0, out=self.captured[start:start + split], casting='unsafe')
+        np.multiply(samples[split:], 1 / 32768.0, out=self.captured[:len(samples) - split], casting='unsafe')
+        if status & pyaudio.paInputOverflow:
+            self.overflows += 1
+        self.written += len(samples)
+        self.available.set()
+        return None, pyaudio.paContinue
+
+    def publish(self, samples):
+        """Analyse the newest hop of samples (float32 in [-1, 1]) and write it to the next slot of the ring"""
+        self.analyzer.push(samples)
+        spectrum = self.analyzer.spectrum()
+
+        seq = int(self.header['seq']) + 1
+        slot = self.frames[seq % SLOTS]
+        slot['seq'] = -1
+        slot['time'] = time.time()
+        slot['waveform'] = self.analyzer.samples
+        slot['spectrum'] = spectrum
+        slot['bands'] = self.analyzer.bands(spectrum)
+        slot['seq'] = seq
+        self.header['overflows'], self.header['dropped'] = self.overflows, self.dropped
+        self.header['seq'] = seq
+
+    def run(self, stop):
+        """Capture and publish until stop (threading.Event) is set"""
+        try:
+            self.stream.start_stream()
+            while not stop.is_set():
+                self.available.wait(0.1)
+                self.available.clear()
+                while self.written - self.analysed >= HOP:
+                    late = self.written - self.analysed - (CAPTURE_SIZE - HOP)
+                    if late > 0:
+                        # The callback is overwriting hops not analysed yet: skip them
+                        skipped = -(-late // HOP)
+                        self.dropped += skipped
+                        self.analysed += skipped * HOP
+                        continue
+                    start = self.analysed % CAPTURE_SIZE
+                    self.publish(self.captured[start:start + HOP])
+                    self.analysed += HOP
+        finally:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.p.terminate()
+            del self.header, self.frames
+            self.block.close()
+            self.block.unlink()
+
+
+class AnalysisReader:
+    """Read-only view of the analysis ring, used by the visualizers. Starts the service if no visualizer has yet"""
+
+    def __init__(self):
+        self.service = None
+        self.block = None
+        self.last_seq = 0
+        self.last_change = time.time()
+        self.missed = 0  # Frames overwritten in the ring before this reader could copy them
+        self.connect()
+
+    def connect(self):
+        """Map the ring, starting the service process first if it does not exist or has stopped"""
+        stale = self.stale()
+        self.close()
+        try:
+            self.block = attach(RING_NAME)
+            alive = int(map_ring(self.block)[0]['seq']) > 0 and not stale
+        except FileNotFoundError:
+            alive = False
+        if not alive:
+            # The service stops when the pipe to the visualizer that started it is closed
+            self.close()
+            self.service = subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdin=subprocess.PIPE)
+            first_seq = None
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                try:
+                    if self.block is None:
+                        self.block = attach(RING_NAME)
+                    seq = int(map_ring(self.block)[0]['seq'])
+                    if first_seq is None:
+                        first_seq = seq
+                    if seq != first_seq:  # The new service is publishing (in a new block or in the one it took over)
+                        break
+                except FileNotFoundError:
+                    pass
+                time.sleep(0.05)
+        if self.block is not None:
+            self.header, self.frames = map_ring(self.block)
+        self.last_seq = 0
+        self.last_change = time.time()
+
+    def stale(self):
+        """True if no new frame has been published for STALE_AFTER seconds"""
+        return time.time() - self.last_change > STALE_AFTER
+
+    def read_new(self):
+        """Return the frames published since the last call, oldest first (empty list if there is none)"""
+        if self.block is None:
+            if self.stale():
+                self.connect()
+            return []
+        newest = int(self.header['seq'])
+        if newest == self.last_seq:
+            if self.stale():
+                self.connect()  # Service gone (its visualizer was closed): start a new one
+            return []
+        frames = []
+        first = max(self.last_seq + 1, newest - SLOTS + 2)
+        if self.last_seq > 0:
+            self.missed += first - self.last_seq - 1
+        for seq in range(first, newest + 1):
+            slot = self.frames[seq % SLOTS]
+            frame = slot.copy()
+            if frame['seq'] == seq and slot['seq'] == seq:  # Not overwritten during the copy
+                frames.append(frame)
+            else:
+                self.missed += 1
+        self.last_seq = newest
+        self.last_change = time.time()
+        return frames
+
+    def latest(self):
+        """Return the newest frame if it is new since the last call, otherwise None"""
+        frames = self.read_new()
+        return frames[-1] if frames else None
+
+    def counters(self):
+        """Return (overflows, dropped, missed): audio lost by the sound card, by the service and frames missed by this reader"""
+        if self.block is None:
+            return 0, 0, self.missed
+        return int(self.header['overflows']), int(self.header['dropped']), self.missed
+
+    def close(self):
+        """Unmap the ring"""
+        if self.block is not None:
+            self.header = self.frames = None  # The views must be released before the block is closed
+            self.block.close()
+            self.block = None
+
+
+if __name__ == '__main__':
+    stop = threading.Event()
+
+    def wait_for_parent():
+        """Stop when the visualizer that started the service closes its end of the pipe"""
+        sys.stdin.read()
+        stop.set()
+
+    try:
+        service = AnalysisService()
+    except RuntimeError as e:
+        print(e)
+        sys.exit(0)
+    threading.Thread(target=wait_for_parent, daemon=True).start()
+    service.run(stop)
@@ -0,0 +1,79 @@
+import sys
+import time
+import numpy as np
+from stft import STFTAnalyzer, band_filterbank, log_filterbank
+
+RATE = 44100
+PSYCHEDELIC_BANDS = [(20, 60), (60, 250), (250, 500), (500, 2000), (2000, 4000), (4000, 20000)]
+INSTRUMENT_BANDS = [(20, 150), (150, 400), (400, 800), (800, 1500), (1500, 3000), (3000, 6000), (6000, 20000)]
+
+
+def time_per_call(function, calls):
+    """Return the best time of one call to function, in microseconds, over a few runs of calls calls"""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best * 1e6
+
+
+def psychedelic_loop(samples):
+    """Previous analysis of PsychedelicVisualizer.process_audio: complex FFT, then one Python loop step per band"""
+    fft_data = np.abs(np.fft.fft(samples)[:len(samples) // 2])
+    freq_resolution = RATE / len(samples)
+    energies = []
+    for low_freq, high_freq in PSYCHEDELIC_BANDS:
+        low_bin = max(0, min(int(low_freq / freq_resolution), len(fft_data) - 1))
+        high_bin = max(low_bin + 1, min(int(high_freq / freq_resolution), len(fft_data)))
+        energies.append(np.sum(fft_data[low_bin:high_bin]))
+    return energies
+
+
+def instrument_loop(samples):
+    """Previous analysis of FrequencyBandsVisualizer: Hann window rebuilt every call, complex FFT, one loop step per band"""
+    windowed = samples * np.hanning(len(samples))
+    fft_data = np.abs(np.fft.fft(windowed)[:len(samples) // 2])
+    freq_resolution = RATE / len(samples)
+    energies = []
+    for low_freq, high_freq in INSTRUMENT_BANDS:
+        low_idx = int(low_freq / freq_resolution)
+        high_idx = min(int(high_freq / freq_resolution), len(fft_data) - 1)
+        energies.append(np.mean(fft_data[low_idx:high_idx + 1]) * 10)
+    return energies
+
+
+if __name__ == '__main__':
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    noise = np.random.default_rng(0).standard_normal(RATE).astype(np.float32) * 0.1
+
+    print(f"Time per analysed frame, best of 5 runs of {calls} calls (at 60 FPS a frame lasts 16667 us)\n")
+    print(f"{'window':>6} | {'per-band loop':>22} | {'analyzer, bands':>15} | {'analyzer, 64 log bands':>22} | speed-up | difference")
+    for window, loop, bands, mean in ((1024, psychedelic_loop, PSYCHEDELIC_BANDS, False),
+                                      (2048, instrument_loop, INSTRUMENT_BANDS, True),
+                                      (4096, instrument_loop, INSTRUMENT_BANDS, True)):
+        samples = noise[:window]
+        hop = samples[-RATE // 60:]
+        analyzer = STFTAnalyzer(RATE, window, band_filterbank(bands, RATE, window, mean=mean, inclusive=mean))
+        log_analyzer = STFTAnalyzer(RATE, window, log_filterbank(64, RATE, window))
+
+        def analyze(analyzer=analyzer):
+            analyzer.push(hop)
+            return analyzer.bands(analyzer.spectrum())
+
+        def analyze_log(analyzer=log_analyzer):
+            analyzer.push(hop)
+            return analyzer.bands(analyzer.spectrum())
+
+        # Difference between the two methods on the same samples
+        analyzer.samples[:] = samples
+        check = analyzer.bands(analyzer.spectrum()) * (10 if mean else 1)
+        expected = np.array(loop(samples * np.hanning(window) if loop is psychedelic_loop else samples))
+        difference = np.max(np.abs(check - expected) / expected) * 100
+
+        before = time_per_call(lambda: loop(samples), calls)
+        after = time_per_call(analyze, calls)
+        log_bands = time_per_call(analyze_log, calls)
+        name = 'psychedelic' if loop is psychedelic_loop else 'instruments'
+        print(f"{window:>6} | {name + ' ' + f'{before:8.1f} us':>22} | {after:12.1f} us | {log_bands:19.1f} us | {before / after:7.2f}x | {difference:8.2f} %")
@@ -1,4 +1,3 @@
-import pyaudio
 import numpy as np
 import pygame
 from pygame.locals import *
@@ -8,32 +7,20 @@ import math
 from opensimplex import OpenSimplex
 import time
 import colorsys
+from analysis_service import AnalysisReader, RATE, WINDOW
 
 class AudioVisualizer:
     def __init__(self):
-        # Audio setup
-        self.CHUNK = 1024
-        self.FORMAT = pyaudio.paFloat32
-        self.CHANNELS = 1
-        self.RATE = 44100
-        
-        self.p = pyaudio.PyAudio()
-        try:
-            self.stream = self.p.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
-        except Exception as e:
-            print(f"Error opening audio stream: {e}")
-            self.p.terminate()
-            raise
+        # Audio setup: the analysis service captures the microphone (started if no other visualizer is running)
+        self.RATE = RATE
+        self.analysis = AnalysisReader()
+        # Frequencies of the spectrum bins published by the service (the Nyquist bin is left out)
+        self.frequencies = np.fft.rfftfreq(WINDOW, 1 / self.RATE)[:-1]
         
         # Graphics setup
         pygame.init()
         pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
+        self.clock = pygame.time.Clock()
         gluPerspective(45, (800/600), 0.1, 50.0)
         glTranslatef(0.0, 0.0, -5)
         
@@ -164,12 +151,14 @@ class AudioVisualizer:
 
     def process_audio(self):
         try:
-            # Read audio data
-            data = np.frombuffer(self.stream.read(self.CHUNK, exception_on_overflow=False), dtype=np.float32)
-            
-            # Perform FFT
-            spectrum = np.abs(np.fft.fft(data)[:self.CHUNK//2])
-            frequencies = np.fft.fftfreq(len(data))[:self.CHUNK//2] * self.RATE
+            # Spectrum of the newest frame of the analysis service
+            frame = self.analysis.latest()
+            if frame is None:
+                if hasattr(self, 'prev_bass'):
+                    return self.prev_bass, self.prev_treble, self.prev_pitch  # No new frame: keep the previous values
+                return 0.0, 0.0, 0.0
+            spectrum = frame['spectrum'][:-1]
+            frequencies = self.frequencies
             
             # Enhanced normalization with smoothing
             max_val = np.max(spectrum)
@@ -219,9 +208,7 @@ class AudioVisualizer:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         pygame.quit()
-                        self.stream.stop_stream()
-                        self.stream.close()
-                        self.p.terminate()
+                        self.analysis.close()
                         return
                         
                 # Clear screen
@@ -249,14 +236,12 @@ class AudioVisualizer:
                 
                 # Update display
                 pygame.display.flip()
-                pygame.time.wait(10)
+                self.clock.tick(60)  # Steady 60 FPS: the analysis is read without blocking
                 
         except Exception as e:
             print(f"Error in main loop: {e}")
             pygame.quit()
-            self.stream.stop_stream()
-            self.stream.close()
-            self.p.terminate()
+            self.analysis.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,103 @@
+import colorsys
+import numpy as np
+import pygame
+import pygame.gfxdraw
+
+# Sizes, hues and opacities are quantized so that every particle is drawn with one of a few thousand cached sprites
+SIZE_RATIO = 1.15  # Ratio between two consecutive sprite radii
+HUE_LEVELS = 16
+ALPHA_LEVELS = 8
+MAX_SPRITES = 4096  # The sprite cache is emptied when it grows past this
+
+
+class ParticleSystem:
+    """Particles stored as a structure of preallocated numpy arrays (one row per field). Spawning, motion and culling
+    are vectorized, and dead particles are replaced by the last live ones (swap-remove), so the live particles always
+    are the first count columns"""
+
+    FIELDS = ('x', 'y', 'vx', 'vy', 'size', 'age', 'lifespan', 'hue_offset')
+
+    def __init__(self, capacity, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.data = np.zeros((len(self.FIELDS), capacity), dtype=np.float32)
+        self.x, self.y, self.vx, self.vy, self.size, self.age, self.lifespan, self.hue_offset = self.data
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, count, x, y, max_speed, max_size):
+        """Create up to count particles at (x, y), flying in random directions"""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        angle = self.rng.uniform(0, np.pi * 2, count)
+        speed = self.rng.uniform(2, max_speed, count)
+        self.x[new] = x
+        self.y[new] = y
+        self.vx[new] = np.cos(angle) * speed
+        self.vy[new] = np.sin(angle) * speed
+        self.size[new] = self.rng.uniform(3, max_size, count)
+        self.age[new] = 0
+        self.lifespan[new] = self.rng.integers(15, 61, count)  # Shorter lifespan for faster turnover
+        self.hue_offset[new] = self.rng.uniform(0, 1, count)
+        self.count += count
+
+    def update(self, width, height):
+        """Move all particles, then remove those that are too old or out of bounds"""
+        live = self.data[:, :self.count]
+        live[0:2] += live[2:4]  # Position += velocity
+        live[5] += 1
+        x, y = live[0], live[1]
+        dead = (live[5] >= live[6]) | (x < 0) | (x > width) | (y < 0) | (y > height)
+        dead_count = np.count_nonzero(dead)
+        if dead_count:
+            remaining = self.count - dead_count
+            # Dead particles before the new end are filled with the live particles after it
+            holes = np.flatnonzero(dead[:remaining])
+            movers = np.flatnonzero(~dead[remaining:]) + remaining
+            self.data[:, holes] = self.data[:, movers]
+            self.count = remaining
+
+    def alphas(self):
+        """Return the opacity of every live particle, from 1 when created to 0 at the end of its lifespan"""
+        return 1 - self.age[:self.count] / self.lifespan[:self.count]
+
+    def sprite(self, key):
+        """Return the glow sprite of a (size level, hue level, alpha level) key, drawing it the first time"""
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= MAX_SPRITES:
+                self.sprites.clear()
+            level, rest = divmod(key, HUE_LEVELS * ALPHA_LEVELS)
+            hue, alpha = divmod(rest, ALPHA_LEVELS)
+            size = int(round(SIZE_RATIO ** level))
+            alpha = 255 * (alpha + 1) / ALPHA_LEVELS
+            color = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue / HUE_LEVELS, 0.9, 0.9))
+            sprite = pygame.Surface((2 * size + 1, 2 * size + 1), pygame.SRCALPHA)
+            for r in range(size, 0, -1):  # Glow: concentric circles, more opaque towards the center
+                pygame.gfxdraw.filled_circle(sprite, size, size, r, color + (int(alpha * (r / size) * 0.9),))
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()  # Same pixel format as the screen: faster blits
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, hue_offset):
+        """Draw all live particles with their glow, in a single batched blit"""
+        visible = np.flatnonzero(self.size[:self.count] >= 1)
+        if len(visible) == 0:
+            return
+        levels = np.rint(np.log(self.size[visible]) / np.log(SIZE_RATIO)).astype(np.int64)
+        sizes = np.rint(SIZE_RATIO ** levels).astype(np.int64)
+        hues = (((hue_offset + self.hue_offset[visible]) % 1.0) * HUE_LEVELS).astype(np.int64) % HUE_LEVELS
+        alphas = np.clip(np.ceil(self.alphas()[visible] * ALPHA_LEVELS).astype(np.int64) - 1, 0, ALPHA_LEVELS - 1)
+        keys = (levels * HUE_LEVELS + hues) * ALPHA_LEVELS + alphas
+        # One sprite lookup per distinct key, then the sprites and positions are gathered without a Python loop
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        sprites = np.empty(len(unique_keys), dtype=object)
+        sprites[:] = [self.sprite(key) for key in unique_keys.tolist()]
+        positions = zip((self.x[visible].astype(np.int64) - sizes).tolist(), (self.y[visible].astype(np.int64) - sizes).tolist())
+        surface.blits(zip(sprites[inverse].tolist(), positions), doreturn=False)
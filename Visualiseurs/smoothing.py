@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def ramp_weights(count):
+    """FIR weights (oldest first) growing linearly up to the newest frame, divided by the number of frames"""
+    return np.arange(1, count + 1, dtype=np.float32) / (count * count)
+
+
+class FrameSmoother:
+    """Temporal smoothing of fixed-size frames of samples, allocating nothing per frame.
+    FIR mode (weights given, oldest first): weighted sum of the last len(weights) frames, kept in a 2-D float32 ring.
+    EMA mode (alpha given): exponential moving average, output = alpha * frame + (1 - alpha) * output"""
+
+    def __init__(self, size, weights=None, alpha=None):
+        if (weights is None) == (alpha is None):
+            raise ValueError("Give either FIR weights or an EMA alpha")
+        self.output = np.zeros(size, dtype=np.float32)
+        self.alpha = alpha
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float32)
+            self.ring = np.zeros((len(weights), size), dtype=np.float32)
+            self.newest = len(weights) - 1
+            # Row i holds the weights of the ring slots when the newest frame is in slot i, so the ring is never shifted
+            self.weights = np.stack([np.roll(weights, i + 1) for i in range(len(weights))])
+        else:
+            self.scaled = np.zeros(size, dtype=np.float32)
+
+    def push(self, frame):
+        """Add a frame (any numeric dtype, converted once here)"""
+        if self.alpha is None:
+            self.newest = (self.newest + 1) % len(self.ring)
+            self.ring[self.newest] = frame
+        else:
+            np.multiply(frame, self.alpha, out=self.scaled, casting='unsafe')
+            self.output *= 1 - self.alpha
+            self.output += self.scaled
+
+    def value(self):
+        """Return the smoothed frame (a view that the next call overwrites)"""
+        if self.alpha is None:
+            np.dot(self.weights[self.newest], self.ring, out=self.output)
+        return self.output
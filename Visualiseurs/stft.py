@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def band_filterbank(bands, rate, window, mean=False, inclusive=False):
+    """Matrix (bins x bands) summing the spectrum magnitudes of each band, given as (low, high) in Hz.
+    With mean=True the magnitudes are averaged instead. The bin of the high frequency is left out, unless inclusive=True"""
+    resolution = rate / window
+    bins = window // 2 + 1
+    matrix = np.zeros((bins, len(bands)), dtype=np.float32)
+    for i, (low, high) in enumerate(bands):
+        low_bin = min(int(low / resolution), bins - 1)
+        high_bin = max(low_bin + 1, min(int(high / resolution) + inclusive, bins))  # At least one bin per band
+        matrix[low_bin:high_bin, i] = 1 / (high_bin - low_bin) if mean else 1
+    return matrix
+
+
+def log_filterbank(count, rate, window, low=20.0, high=None):
+    """Matrix (bins x count) of triangular filters evenly spaced on a logarithmic frequency scale"""
+    high = high or rate / 2
+    edges = np.geomspace(low, high, count + 2)
+    frequencies = np.fft.rfftfreq(window, 1 / rate)
+    matrix = np.zeros((len(frequencies), count), dtype=np.float32)
+    for i in range(count):
+        start, center, end = edges[i:i + 3]
+        rising = (frequencies - start) / (center - start)
+        falling = (end - frequencies) / (end - center)
+        matrix[:, i] = np.clip(np.minimum(rising, falling), 0, None)
+        if not matrix[:, i].any():  # Band narrower than a bin: take the nearest bin
+            matrix[np.argmin(np.abs(frequencies - center)), i] = 1
+    return matrix
+
+
+class STFTAnalyzer:
+    """Sliding-window spectrum of the newest samples. The window, buffers and filterbank are computed once, so the hop
+    (the number of samples pushed between two spectra) can be much shorter than the window"""
+
+    def __init__(self, rate, window, filterbank=None):
+        self.rate = rate
+        self.window = window
+        self.samples = np.zeros(window, dtype=np.float32)  # Newest samples, oldest first
+        self.hann = np.hanning(window).astype(np.float32)
+        self.windowed = np.zeros(window, dtype=np.float32)
+        self.frequencies = np.fft.rfftfreq(window, 1 / rate)
+        self.set_filterbank(filterbank if filterbank is not None else np.zeros((window // 2 + 1, 0), dtype=np.float32))
+
+    def set_filterbank(self, filterbank):
+        """Use filterbank (bins x bands matrix, see band_filterbank and log_filterbank) for bands()"""
+        # The filters only cover part of the spectrum: keep the rows between the first and last non-zero ones
+        used = np.flatnonzero(filterbank.any(axis=1))
+        self.first, self.last = (used[0], used[-1] + 1) if len(used) else (0, 0)
+        self.filterbank = np.ascontiguousarray(filterbank[self.first:self.last])
+
+    def push(self, samples):
+        """Append new samples, dropping the oldest ones"""
+        count = min(len(samples), self.window)
+        self.samples[:-count] = self.samples[count:]
+        self.samples[-count:] = samples[-count:]
+
+    def spectrum(self):
+        """Return the magnitude of the real FFT of the Hann-windowed samples (window // 2 + 1 bins)"""
+        np.multiply(self.samples, self.hann, out=self.windowed)
+        return np.abs(np.fft.rfft(self.windowed)).astype(np.float32, copy=False)
+
+    def bands(self, spectrum):
+        """Return the energy of every band of the filterbank, in a single matrix product"""
+        return spectrum[self.first:self.last] @ self.filterbank
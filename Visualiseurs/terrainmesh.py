@@ -4,7 +4,7 @@ import pyqtgraph.opengl as gl
 from pyqtgraph.Qt import QtCore
 from pyqtgraph.Qt.QtWidgets import QApplication
 import struct
-import pyaudio
+from analysis_service import AnalysisReader, RATE, WINDOW
 import sys
 import time
 
@@ -31,18 +31,11 @@ class Terrain(object):
         
         # Calculate exact CHUNK size based on points
         self.grid_points = len(self.xpoints) * len(self.ypoints)
-        self.RATE = 44100
-        self.CHUNK = max(1024, self.grid_points)  # Ensure minimum buffer size
-
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.RATE,
-            input=True,
-            output=True,
-            frames_per_buffer=self.CHUNK,
-        )
+        self.RATE = RATE
+        self.CHUNK = min(max(1024, self.grid_points), WINDOW)  # Ensure minimum buffer size, within one analysis window
+
+        # the analysis service captures the microphone (started if no other visualizer is running)
+        self.analysis = AnalysisReader()
 
         # perlin noise object with seed based on current time
         self.noise = OpenSimplex(seed=int(time.time()))
@@ -63,11 +56,8 @@ class Terrain(object):
     def mesh(self, offset=0, height=2.5, wf_data=None):
         if wf_data is not None:
             try:
-                # Convert the waveform data to a numpy array of 16-bit integers
-                wf_data = np.frombuffer(wf_data, dtype=np.int16)
-                
-                # Normalize the data to range [-1, 1]
-                wf_data = wf_data.astype(np.float32) / 32768.0
+                # The waveform of the analysis service is already normalized to range [-1, 1]
+                wf_data = np.array(wf_data, dtype=np.float32)
                 
                 # Ensure proper size by reshaping
                 wf_data = np.resize(wf_data, (len(self.xpoints), len(self.ypoints)))
@@ -119,7 +109,10 @@ class Terrain(object):
         update the mesh and shift the noise each time
         """
         try:
-            wf_data = self.stream.read(self.CHUNK, exception_on_overflow=False)
+            frame = self.analysis.latest()
+            if frame is None:
+                return  # No new frame from the analysis service: keep the current mesh
+            wf_data = frame['waveform'][-self.CHUNK:]
             verts, faces, colors = self.mesh(offset=self.offset, wf_data=wf_data)
             self.mesh1.setMeshData(vertexes=verts, faces=faces, faceColors=colors)
             self.offset -= 0.05
@@ -147,9 +140,7 @@ class Terrain(object):
         Cleanup resources
         """
         try:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.p.terminate()
+            self.analysis.close()
         except:
             pass
 